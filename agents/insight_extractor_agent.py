@@ -4,48 +4,45 @@
 Agent 2: Insight Extractor - Analyzes resume against job requirements and scores candidates
 """
 import json
-import re
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
 import logging
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.api_key_manager import get_api_key_manager
+from utils.api_key_manager import get_api_key_manager, error_status, is_key_failure
+from utils.request_scheduler import get_request_scheduler
+from utils.env import load_env
+from agents.llm_client import get_provider_config, get_client, SMALL
+from agents.schemas import CandidateAnalysis
+from agents.structured_output import complete_structured
 
-load_dotenv()
+load_env()
 logger = logging.getLogger(__name__)
 
 
-def analyze_candidate_with_agent(parsed_resume: dict, job_requirements: dict, max_retries: int = 3) -> dict:
+def analyze_candidate_with_agent(parsed_resume: dict, job_requirements: dict, max_retries: int = 3, tier: str = SMALL) -> dict:
     """Analyze candidate using direct API call with automatic key rotation"""
     
     api_manager = get_api_key_manager()
-    provider = os.getenv("LLM_PROVIDER", "openrouter").lower()
-    
-    if provider == "groq":
-        model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
-        base_url = "https://api.groq.com/openai/v1"
-    else:
-        model = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.1-70b-instruct")
-        base_url = "https://openrouter.ai/api/v1"
+    # Benched keys don't count towards the pool's rate limit
+    scheduler = get_request_scheduler(api_manager.get_available_keys())
+    provider, model, base_url = get_provider_config(tier)
     
     # Try with rotation
     for attempt in range(max_retries):
         try:
             api_key = api_manager.get_current_key()
-            logger.info(f"Using {provider.upper()} API Key #{api_manager.get_key_number()}/{api_manager.get_total_keys()}")
+            logger.debug(f"Using {provider.upper()} API Key #{api_manager.get_key_number()}/{api_manager.get_total_keys()}")
             
             if not api_key or api_key == "your_groq_key_here":
                 return {"status": "error", "error": f"{provider.upper()} API key not configured"}
         
-            logger.info(f"Using model: {model}")
+            logger.debug(f"Using model: {model}")
             
-            # Use OpenAI client
-            client = OpenAI(
-                api_key=api_key,
-                base_url=base_url
-            )
+            # Wait for this session's fair share of the pool's rate limit
+            scheduler.acquire()
+            
+            # Reuse the cached OpenAI client for this key
+            client = get_client(api_key, base_url)
             
             prompt = f"""You are an expert recruiter analyzing a candidate against job requirements.
 
@@ -58,6 +55,10 @@ JOB REQUIREMENTS:
 - Required Experience: {job_requirements.get('required_experience_years', '0 to 3')} years
 - Technical Skills: {job_requirements.get('nice_to_have', 'N/A')}
 
+SKILL MATCH (computed locally, synonyms already resolved - use as given):
+- Matched: {', '.join(job_requirements.get('matched_skills') or []) or 'None'}
+- Missing: {', '.join(job_requirements.get('missing_skills') or []) or 'None'}
+
 CRITICAL ANALYSIS INSTRUCTIONS:
 
 1. KEY STRENGTHS (3-5 items):
@@ -77,18 +78,12 @@ CRITICAL ANALYSIS INSTRUCTIONS:
    - Mention specific skills that align or are missing
    - Be honest about fit level
 
-4. CONFIDENCE SCORE (0-100):
-   - Skill match: 40% (how many required skills they have)
-   - Experience level: 30% (years match requirements)
-   - Education: 20% (relevant degree)
-   - Achievements: 10%
+(The numeric score is computed separately - do not include one.)
 
 Return ONLY valid JSON with this structure:
 {{
     "candidate_name": "Name",
     "candidate_email": "email@example.com",
-    "confidence_score": 75,
-    "shortlisted": true,
     "key_strengths": [
         "Proficient in Python with 2+ years experience",
         "Strong SQL and database management skills",
@@ -99,52 +94,44 @@ Return ONLY valid JSON with this structure:
         "Missing Docker/Kubernetes knowledge",
         "Limited experience (0 years vs 2-3 required)"
     ],
-    "recommendation": "Candidate shows strong foundational skills in Python and SQL which align with core requirements. However, lacks cloud experience (AWS) and containerization skills. Consider for junior role or with training.",
-    "email_subject": "Interview Opportunity - Job Title",
-    "email_body": "<p>Dear Candidate...</p>"
+    "recommendation": "Candidate shows strong foundational skills in Python and SQL which align with core requirements. However, lacks cloud experience (AWS) and containerization skills. Consider for junior role or with training."
 }}
 
 Return ONLY the JSON, no additional text."""
         
-            response = client.chat.completions.create(
-                model=model,
+            analysis_data = complete_structured(
+                client,
+                model,
                 messages=[
                     {"role": "system", "content": "You are an expert recruiter. Analyze candidates and return ONLY valid JSON."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.3
+                schema=CandidateAnalysis,
+                temperature=0.3,
+                scheduler=scheduler
             )
-            
-            result_text = response.choices[0].message.content
-            
-            # Parse JSON response
-            try:
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    analysis_data = json.loads(json_match.group())
-                    analysis_data["status"] = "success"
-                    logger.info("✅ Successfully analyzed candidate")
-                    return analysis_data
-                else:
-                    return {"status": "error", "error": "Could not extract JSON from response"}
-            except json.JSONDecodeError as e:
-                return {"status": "error", "error": f"JSON parsing failed: {str(e)}", "raw_response": result_text[:500]}
+            # The provider answered, so the key works (even if the output needs repair)
+            api_manager.record_success(api_key)
+            if analysis_data["status"] == "success":
+                logger.debug("✅ Successfully analyzed candidate")
+            return analysis_data
         
         except Exception as e:
             error_str = str(e)
+            status = error_status(e)
             
-            # Check if it's a rate limit error
-            if "rate_limit" in error_str.lower() or "429" in error_str:
-                logger.warning(f"⚠️ Rate limit hit on Key #{api_manager.get_key_number()}")
+            # Rate limit, revoked key or provider error: count it against the key and rotate
+            if is_key_failure(status):
+                logger.warning(f"⚠️ HTTP {status} on Key #{api_manager.get_key_number()}")
+                api_manager.record_failure(api_key, status)
                 
                 # Rotate to next key
-                if attempt < max_retries - 1:
-                    api_manager.rotate_to_next()
+                if attempt < max_retries - 1 and api_manager.rotate_to_next(failed_key=api_key):
                     logger.info(f"🔄 Retrying with Key #{api_manager.get_key_number()}...")
                     continue
                 else:
-                    logger.error("❌ All API keys exhausted, all hit rate limits")
-                    return {"status": "error", "error": "All API keys have hit rate limits. Please wait or add more keys."}
+                    logger.error("❌ All API keys exhausted, all hit rate limits or errors")
+                    return {"status": "error", "error": "All API keys have hit rate limits or errors. Please wait or add more keys."}
             else:
                 # Non-rate-limit error, don't retry
                 logger.error(f"API call failed: {error_str}")
@@ -0,0 +1,42 @@
+"""
+LLM Client - Provider configuration and cached OpenAI-compatible clients
+"""
+import os
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+# Model tiers: "small" is the cheap/fast model, "large" is used for escalations
+SMALL = "small"
+LARGE = "large"
+
+
+def get_provider_config(tier: str = SMALL):
+    """Return (provider, model, base_url) for a model tier from the environment"""
+    provider = os.getenv("LLM_PROVIDER", "openrouter").lower()
+
+    if provider == "groq":
+        if tier == LARGE:
+            model = os.getenv("GROQ_LARGE_MODEL", "llama-3.3-70b-versatile")
+        else:
+            model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+        base_url = "https://api.groq.com/openai/v1"
+    else:
+        if tier == LARGE:
+            model = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.1-70b-instruct")
+        else:
+            model = os.getenv("OPENROUTER_SMALL_MODEL", "meta-llama/llama-3.1-8b-instruct")
+        base_url = "https://openrouter.ai/api/v1"
+
+    return provider, model, base_url
+
+
+@lru_cache(maxsize=32)
+def get_client(api_key: str, base_url: str):
+    """Create one OpenAI client per (key, endpoint) and reuse its connection pool"""
+    from openai import OpenAI  # heavy import, deferred until the first API call
+
+    logger.info(f"Creating API client for {base_url}")
+    return OpenAI(api_key=api_key, base_url=base_url)
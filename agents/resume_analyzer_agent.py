@@ -1,49 +1,45 @@
 """
 Agent 1: Resume Analyzer - Parses and extracts structured data from resumes
 """
-import json
-import re
 import os
-from dotenv import load_dotenv
-from openai import OpenAI
 import logging
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from utils.api_key_manager import get_api_key_manager
+from utils.api_key_manager import get_api_key_manager, error_status, is_key_failure
+from utils.request_scheduler import get_request_scheduler
+from utils.env import load_env
+from agents.llm_client import get_provider_config, get_client, SMALL
+from agents.schemas import ParsedResume
+from agents.structured_output import complete_structured
 
-load_dotenv()
+load_env()
 logger = logging.getLogger(__name__)
 
 
-def parse_resume_with_agent(resume_text: str, max_retries: int = 3) -> dict:
+def parse_resume_with_agent(resume_text: str, max_retries: int = 3, tier: str = SMALL) -> dict:
     """Parse resume using direct API call with automatic key rotation on rate limit"""
     
     api_manager = get_api_key_manager()
-    provider = os.getenv("LLM_PROVIDER", "openrouter").lower()
-    
-    if provider == "groq":
-        model = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
-        base_url = "https://api.groq.com/openai/v1"
-    else:
-        model = os.getenv("OPENROUTER_MODEL", "meta-llama/llama-3.1-70b-instruct")
-        base_url = "https://openrouter.ai/api/v1"
+    # Benched keys don't count towards the pool's rate limit
+    scheduler = get_request_scheduler(api_manager.get_available_keys())
+    provider, model, base_url = get_provider_config(tier)
     
     # Try with rotation
     for attempt in range(max_retries):
         try:
             api_key = api_manager.get_current_key()
-            logger.info(f"Using {provider.upper()} API Key #{api_manager.get_key_number()}/{api_manager.get_total_keys()}")
+            logger.debug(f"Using {provider.upper()} API Key #{api_manager.get_key_number()}/{api_manager.get_total_keys()}")
             
             if not api_key or api_key == "your_groq_key_here":
                 return {"status": "error", "error": f"{provider.upper()} API key not configured"}
         
-            logger.info(f"Using model: {model}")
+            logger.debug(f"Using model: {model}")
             
-            # Use OpenAI client
-            client = OpenAI(
-                api_key=api_key,
-                base_url=base_url
-            )
+            # Wait for this session's fair share of the pool's rate limit
+            scheduler.acquire()
+            
+            # Reuse the cached OpenAI client for this key
+            client = get_client(api_key, base_url)
             
             prompt = f"""You are an expert resume parser. Extract information EXACTLY as written in the resume.
 
@@ -67,13 +63,9 @@ CRITICAL INSTRUCTIONS - READ CAREFULLY:
    
    If a skill is NOT written in the resume, DO NOT include it!
 
-2. EXPERIENCE CALCULATION:
-   - Count ONLY full-time work experience (NOT internships or education)
-   - Calculate ACCURATELY from the dates mentioned in the resume
-   - If dates show "Oct 2023 - July 2025", that's approximately 2 years (or 1.75 years)
-   - Round to nearest whole number or use decimal (e.g., 1.75, 2)
-   - If fresher with no full-time work, set experience_years to 0
-   - Add up all full-time work periods accurately
+2. EXPERIENCE:
+   - experience_years: rough total of full-time work (NOT internships or education), 0 for freshers
+   - Exact years are computed separately from the dates, so do not spend effort on the arithmetic
 
 3. CONTACT EXTRACTION:
    - Extract name, email, phone number exactly as written
@@ -98,6 +90,7 @@ Return ONLY valid JSON with this structure:
     "education": [
         {{"degree": "Degree Name", "field": "Field", "year": 2020}}
     ],
+    "achievements": ["Awards, certifications or measurable accomplishments written in the resume"],
     "summary": "Brief summary"
 }}
 
@@ -105,49 +98,40 @@ Return ONLY valid JSON with this structure:
 
 Return ONLY the JSON, no additional text."""
         
-            logger.info("Calling API for resume parsing...")
-            response = client.chat.completions.create(
-                model=model,
+            logger.debug("Calling API for resume parsing...")
+            parsed_data = complete_structured(
+                client,
+                model,
                 messages=[
                     {"role": "system", "content": "You are an expert resume parser. Read carefully and extract ALL skills, experience, and contact information. Return ONLY valid JSON with comprehensive skill lists."},
                     {"role": "user", "content": prompt}
                 ],
-                temperature=0.1
+                schema=ParsedResume,
+                temperature=0.1,
+                scheduler=scheduler
             )
-            
-            result_text = response.choices[0].message.content
-            logger.info(f"Received response: {len(result_text)} characters")
-            
-            # Parse JSON response
-            try:
-                json_match = re.search(r'\{.*\}', result_text, re.DOTALL)
-                if json_match:
-                    parsed_data = json.loads(json_match.group())
-                    parsed_data["status"] = "success"
-                    logger.info("✅ Successfully parsed JSON response")
-                    return parsed_data
-                else:
-                    logger.error("No JSON found in response")
-                    return {"status": "error", "error": "Could not extract JSON from response"}
-            except json.JSONDecodeError as e:
-                logger.error(f"JSON decode error: {str(e)}")
-                return {"status": "error", "error": f"JSON parsing failed: {str(e)}", "raw_response": result_text[:500]}
+            # The provider answered, so the key works (even if the output needs repair)
+            api_manager.record_success(api_key)
+            if parsed_data["status"] == "success":
+                logger.debug("✅ Successfully parsed JSON response")
+            return parsed_data
         
         except Exception as e:
             error_str = str(e)
+            status = error_status(e)
             
-            # Check if it's a rate limit error
-            if "rate_limit" in error_str.lower() or "429" in error_str:
-                logger.warning(f"⚠️ Rate limit hit on Key #{api_manager.get_key_number()}")
+            # Rate limit, revoked key or provider error: count it against the key and rotate
+            if is_key_failure(status):
+                logger.warning(f"⚠️ HTTP {status} on Key #{api_manager.get_key_number()}")
+                api_manager.record_failure(api_key, status)
                 
                 # Rotate to next key
-                if attempt < max_retries - 1:
-                    api_manager.rotate_to_next()
+                if attempt < max_retries - 1 and api_manager.rotate_to_next(failed_key=api_key):
                     logger.info(f"🔄 Retrying with Key #{api_manager.get_key_number()}...")
                     continue
                 else:
-                    logger.error("❌ All API keys exhausted, all hit rate limits")
-                    return {"status": "error", "error": "All API keys have hit rate limits. Please wait or add more keys."}
+                    logger.error("❌ All API keys exhausted, all hit rate limits or errors")
+                    return {"status": "error", "error": "All API keys have hit rate limits or errors. Please wait or add more keys."}
             else:
                 # Non-rate-limit error, don't retry
                 logger.error(f"API call failed: {error_str}")
@@ -0,0 +1,92 @@
+"""
+Output Schemas - Pydantic models for the structured JSON returned by the agents
+"""
+import re
+from typing import List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+
+def _coerce_number(value):
+    """Accept numbers written as strings such as "2.5 years" or "75%" """
+    if isinstance(value, str):
+        match = re.search(r"-?\d+(?:\.\d+)?", value)
+        if not match:
+            raise ValueError(f"not a number: {value!r}")
+        value = float(match.group())
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def _coerce_list(value):
+    """Accept a comma-separated string where a list of strings is expected"""
+    if isinstance(value, str):
+        return [item.strip() for item in value.split(",") if item.strip()]
+    return value
+
+
+class ExperienceEntry(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    role: Optional[str] = None
+    company: Optional[str] = None
+    duration: Optional[str] = None
+    type: Optional[str] = None
+
+
+class EducationEntry(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    degree: Optional[str] = None
+    field: Optional[str] = None
+    year: Optional[Union[int, str]] = None
+
+
+class ParsedResume(BaseModel):
+    """Agent 1 output"""
+    model_config = ConfigDict(extra="allow")
+
+    name: str
+    email: Optional[str] = None
+    phone: Optional[str] = None
+    skills: List[str]
+    experience_years: Union[int, float] = Field(ge=0)
+    experience_details: List[ExperienceEntry] = []
+    education: List[EducationEntry] = []
+    achievements: List[str] = []
+    summary: Optional[str] = None
+
+    @field_validator("experience_years", mode="before")
+    @classmethod
+    def coerce_years(cls, value):
+        return _coerce_number(value)
+
+    @field_validator("skills", "achievements", mode="before")
+    @classmethod
+    def coerce_skills(cls, value):
+        return _coerce_list(value)
+
+
+class CandidateAnalysis(BaseModel):
+    """Agent 2 output"""
+    model_config = ConfigDict(extra="allow")
+
+    candidate_name: Optional[str] = None
+    candidate_email: Optional[str] = None
+    # Scores are computed locally by utils/scoring_engine.py; kept optional for older prompts
+    confidence_score: Optional[Union[int, float]] = Field(default=None, ge=0, le=100)
+    shortlisted: Optional[bool] = None
+    key_strengths: List[str]
+    gaps: List[str]
+    recommendation: str
+
+    @field_validator("confidence_score", mode="before")
+    @classmethod
+    def coerce_score(cls, value):
+        return _coerce_number(value)
+
+    @field_validator("key_strengths", "gaps", mode="before")
+    @classmethod
+    def coerce_lists(cls, value):
+        return _coerce_list(value)
@@ -0,0 +1,144 @@
+"""
+Structured Output - JSON-mode completions validated against pydantic schemas
+"""
+import json
+import os
+import logging
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from pydantic import ValidationError
+from utils.json_repair import repair_json
+from utils.request_scheduler import record_usage
+from utils.api_key_manager import error_status, is_key_failure
+
+logger = logging.getLogger(__name__)
+
+# (base_url, model) pairs that rejected response_format - skip JSON mode for them
+_JSON_MODE_UNSUPPORTED = set()
+
+
+def json_mode_enabled(base_url: str, model: str) -> bool:
+    """Whether to request response_format=json_object for this endpoint"""
+    if os.getenv("LLM_JSON_MODE", "true").lower() in ("0", "false", "no"):
+        return False
+    return (base_url, model) not in _JSON_MODE_UNSUPPORTED
+
+
+def create_chat_completion(client, model: str, messages: list, temperature: float, json_mode: bool = True, scheduler=None):
+    """
+    Call the chat API, asking for JSON mode when the provider supports it.
+
+    The caller has already acquired a slot for the first request; a fallback
+    request without JSON mode waits for its own slot from `scheduler`.
+    """
+    base_url = str(getattr(client, "base_url", ""))
+    if json_mode and json_mode_enabled(base_url, model):
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                response_format={"type": "json_object"}
+            )
+            record_usage(response)
+            return response
+        except Exception as e:
+            error_str = str(e).lower()
+            if "json_validate_failed" in error_str:
+                # Provider rejected its own malformed output - retry without JSON mode and repair locally
+                logger.warning("⚠️ JSON mode output failed provider validation, retrying without it")
+            elif "response_format" in error_str or "json_object" in error_str:
+                logger.warning(f"⚠️ JSON mode not supported by {model}, falling back to plain output")
+                _JSON_MODE_UNSUPPORTED.add((base_url, model))
+            else:
+                raise
+            if scheduler is not None:
+                scheduler.acquire()
+
+    response = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature
+    )
+    record_usage(response)
+    return response
+
+
+def validate_output(data: dict, schema):
+    """
+    Validate parsed JSON against a pydantic schema.
+    Returns (clean_dict, []) on success or (partial_dict, bad_fields) on failure,
+    where partial_dict has the invalid fields removed.
+    """
+    try:
+        return schema.model_validate(data).model_dump(exclude_none=True), []
+    except ValidationError as e:
+        bad_fields = sorted({str(err["loc"][0]) for err in e.errors() if err["loc"]})
+        partial = {k: v for k, v in data.items() if k not in bad_fields}
+        return partial, bad_fields
+
+
+def _describe_fields(schema, fields: list) -> str:
+    """Render the JSON schema of just the requested fields for a re-ask prompt"""
+    properties = schema.model_json_schema().get("properties", {})
+    return json.dumps({name: properties.get(name, {}) for name in fields}, indent=2)
+
+
+def complete_structured(client, model: str, messages: list, schema, temperature: float, scheduler=None) -> dict:
+    """
+    Run a chat completion and return a schema-valid dict with "status": "success".
+
+    Malformed JSON is repaired locally. If fields are still missing or invalid,
+    one follow-up call asks for just those fields instead of re-running the
+    whole prompt. The follow-up waits for its own slot from `scheduler`; if it
+    fails for a reason other than the key (429/401/403/5xx, which are raised
+    for the agent to record and rotate), the first response is judged on its own.
+    """
+    response = create_chat_completion(client, model, messages, temperature, scheduler=scheduler)
+    result_text = response.choices[0].message.content or ""
+    logger.debug(f"Received response: {len(result_text)} characters")
+
+    data = repair_json(result_text)
+    if data is None:
+        logger.error("No JSON found in response")
+        return {"status": "error", "error": "Could not extract JSON from response", "error_type": "validation", "raw_response": result_text[:500]}
+
+    clean, bad_fields = validate_output(data, schema)
+    if not bad_fields:
+        clean["status"] = "success"
+        return clean
+
+    logger.warning(f"⚠️ Response missing/invalid fields: {', '.join(bad_fields)} - requesting only those")
+    reask_messages = messages + [
+        {"role": "assistant", "content": result_text},
+        {"role": "user", "content": f"""Your JSON is missing or has invalid values for these fields: {', '.join(bad_fields)}.
+
+Return ONLY a JSON object containing just these keys, following this schema:
+{_describe_fields(schema, bad_fields)}"""}
+    ]
+    try:
+        if scheduler is not None:
+            scheduler.acquire()
+        response = create_chat_completion(client, model, reask_messages, temperature, scheduler=scheduler)
+        patch = repair_json(response.choices[0].message.content or "") or {}
+    except Exception as e:
+        if is_key_failure(error_status(e)):
+            # The agent must count this against the key and rotate - not record a success
+            raise
+        # Raising would make the agent discard the first response and re-run the full prompt
+        logger.warning(f"⚠️ Re-ask failed ({str(e)[:200]}) - keeping the first response")
+        patch = {}
+
+    clean, bad_fields = validate_output({**clean, **patch}, schema)
+    if bad_fields:
+        logger.error(f"❌ Fields still invalid after re-ask: {', '.join(bad_fields)}")
+        return {
+            "status": "error",
+            "error": f"Response failed validation for fields: {', '.join(bad_fields)}",
+            "error_type": "validation",
+            "raw_response": result_text[:500]
+        }
+
+    logger.info("✅ Missing fields recovered with targeted re-ask")
+    clean["status"] = "success"
+    return clean
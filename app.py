@@ -4,111 +4,265 @@ Complete 2-Agent Workflow Implementation
 """
 import streamlit as st
 import os
-import pandas as pd
 from datetime import datetime
 import json
-from dotenv import load_dotenv
+import uuid
+import time
 import logging
 
-# Try to import PDF/DOCX libraries (all optional)
-try:
-    import PyPDF2
-    HAS_PYPDF2 = True
-except ImportError:
-    HAS_PYPDF2 = False
+from utils.perf_budget import start_rerun_timer, last_run_ms
+from utils.routing_stats import routing_stats
+from utils.env import load_env
+from utils.trace_logging import configure_logging, new_trace
+from utils.profiler import BulkRunProfiler, profiling_enabled_by_env, memory_tracing_enabled_by_env
+from utils.text_extractor import available_backends
+from utils.request_scheduler import set_request_context, get_request_scheduler, token_meter, INTERACTIVE, BULK
+from utils.upload_spool import iter_extracted, maybe_purge_spool
+from utils.archive_ingest import iter_spooled_uploads, ARCHIVE_UPLOAD_TYPES
+from utils.ingest_cache import IngestLedger, job_fingerprint, NEW, CACHED, SKIPPED
+from utils.near_duplicates import NearDuplicateIndex, estimate_similarity, CLUSTER_THRESHOLD
+from utils.experience_calculator import compute_experience_years, experience_gate, OUT_OF_BAND
+from utils.skill_ontology import normalize_skill_text
+from utils.scoring_engine import DEFAULT_WEIGHTS, COMPONENTS
+from utils.candidate_table import CandidateTable
+from utils.batch_scheduler import BatchBudget, estimate_relevance, PROVISIONAL_NOTE
 
-try:
-    import pdfplumber
-    HAS_PDFPLUMBER = True
-except ImportError:
-    HAS_PDFPLUMBER = False
+rerun_timer = start_rerun_timer("app")
+load_env()
 
-try:
-    from docx import Document
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-
-load_dotenv()
-
-# Show warnings for missing libraries
-if not HAS_PYPDF2 and not HAS_PDFPLUMBER:
-    st.error("❌ No PDF library installed! Install with: pip install PyPDF2")
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+# Configure logging (structured JSON, per-resume traces - see utils/trace_logging.py)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Configure page
 st.set_page_config(page_title="AI Resume Analysis System", layout="wide", page_icon="🤖")
 
-# Create directories
-os.makedirs("data/uploads", exist_ok=True)
-os.makedirs("data/results", exist_ok=True)
 
-# Import modules
-from crew_setup import run_complete_analysis
+@st.cache_resource
+def setup_runtime():
+    """One-time process setup: data directories and extraction library check"""
+    os.makedirs("data/uploads", exist_ok=True)
+    os.makedirs("data/results", exist_ok=True)
+    maybe_purge_spool()
+    return available_backends()
+
+
+@st.cache_resource
+def get_key_manager():
+    """Shared API key manager, created once per process"""
+    from utils.api_key_manager import get_api_key_manager
+    return get_api_key_manager()
+
+
+backends = setup_runtime()
+
+# Show warnings for missing libraries
+if not backends["PyPDF2"] and not backends["pdfplumber"]:
+    st.error("❌ No PDF library installed! Install with: pip install PyPDF2")
 
 # No database - results stored in session only
 USE_CHROMADB = False
 
 
-def extract_text_from_file(uploaded_file):
-    """Extract text from PDF/DOCX/TXT files"""
-    try:
-        if uploaded_file.type == "application/pdf":
-            # Try PyPDF2 first
-            try:
-                pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() or ""
-                if text.strip():
-                    return text, True, None
-            except:
-                pass
-            
-            # Fallback to pdfplumber
-            try:
-                uploaded_file.seek(0)
-                with pdfplumber.open(uploaded_file) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        text += page.extract_text() or ""
-                if text.strip():
-                    return text, True, None
-            except:
-                pass
-            
-            return "", False, "Could not extract text from PDF"
+RESULTS_PAGE_SIZES = [10, 25, 50]
+
+
+def score_level(score):
+    """Map a confidence score to its colour emoji and match level"""
+    if score >= 80:
+        return "🟢", "Excellent"
+    elif score >= 60:
+        return "🟡", "Good"
+    elif score >= 40:
+        return "🟠", "Moderate"
+    return "🔴", "Poor"
+
+
+def add_result(entry):
+    """Store an analysed candidate and invalidate the cached ranking"""
+    st.session_state.all_results.append(entry)
+    st.session_state.results_version += 1
+
+
+def pending_inbox_results(job_key):
+    """Watch-folder results for this job that are not in the results list yet (file re-read only when it changes)"""
+    from utils.inbox_store import iter_results, results_stamp
+    
+    stamp = results_stamp()
+    cached = st.session_state.get("inbox_results")
+    if cached is None or cached[0] != stamp:
+        cached = st.session_state.inbox_results = (stamp, list(iter_results()) if stamp else [])
+    displayed = st.session_state.ingest_ledger.displayed
+    # Latest analysis per file
+    pending = {
+        entry["file_hash"]: entry for entry in cached[1]
+        if entry.get("job_key") == job_key and (entry.get("file_hash"), job_key) not in displayed
+    }
+    return list(pending.values())
+
+
+@st.cache_resource
+def get_semantic_index():
+    """Process-wide candidate embedding index (loads the embedding model once)"""
+    from utils.semantic_index import CandidateEmbeddingIndex, get_embedding_model
+    return CandidateEmbeddingIndex(get_embedding_model().get_sentence_embedding_dimension())
+
+
+def semantic_search(query_text=None, similar_to=None, k=10):
+    """Rank this session's candidates by embedding similarity to a text or another candidate"""
+    from utils.semantic_index import embed_texts, candidate_document
+    
+    index = get_semantic_index()
+    ledger = st.session_state.ingest_ledger
+    table = st.session_state.all_results
+    by_hash = {h: row for row, h in enumerate(table.column("file_hash")) if h}
+    
+    # Incremental insert: embed only candidates the index hasn't seen yet
+    missing = [h for h in by_hash if h not in index]
+    if missing:
+        documents = [candidate_document(table.row(by_hash[h]), ledger.parsed.get(h)) for h in missing]
+        index.add(missing, embed_texts(documents))
+    
+    query = index.vector(similar_to) if similar_to else embed_texts([query_text])[0]
+    hits = index.search(query, k=k, allowed_keys=by_hash.keys(), exclude=similar_to)
+    return [(table.row(by_hash[h]), similarity) for h, similarity in hits]
+
+
+def render_export(key, name, **filters):
+    """Export controls: the file is streamed to disk only when requested, then offered for download"""
+    from utils.result_export import export_results, EXPORT_FORMATS, PARQUET, has_pyarrow
+    
+    formats = [fmt for fmt in EXPORT_FORMATS if fmt != PARQUET or has_pyarrow()]
+    col_format, col_action = st.columns([1, 3])
+    with col_format:
+        export_format = st.selectbox("Export format", formats, key=f"{key}_format", label_visibility="collapsed")
+    
+    export_key = (st.session_state.results_version, export_format, tuple(sorted(filters.items())))
+    prepared = st.session_state.get(key)
+    with col_action:
+        if prepared is None or prepared[0] != export_key:
+            if st.button(f"📦 Prepare {export_format} Export", key=f"{key}_prepare"):
+                result = export_results(st.session_state.all_results, export_format, name, **filters)
+                if result["status"] != "success":
+                    st.error(f"❌ {result['error']}")
+                    return
+                # Only the latest export per tab is kept on disk
+                if prepared and os.path.exists(prepared[1]["path"]):
+                    os.remove(prepared[1]["path"])
+                prepared = st.session_state[key] = (export_key, result)
         
-        elif "wordprocessingml" in uploaded_file.type or uploaded_file.name.endswith(".docx"):
-            try:
-                doc = Document(uploaded_file)
-                text = "\n".join([para.text for para in doc.paragraphs])
-                if text.strip():
-                    return text, True, None
-                return "", False, "DOCX file is empty"
-            except Exception as e:
-                return "", False, f"Error reading DOCX: {str(e)}"
+        if prepared and prepared[0] == export_key and os.path.exists(prepared[1]["path"]):
+            result = prepared[1]
+            with open(result["path"], "rb") as f:
+                st.download_button(
+                    f"📥 Download {result['rows']} candidate(s)",
+                    f,
+                    os.path.basename(result["path"]),
+                    result["mime"],
+                    key=f"{key}_download"
+                )
+
+
+def rescore_results(weights, threshold):
+    """Re-score every stored candidate from its score components - one vectorized pass, no API calls"""
+    if st.session_state.all_results.rescore(weights, threshold):
+        st.session_state.results_version += 1
+
+
+def get_ranked_results():
+    """Row indices of the candidates (near-duplicates excluded) by score - re-sorted only after results change"""
+    version = st.session_state.results_version
+    cached = st.session_state.get("ranked_results")
+    if cached is None or cached[0] != version:
+        ranked = st.session_state.all_results.ranked()
+        st.session_state.ranked_results = (version, ranked)
+        return ranked
+    return cached[1]
+
+
+def render_candidate_card(rank, result):
+    """Render one candidate: summary metrics plus collapsible details"""
+    score = result.get("confidence_score", 0)
+    emoji, level = score_level(score)
+    
+    # Header for each candidate
+    if rank == 1:
+        st.markdown(f"## 🏆 Candidate #{rank} - BEST MATCH")
+    else:
+        st.markdown(f"## Candidate #{rank}")
+    
+    with st.container(border=True):
+        # Top metrics row
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Confidence Score", f"{score}%")
+            st.caption(f"{emoji} {level}")
+            if result.get("provisional"):
+                st.caption("⏳ Provisional - local estimate, not analyzed by the AI agents")
+            components = result.get("score_components")
+            if components:
+                st.caption(" · ".join(f"{name.title()} {components.get(name, 0):.0%}" for name in COMPONENTS))
+        with col2:
+            shortlisted = result.get("shortlisted", False)
+            st.metric("Shortlisted", "✅ Yes" if shortlisted else "❌ No")
+        with col3:
+            recommendation = result.get("recommendation", "N/A")
+            st.metric("Recommendation", recommendation[:30] + "..." if len(recommendation) > 30 else recommendation)
         
-        else:  # Text file
-            try:
-                text = uploaded_file.getvalue().decode("utf-8")
-                if text.strip():
-                    return text, True, None
-                return "", False, "Text file is empty"
-            except Exception as e:
-                return "", False, f"Error reading text file: {str(e)}"
+        with st.expander(f"👤 {result.get('name', 'Unknown')} - details", expanded=(rank == 1)):
+            col_left, col_right = st.columns(2)
+            
+            with col_left:
+                st.subheader("👤 Candidate Information")
+                skills = result.get('skills', [])
+                st.markdown(
+                    f"**Name:** {result.get('name', 'Unknown')}  \n"
+                    f"**Email:** {result.get('email', 'N/A')}  \n"
+                    f"**Phone:** {result.get('phone', 'N/A')}  \n"
+                    f"**Experience:** {result.get('experience_years', 0)} years\n\n"
+                    f"**Skills:**  \n{', '.join(skills) if skills else 'No skills extracted'}"
+                )
+            
+            with col_right:
+                st.subheader("💡 Key Insights")
+                strengths = "\n".join(f"- ✅ {strength}" for strength in result.get("key_strengths", []))
+                gaps = "\n".join(f"- ⚠️ {gap}" for gap in result.get("gaps", []))
+                st.markdown(f"**Strengths:**\n{strengths}\n\n**Gaps:**\n{gaps}")
+
+
+@st.fragment
+def render_candidate_results():
+    """Paginated candidate cards - widgets here rerun only this fragment"""
+    table = st.session_state.all_results
+    ranked = get_ranked_results()
+    
+    col_filter, col_size, col_page = st.columns(3)
+    with col_filter:
+        min_score = st.slider("Minimum Score", 0, 100, 0, key="results_min_score")
+    with col_size:
+        page_size = st.selectbox("Candidates per page", RESULTS_PAGE_SIZES, key="results_page_size")
+    
+    # Ranking is sorted by score, so the filter keeps a prefix of it
+    cutoff = int((table.scores[ranked] >= min_score).sum())
+    
+    if cutoff == 0:
+        st.info("No candidates match the current filter.")
+        return
+    
+    total_pages = (cutoff - 1) // page_size + 1
+    # Keep the stored page valid when the filter shrinks the result set
+    if st.session_state.get("results_page", 1) > total_pages:
+        st.session_state.results_page = total_pages
+    with col_page:
+        page = st.number_input("Page", min_value=1, max_value=total_pages, key="results_page")
     
-    except Exception as e:
-        return "", False, f"Unexpected error: {str(e)}"
+    start = (page - 1) * page_size
+    end = min(start + page_size, cutoff)
+    st.caption(f"Showing candidates {start + 1}-{end} of {cutoff}")
+    
+    for rank in range(start + 1, end + 1):
+        render_candidate_card(rank, table.row(ranked[rank - 1]))
+        st.divider()
 
 
 # Initialize session state
@@ -119,7 +273,28 @@ if 'current_analysis' not in st.session_state:
 
 # No database - use session state only
 if 'all_results' not in st.session_state:
-    st.session_state.all_results = []
+    st.session_state.all_results = CandidateTable()
+elif isinstance(st.session_state.all_results, list):
+    # Session started before results were stored column-wise
+    st.session_state.all_results = CandidateTable.from_records(st.session_state.all_results)
+if 'results_version' not in st.session_state:
+    st.session_state.results_version = 0
+if 'ingest_ledger' not in st.session_state:
+    st.session_state.ingest_ledger = IngestLedger()
+if 'dedupe_index' not in st.session_state:
+    st.session_state.dedupe_index = NearDuplicateIndex()
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'upload_batch' not in st.session_state:
+    st.session_state.upload_batch = []
+if 'uploader_key' not in st.session_state:
+    st.session_state.uploader_key = 0
+if 'indexed_uploads' not in st.session_state:
+    st.session_state.indexed_uploads = set()
+if 'local_experience' not in st.session_state:
+    st.session_state.local_experience = {}
+if 'relevance_estimates' not in st.session_state:
+    st.session_state.relevance_estimates = {}
 
 # App title
 st.title("🤖 AI-Powered Resume Analysis System")
@@ -168,17 +343,95 @@ with st.sidebar:
         help="Candidates above this score will be shortlisted"
     )
     
+    with st.expander("⚖️ Scoring Weights"):
+        st.caption("Scores are computed locally - changing weights re-ranks instantly without API calls")
+        scoring_weights = {
+            "skills": st.slider("Skills", 0, 100, DEFAULT_WEIGHTS["skills"], key="weight_skills"),
+            "experience": st.slider("Experience", 0, 100, DEFAULT_WEIGHTS["experience"], key="weight_experience"),
+            "education": st.slider("Education", 0, 100, DEFAULT_WEIGHTS["education"], key="weight_education"),
+            "achievements": st.slider("Achievements", 0, 100, DEFAULT_WEIGHTS["achievements"], key="weight_achievements"),
+        }
+    
+    # Re-rank stored candidates when weights or the threshold change
+    scoring_key = (tuple(scoring_weights.values()), shortlist_threshold)
+    if st.session_state.get("scoring_key") != scoring_key:
+        st.session_state.scoring_key = scoring_key
+        rescore_results(scoring_weights, shortlist_threshold)
+    
+    escalation_band = st.number_input(
+        "Escalation Band (± points)",
+        min_value=0,
+        max_value=50,
+        value=10,
+        help="Candidates whose score is within this distance of the shortlist threshold get their analysis from the large model"
+    )
+    
+    experience_gate_mode = st.selectbox(
+        "Experience Pre-Gate",
+        ["Off", "Deprioritize", "Skip"],
+        help="Uses experience computed locally from resume dates. Candidates far outside the Min/Max band are analyzed last (Deprioritize) or not sent to the LLM at all (Skip)"
+    )
+    experience_tolerance = st.number_input(
+        "Pre-Gate Tolerance (years)",
+        min_value=0.0,
+        max_value=10.0,
+        value=2.0,
+        step=0.5,
+        disabled=experience_gate_mode == "Off"
+    )
+    
     st.divider()
     
     # Statistics
     st.subheader("📊 Statistics")
-    total = len(st.session_state.all_results)
-    shortlisted = sum(1 for r in st.session_state.all_results if r.get("shortlisted", False))
-    avg_score = sum(r.get("confidence_score", 0) for r in st.session_state.all_results) / max(total, 1) if total > 0 else 0
+    # Running aggregates of the candidate table - no scan per rerun
+    stats = st.session_state.all_results.stats()
+    total = stats["total"]
     
     st.metric("Total Analyzed", total)
-    st.metric("Shortlisted", shortlisted)
-    st.metric("Avg Score", f"{round(avg_score, 1)}%")
+    st.metric("Shortlisted", stats["shortlisted"])
+    st.metric("Avg Score", f"{round(stats['avg_score'], 1)}%")
+    
+    if total > 0 and st.button("🗑️ Clear Results", use_container_width=True):
+        # Stored analyses stay in the ledger, so re-running the same files is served from cache
+        st.session_state.all_results = CandidateTable()
+        st.session_state.results_version += 1
+        st.session_state.ingest_ledger.displayed.clear()
+        st.rerun()
+    
+    stats = routing_stats.summary()
+    if stats["candidates"]:
+        with st.expander("🧭 Model Routing"):
+            st.write(f"**Escalation rate:** {stats['escalation_rate']:.0%} of {stats['candidates']} candidates")
+            for tier in ("small", "large"):
+                latency = stats["avg_latency_s"][tier]
+                st.write(f"**{tier.title()} model:** {stats['calls'][tier]} calls, avg {latency if latency is not None else '-'} s")
+            st.caption(", ".join(f"{reason}: {count}" for reason, count in stats["escalations"].items()))
+            queue = get_request_scheduler().summary()
+            waits = queue["avg_wait_s"]
+            st.caption(f"Rate-limit queue: {queue['queued']} waiting, avg wait interactive {waits[INTERACTIVE] or 0} s / bulk {waits[BULK] or 0} s")
+            benched = [key for key in get_key_manager().summary() if key["state"] != "closed"]
+            if benched:
+                st.caption("Benched API keys: " + ", ".join(
+                    f"{key['key']} (HTTP {key['last_status']}, retry in {key['retry_in_s']} s)" for key in benched
+                ))
+    
+    with st.expander("🔬 Profiling"):
+        profile_runs = st.toggle(
+            "Profile bulk runs",
+            value=profiling_enabled_by_env(),
+            help="Samples the Python stack of this session's Analyze run and writes a collapsed-stack flame graph to data/results"
+        )
+        profile_memory = st.checkbox(
+            "Track allocations (much slower)",
+            value=memory_tracing_enabled_by_env(),
+            help="Adds a tracemalloc top-allocations report"
+        )
+        profile_slot = st.container()
+    
+    previous_run = last_run_ms("app")
+    if previous_run is not None:
+        st.caption(f"⏱️ Last page run: {previous_run:.0f} ms")
 
 # Main tabs
 tab1, tab2, tab3 = st.tabs([
@@ -191,132 +444,396 @@ tab1, tab2, tab3 = st.tabs([
 with tab1:
     st.header("Step 1: Upload Resumes")
     
-    uploaded_files = st.file_uploader(
-        "Upload Resumes (PDF, DOCX, or TXT)",
-        type=["pdf", "docx", "txt"],
+    new_uploads = st.file_uploader(
+        "Upload Resumes (PDF, DOCX, TXT, or a ZIP / tar.gz of them)",
+        type=["pdf", "docx", "txt"] + ARCHIVE_UPLOAD_TYPES,
         accept_multiple_files=True,
-        help="Upload multiple resumes for bulk AI analysis (up to 100 files)"
+        help="Upload resumes for bulk AI analysis - archives are unpacked one file at a time",
+        key=f"resume_uploader_{st.session_state.uploader_key}"
     )
     
+    # Spool uploads (and archive members) to data/uploads and reset the widget so the in-memory copies are released
+    if new_uploads:
+        skipped_members = []
+        unpack_status = st.empty()
+        with st.spinner("Saving uploads..."):
+            for count, spooled in enumerate(iter_spooled_uploads(new_uploads, skipped=skipped_members), 1):
+                st.session_state.upload_batch.append(spooled)
+                if count % 50 == 0:
+                    unpack_status.text(f"📦 {count} resume(s) saved...")
+        if skipped_members:
+            st.session_state.archive_skipped = skipped_members
+        st.session_state.uploader_key += 1
+        st.rerun()
+    
+    skipped_members = st.session_state.pop("archive_skipped", None)
+    if skipped_members:
+        with st.expander(f"⚠️ {len(skipped_members)} file(s) skipped"):
+            for member_name, reason in skipped_members[:200]:
+                st.write(f"• {member_name} - {reason}")
+    
+    uploaded_files = st.session_state.upload_batch
+    if uploaded_files and st.button(f"🗑️ Clear {len(uploaded_files)} uploaded file(s)"):
+        st.session_state.upload_batch = []
+        st.rerun()
+    
+    # Canonical skill names, so "k8s, AWS" and "Kubernetes, Amazon Web Services" share a cache key
+    job_requirements = {
+        "job_title": job_title,
+        "required_skills": normalize_skill_text(required_skills),
+        "required_experience_years": required_experience,
+        "min_experience": min_experience,
+        "max_experience": max_experience,
+        "nice_to_have": normalize_skill_text(nice_to_have)
+    }
+    job_key = job_fingerprint(job_requirements)
+    ledger = st.session_state.ingest_ledger
+    
     if uploaded_files:
-        st.info(f"📊 **{len(uploaded_files)} resume(s) selected**")
+        # Fingerprint uploads as they arrive (each file is hashed only once)
+        batch_plan = ledger.plan(uploaded_files, job_key)
+        new_count = sum(1 for action, _, _ in batch_plan if action == NEW)
+        st.info(f"📊 **{len(uploaded_files)} resume(s) selected** - {new_count} new, {len(batch_plan) - new_count} already analyzed for this job")
+        
+        # Extract and index new uploads for near-duplicate detection. Texts are not kept:
+        # only MinHash signatures and experience years stay in the session.
+        dedupe = st.session_state.dedupe_index
+        indexed_uploads = st.session_state.indexed_uploads
+        local_experience = st.session_state.local_experience
+        to_index = [
+            uploaded_file for action, uploaded_file, file_hash in batch_plan
+            if action == NEW and file_hash not in indexed_uploads
+        ]
+        
+        def flush_experience(extracted):
+            # Experience from resume dates, computed a chunk at a time
+            years = compute_experience_years([text for _, text in extracted])
+            for (file_hash, _), value in zip(extracted, years):
+                local_experience[file_hash] = None if value != value else float(value)
+            extracted.clear()
+        
+        newly_extracted = []
+        index_progress = st.progress(0.0, text=f"Reading {len(to_index)} new resume(s)...") if len(to_index) > 20 else None
+        for done, (uploaded_file, (text, success, _)) in enumerate(iter_extracted(to_index), 1):
+            indexed_uploads.add(uploaded_file.file_hash)
+            if index_progress is not None and done % 10 == 0:
+                index_progress.progress(done / len(to_index), text=f"Reading new resumes: {done}/{len(to_index)}")
+            if success:
+                dedupe.add(uploaded_file.file_hash, text, uploaded_file.name)
+                newly_extracted.append((uploaded_file.file_hash, text))
+                if len(newly_extracted) >= 64:
+                    flush_experience(newly_extracted)
+        if newly_extracted:
+            flush_experience(newly_extracted)
+        if index_progress is not None:
+            index_progress.empty()
+        
+        near_duplicates = sum(
+            1 for action, _, file_hash in batch_plan
+            if action == NEW and file_hash in dedupe and dedupe.neighbours(file_hash)
+        )
+        if near_duplicates:
+            st.warning(f"🔁 {near_duplicates} resume(s) look like near-duplicates of other resumes - see the All Candidates tab")
     
     if uploaded_files:
+        with st.expander("⏱️ Deadline & Token Budget"):
+            col_deadline, col_tokens = st.columns(2)
+            with col_deadline:
+                deadline_minutes = st.number_input(
+                    "Finish within (minutes, 0 = no deadline)", min_value=0, max_value=600,
+                    value=int(os.getenv("BATCH_DEADLINE_MINUTES", "0"))
+                )
+            with col_tokens:
+                token_budget = st.number_input(
+                    "Token budget (0 = unlimited)", min_value=0, step=10000,
+                    value=int(os.getenv("BATCH_TOKEN_BUDGET", "0"))
+                )
+            st.caption("With a deadline or budget, resumes are analyzed best-first by a local relevance estimate; "
+                       "those left when it runs out keep a provisional local score")
+        
         if st.button("🚀 Analyze All Resumes", type="primary", use_container_width=True):
-            # Bulk processing
-            total_files = len(uploaded_files)
-            progress_bar = st.progress(0)
-            status_text = st.empty()
+            # Sampled on this thread only; finally stops the sampler even on st.rerun / st.stop or an error
+            profiler = BulkRunProfiler("analyze", trace_memory=profile_memory).start() if profile_runs else None
+            try:
+                # Agent pipeline (and the openai SDK) is only imported when work starts
+                from crew_setup import run_complete_analysis
+                get_key_manager()
+            
+                # This session's API calls share the key pool fairly with other recruiters;
+                # a single resume is interactive and jumps ahead of bulk batches
+                new_files = sum(1 for action, _, _ in batch_plan if action == NEW)
+                set_request_context(st.session_state.session_id, INTERACTIVE if new_files <= 1 else BULK)
+            
+                # Experience pre-gate: candidates far outside the band go last or are not sent to the LLM
+                gated = set()
+                if experience_gate_mode != "Off":
+                    new_hashes = [file_hash for action, _, file_hash in batch_plan if action == NEW]
+                    years = [local_experience.get(file_hash) for file_hash in new_hashes]
+                    gate = experience_gate(
+                        [float("nan") if value is None else value for value in years],
+                        min_experience, max_experience, experience_tolerance
+                    )
+                    gated = {file_hash for file_hash, outcome in zip(new_hashes, gate) if outcome == OUT_OF_BAND}
+                    if experience_gate_mode == "Deprioritize":
+                        batch_plan = sorted(batch_plan, key=lambda item: item[2] in gated)
+            
+                # Deadline / token budget: best-first by a cheap local relevance estimate
+                budget = None
+                if deadline_minutes or token_budget:
+                    budget = BatchBudget(deadline_minutes * 60, token_budget)
+                    estimates = st.session_state.relevance_estimates
+                    to_estimate = [
+                        uploaded_file for action, uploaded_file, file_hash in batch_plan
+                        if action == NEW and (file_hash, job_key) not in estimates
+                    ]
+                    if to_estimate:
+                        with st.spinner(f"Ranking {len(to_estimate)} resume(s) by local relevance..."):
+                            for file_hash, score in estimate_relevance(to_estimate, job_requirements, local_experience, scoring_weights).items():
+                                estimates[(file_hash, job_key)] = score
+                    # Cached results first (no API calls), then new resumes, most relevant first
+                    deprioritized = gated if experience_gate_mode == "Deprioritize" else set()
+                    batch_plan = sorted(
+                        batch_plan,
+                        key=lambda item: (item[0] == NEW, item[2] in deprioritized, -estimates.get((item[2], job_key), 0))
+                    )
+            
+                # Bulk processing
+                total_files = len(batch_plan)
+                progress_bar = st.progress(0)
+                status_text = st.empty()
             
-            successful = 0
-            failed = 0
-            failed_files = []
+                successful = 0
+                cached = 0
+                reused = 0
+                out_of_band = 0
+                skipped = 0
+                provisional = 0
+                failed = 0
+                failed_files = []
+                leaderboard = st.empty()
             
-            for idx, uploaded_file in enumerate(uploaded_files):
-                result = None
-                status_text.text(f"Processing {idx + 1}/{total_files}: {uploaded_file.name}")
+                # Texts are extracted ahead of the LLM calls through a bounded queue, in plan order
+                to_extract = [
+                    uploaded_file for action, uploaded_file, file_hash in batch_plan
+                    if action == NEW and not (experience_gate_mode == "Skip" and file_hash in gated)
+                ]
+                extracted_texts = iter_extracted(to_extract)
+            
+                def report_progress(done):
+                    progress_bar.progress(done / total_files)
+                    status_text.text(f"Processed {successful} | Cached {cached} | Near-duplicates {reused} | Out of experience band {out_of_band} | Skipped {skipped} | Provisional {provisional} | Failed {failed} - {done}/{total_files}")
+            
+                def show_leaderboard():
+                    # Best-first runs stream the current top candidates while the batch continues
+                    table = st.session_state.all_results
+                    names = table.column("name")
+                    top = "  \n".join(f"{rank}. {names[row]} - {table.scores[row]:.1f}%" for rank, row in enumerate(table.ranked()[:5], 1))
+                    leaderboard.info(f"**🏁 Top candidates so far** ({budget.describe()})  \n{top}")
+            
+                for idx, (action, uploaded_file, file_hash) in enumerate(batch_plan):
+                    result = None
+                    new_trace(uploaded_file.name, file_hash)
                 
-                # Extract text
-                resume_text, success, error = extract_text_from_file(uploaded_file)
+                    if action == SKIPPED:
+                        skipped += 1
+                        report_progress(idx + 1)
+                        continue
                 
-                if not success:
-                    st.error(f"❌ {uploaded_file.name}: {error}")
-                    failed += 1
-                    failed_files.append(f"{uploaded_file.name} - {error}")
-                    progress_bar.progress((idx + 1) / total_files)
-                    continue
+                    if action == CACHED:
+                        entry = dict(ledger.cached_entry(file_hash, job_key))
+                        entry["shortlisted"] = entry.get("confidence_score", 0) >= shortlist_threshold
+                        add_result(entry)
+                        cached += 1
+                        report_progress(idx + 1)
+                        continue
                 
-                st.info(f"✅ Extracted {len(resume_text)} characters from {uploaded_file.name}")
+                    if experience_gate_mode == "Skip" and file_hash in gated:
+                        logger.info(f"⏭️ {uploaded_file.name}: {local_experience[file_hash]} years is outside {required_experience} - not analyzed")
+                        out_of_band += 1
+                        report_progress(idx + 1)
+                        continue
                 
-                # Run 2-agent workflow
-                with st.spinner(f"🤖 Analyzing {uploaded_file.name}..."):
-                    job_requirements = {
-                        "job_title": job_title,
-                        "required_skills": required_skills,
-                        "required_experience_years": required_experience,
-                        "min_experience": min_experience,
-                        "max_experience": max_experience,
-                        "nice_to_have": nice_to_have
-                    }
-                    
-                    try:
-                        result = run_complete_analysis(resume_text, job_requirements)
-                    except Exception as e:
-                        st.error(f"❌ {uploaded_file.name}: Analysis error - {str(e)}")
+                    # Every NEW file still in the plan takes its text from the pipeline, in order
+                    # (once the budget has run out no more texts are needed)
+                    if budget is None or not budget.stop_reason:
+                        _, (resume_text, success, error) = next(extracted_texts)
+                
+                    # Near-duplicate of a resume already analyzed for this job - reuse its analysis
+                    match = None
+                    if file_hash in dedupe:
+                        match = dedupe.best_match(file_hash, accept=lambda other: (other, job_key) in ledger.analyzed)
+                    if match:
+                        original_hash, similarity = match
+                        entry = dict(ledger.analyzed[(original_hash, job_key)])
+                        entry.update({
+                            "resume_file": uploaded_file.name,
+                            "file_hash": file_hash,
+                            "duplicate_of": entry["resume_file"],
+                            # The original carries the shortlist; counting the copy too would inflate it
+                            "shortlisted": False
+                        })
+                        add_result(entry)
+                        ledger.record(file_hash, job_key, entry)
+                        logger.info(f"🔁 {uploaded_file.name} is a near-duplicate ({similarity:.0%}) of {entry['duplicate_of']} - reusing analysis")
+                        reused += 1
+                        report_progress(idx + 1)
+                        continue
+                
+                    # Deadline / token budget reached: keep the local estimate, clearly marked
+                    if budget is not None and not budget.can_start():
+                        add_result({
+                            "name": os.path.splitext(uploaded_file.name)[0],
+                            "email": "",
+                            "phone": "N/A",
+                            "experience_years": local_experience.get(file_hash) or 0,
+                            "skills": [],
+                            "confidence_score": round(st.session_state.relevance_estimates.get((file_hash, job_key), 0), 1),
+                            "shortlisted": False,
+                            "key_strengths": [],
+                            "gaps": [],
+                            "recommendation": PROVISIONAL_NOTE,
+                            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                            "resume_file": uploaded_file.name,
+                            "file_hash": file_hash,
+                            "provisional": True
+                        })
+                        provisional += 1
+                        report_progress(idx + 1)
+                        continue
+                
+                    status_text.text(f"Processing {idx + 1}/{total_files}: {uploaded_file.name}")
+                
+                    if not success:
+                        st.error(f"❌ {uploaded_file.name}: {error}")
                         failed += 1
-                        failed_files.append(f"{uploaded_file.name} - Analysis error: {str(e)}")
-                        progress_bar.progress((idx + 1) / total_files)
+                        failed_files.append(f"{uploaded_file.name} - {error}")
+                        report_progress(idx + 1)
                         continue
                 
-                if result and result.get("status") == "success":
-                    logger.info("✅ Analysis completed successfully")
-                    
-                    parsed = result["parsed_resume"]
-                    analysis = result["analysis"]
+                    st.info(f"✅ Extracted {len(resume_text)} characters from {uploaded_file.name}")
+                
+                    # Run 2-agent workflow
+                    with st.spinner(f"🤖 Analyzing {uploaded_file.name}..."):
+                        try:
+                            analysis_started = time.perf_counter()
+                            with token_meter() as meter:
+                                result = run_complete_analysis(
+                                    resume_text,
+                                    job_requirements,
+                                    parsed_resume=ledger.parsed.get(file_hash),
+                                    experience_years=local_experience.get(file_hash),
+                                    shortlist_threshold=shortlist_threshold,
+                                    escalation_band=escalation_band,
+                                    weights=scoring_weights
+                                )
+                            if budget is not None:
+                                budget.record(time.perf_counter() - analysis_started, meter.tokens)
+                        except Exception as e:
+                            st.error(f"❌ {uploaded_file.name}: Analysis error - {str(e)}")
+                            failed += 1
+                            failed_files.append(f"{uploaded_file.name} - Analysis error: {str(e)}")
+                            report_progress(idx + 1)
+                            continue
+                
+                    if result and result.get("status") == "success":
+                        parsed = result["parsed_resume"]
+                        analysis = result["analysis"]
                     
-                    logger.info(f"Parsed candidate: {parsed.get('name', 'Unknown')}")
-                    logger.info(f"Skills extracted: {len(parsed.get('skills', []))} skills")
-                    logger.info(f"Skills: {parsed.get('skills', [])}")
-                    logger.info(f"Confidence score: {analysis.get('confidence_score', 0)}%")
-                    logger.info(f"Strengths: {analysis.get('key_strengths', [])}")
-                    logger.info(f"Gaps: {analysis.get('gaps', [])}")
+                        # Full field dumps only at DEBUG - building these strings per resume is not free
+                        if logger.isEnabledFor(logging.DEBUG):
+                            logger.debug("Analysis detail", extra={"fields": {
+                                "candidate": parsed.get("name", "Unknown"),
+                                "skills": parsed.get("skills", []),
+                                "key_strengths": analysis.get("key_strengths", []),
+                                "gaps": analysis.get("gaps", []),
+                            }})
                     
-                    # Save to session state with FULL data
-                    st.session_state.all_results.append({
-                        "name": parsed.get("name", "Unknown"),
-                        "email": parsed.get("email", ""),
-                        "phone": parsed.get("phone", "N/A"),
-                        "experience_years": parsed.get("experience_years", 0),
-                        "skills": parsed.get("skills", []),
-                        "confidence_score": analysis.get("confidence_score", 0),
-                        "shortlisted": analysis.get("confidence_score", 0) >= shortlist_threshold,
-                        "key_strengths": analysis.get("key_strengths", []),
-                        "gaps": analysis.get("gaps", []),
-                        "recommendation": analysis.get("recommendation", "N/A"),
-                        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
-                        "resume_file": uploaded_file.name
-                    })
+                        # Save to session state with FULL data
+                        entry = {
+                            "name": parsed.get("name", "Unknown"),
+                            "email": parsed.get("email", ""),
+                            "phone": parsed.get("phone", "N/A"),
+                            "experience_years": parsed.get("experience_years", 0),
+                            "skills": parsed.get("skills", []),
+                            "confidence_score": analysis.get("confidence_score", 0),
+                            "shortlisted": analysis.get("confidence_score", 0) >= shortlist_threshold,
+                            "key_strengths": analysis.get("key_strengths", []),
+                            "gaps": analysis.get("gaps", []),
+                            "recommendation": analysis.get("recommendation", "N/A"),
+                            "score_components": analysis.get("score_components", {}),
+                            "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                            "resume_file": uploaded_file.name,
+                            "file_hash": file_hash
+                        }
+                        add_result(entry)
+                        ledger.record(file_hash, job_key, entry, parsed_resume=parsed)
                     
-                    # Store last analysis
-                    st.session_state.current_analysis = {
-                        "parsed": parsed,
-                        "analysis": analysis,
-                        "resume_name": uploaded_file.name
-                    }
+                        # Store last analysis
+                        st.session_state.current_analysis = {
+                            "parsed": parsed,
+                            "analysis": analysis,
+                            "resume_name": uploaded_file.name
+                        }
                     
-                    successful += 1
-                    st.success(f"✅ {uploaded_file.name} - Analysis complete!")
-                    logger.info("✅ ANALYSIS COMPLETE!")
-                else:
-                    error_msg = result.get('error', 'Unknown error') if result else 'No result returned'
-                    st.error(f"❌ {uploaded_file.name}: {error_msg}")
-                    logger.error(f"❌ Analysis failed: {error_msg}")
-                    failed += 1
-                    failed_files.append(f"{uploaded_file.name} - {error_msg}")
+                        successful += 1
+                        st.success(f"✅ {uploaded_file.name} - Analysis complete!")
+                        if budget is not None:
+                            show_leaderboard()
+                        logger.info("✅ Analysis complete", extra={"fields": {"confidence_score": entry["confidence_score"]}})
+                    else:
+                        error_msg = result.get('error', 'Unknown error') if result else 'No result returned'
+                        st.error(f"❌ {uploaded_file.name}: {error_msg}")
+                        logger.error(f"❌ Analysis failed: {error_msg}")
+                        failed += 1
+                        failed_files.append(f"{uploaded_file.name} - {error_msg}")
+                        # Agent 1 output is still reusable if only the analysis failed
+                        if result and result.get("parsed_data"):
+                            ledger.parsed[file_hash] = result["parsed_data"]
                 
-                # Update progress
-                progress_bar.progress((idx + 1) / total_files)
+                    # Update progress
+                    report_progress(idx + 1)
+            
+                # Stop the extraction pipeline if the budget ended the run early
+                extracted_texts.close()
+            
+                # Cached and reused entries were scored with the weights of their time
+                if cached or reused:
+                    rescore_results(scoring_weights, shortlist_threshold)
             
-            # Final summary
-            progress_bar.progress(1.0)
-            status_text.success(f"✅ Bulk processing complete!")
+                # Final summary
+                progress_bar.progress(1.0)
+                status_text.success(f"✅ Bulk processing complete!")
             
-            if successful > 0:
-                st.success(f"""
-                **Processing Summary:**
-                - ✅ Successful: {successful}
-                - ❌ Failed: {failed}
-                - 📊 Total: {total_files}
-                """)
+                if successful + cached + reused + out_of_band + skipped + provisional > 0:
+                    st.success(f"""
+                    **Processing Summary:**
+                    - ✅ Processed: {successful}
+                    - ♻️ Cached: {cached}
+                    - 🔁 Near-duplicates (analysis reused): {reused}
+                    - 📅 Outside experience band (not analyzed): {out_of_band}
+                    - ⏭️ Skipped (already analyzed): {skipped}
+                    - ⏳ Provisional (local estimate only): {provisional}
+                    - ❌ Failed: {failed}
+                    - 📊 Total: {total_files}
+                    """)
             
-            if failed > 0:
-                st.error(f"**Failed Resumes ({failed}):**")
-                for failed_file in failed_files:
-                    st.write(f"• {failed_file}")
+                if provisional:
+                    st.warning(f"⏳ The {budget.stop_reason} was reached: {provisional} resume(s) show a provisional local score. "
+                               "Run Analyze again to continue with them.")
             
-            logger.info("=" * 80)
-            logger.info(f"BULK PROCESSING COMPLETE: {successful} successful, {failed} failed")
-            logger.info("=" * 80)
+                if failed > 0:
+                    st.error(f"**Failed Resumes ({failed}):**")
+                    for failed_file in failed_files:
+                        st.write(f"• {failed_file}")
+            
+                new_trace()
+                logger.info("Bulk processing complete", extra={"fields": {
+                    "processed": successful, "cached": cached, "near_duplicates": reused,
+                    "out_of_band": out_of_band, "skipped": skipped, "provisional": provisional, "failed": failed
+                }})
+            finally:
+                if profiler is not None:
+                    st.session_state.analyze_profile_outputs = profiler.stop()
     
     # Display ALL results after bulk processing - FULL DETAILED VIEW FOR EACH
     if st.session_state.all_results:
@@ -337,79 +854,7 @@ with tab1:
         
         st.divider()
         
-        # Sort by score
-        sorted_results = sorted(st.session_state.all_results, key=lambda x: x.get("confidence_score", 0), reverse=True)
-        
-        # Display each candidate with full details
-        for idx, result in enumerate(sorted_results):
-            score = result.get("confidence_score", 0)
-            
-            # Color coding
-            if score >= 80:
-                emoji = "🟢"
-                level = "Excellent"
-            elif score >= 60:
-                emoji = "🟡"
-                level = "Good"
-            elif score >= 40:
-                emoji = "🟠"
-                level = "Moderate"
-            else:
-                emoji = "🔴"
-                level = "Poor"
-            
-            # Header for each candidate
-            if idx == 0:
-                st.markdown(f"## 🏆 Candidate #{idx + 1} - BEST MATCH")
-            else:
-                st.markdown(f"## Candidate #{idx + 1}")
-            
-            with st.container(border=True):
-                # Top metrics row
-                col1, col2, col3 = st.columns(3)
-                with col1:
-                    st.metric("Confidence Score", f"{score}%")
-                    st.caption(f"{emoji} {level}")
-                with col2:
-                    shortlisted = result.get("shortlisted", False)
-                    st.metric("Shortlisted", "✅ Yes" if shortlisted else "❌ No")
-                with col3:
-                    recommendation = result.get("recommendation", "N/A")
-                    st.metric("Recommendation", recommendation[:30] + "..." if len(recommendation) > 30 else recommendation)
-                
-                st.divider()
-                
-                # Detailed information
-                col_left, col_right = st.columns(2)
-                
-                with col_left:
-                    st.subheader("👤 Candidate Information")
-                    st.write(f"**Name:** {result.get('name', 'Unknown')}")
-                    st.write(f"**Email:** {result.get('email', 'N/A')}")
-                    st.write(f"**Phone:** {result.get('phone', 'N/A')}")
-                    st.write(f"**Experience:** {result.get('experience_years', 0)} years")
-                    
-                    st.write("")
-                    st.write("**Skills:**")
-                    skills = result.get('skills', [])
-                    if skills:
-                        st.write(", ".join(skills))
-                    else:
-                        st.write("No skills extracted")
-                
-                with col_right:
-                    st.subheader("💡 Key Insights")
-                    
-                    st.write("**Strengths:**")
-                    for strength in result.get("key_strengths", []):
-                        st.write(f"✅ {strength}")
-                    
-                    st.write("")
-                    st.write("**Gaps:**")
-                    for gap in result.get("gaps", []):
-                        st.write(f"⚠️ {gap}")
-            
-            st.divider()
+        render_candidate_results()
     
     # Display single result (for backward compatibility)
     elif st.session_state.current_analysis:
@@ -421,18 +866,7 @@ with tab1:
         
         # Score display
         score = analysis.get("confidence_score", 0)
-        if score >= 80:
-            color = "🟢"
-            level = "Excellent"
-        elif score >= 60:
-            color = "🟡"
-            level = "Good"
-        elif score >= 40:
-            color = "🟠"
-            level = "Moderate"
-        else:
-            color = "🔴"
-            level = "Poor"
+        color, level = score_level(score)
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -477,31 +911,97 @@ with tab1:
 with tab2:
     st.header("👥 All Analyzed Candidates")
     
-    if st.session_state.all_results:
-        df = pd.DataFrame(st.session_state.all_results)
+    inbox_entries = pending_inbox_results(job_key)
+    if inbox_entries and st.button(
+        f"📥 Load {len(inbox_entries)} new inbox result(s)",
+        help="Resumes analyzed for this job by the watch-folder daemon (scripts/watch_inbox.py)"
+    ):
+        ledger = st.session_state.ingest_ledger
+        for stored in inbox_entries:
+            entry = {key: value for key, value in stored.items() if key not in ("job_key", "job_title", "source")}
+            add_result(entry)
+            ledger.record(entry["file_hash"], job_key, entry)
+        # The daemon scored with the default weights and its own threshold
+        rescore_results(scoring_weights, shortlist_threshold)
+        st.rerun()
+    
+    table = st.session_state.all_results
+    if table:
+        import pandas as pd
         
         # Filters
-        col1, col2 = st.columns(2)
+        col1, col2, col3 = st.columns(3)
         with col1:
             min_score = st.slider("Minimum Score", 0, 100, 0)
         with col2:
             show_shortlisted = st.checkbox("Show only shortlisted")
+        with col3:
+            hide_duplicates = st.checkbox("Hide near-duplicates", value=True)
         
-        # Apply filters
-        filtered_df = df[df["confidence_score"] >= min_score]
-        if show_shortlisted:
-            filtered_df = filtered_df[filtered_df["shortlisted"] == True]
+        # Apply filters (vectorized mask over the cached frame)
+        filtered_df = table.frame(table.mask(min_score, show_shortlisted, hide_duplicates))
         
         st.dataframe(filtered_df, use_container_width=True)
         
-        # Download
-        csv = filtered_df.to_csv(index=False)
-        st.download_button(
-            "📥 Download CSV",
-            csv,
-            f"candidates_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            "text/csv"
+        # Download (same filters, streamed from the stored results)
+        render_export(
+            "export_all", "candidates",
+            min_score=min_score, shortlisted_only=show_shortlisted, hide_duplicates=hide_duplicates
         )
+        
+        # Semantic search over candidate profiles
+        st.subheader("🔎 Semantic Search")
+        hashes = table.column("file_hash")
+        names = table.column("name")
+        resume_files = table.column("resume_file")
+        searchable = [row for row in (~table.duplicates).nonzero()[0] if hashes[row]]
+        col_mode, col_k = st.columns([3, 1])
+        with col_mode:
+            search_mode = st.radio("Search by", ["Free text", "Similar to candidate"], horizontal=True, key="semantic_mode")
+        with col_k:
+            top_k = st.number_input("Results", min_value=1, max_value=100, value=10, key="semantic_k")
+        
+        query_text = None
+        similar_to = None
+        if search_mode == "Free text":
+            query_text = st.text_input("Describe the candidate", placeholder="backend engineer with payments experience", key="semantic_query")
+        elif searchable:
+            labels = {hashes[row]: f"{names[row]} ({resume_files[row] or ''})" for row in searchable}
+            similar_to = st.selectbox("Candidate", list(labels), format_func=labels.get, key="semantic_similar")
+        
+        if st.button("🔎 Search", disabled=not (query_text or similar_to)):
+            try:
+                with st.spinner("Searching..."):
+                    hits = semantic_search(query_text=query_text, similar_to=similar_to, k=int(top_k))
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            "similarity": round(similarity, 3),
+                            "name": hit.get("name"),
+                            "confidence_score": hit.get("confidence_score"),
+                            "experience_years": hit.get("experience_years"),
+                            "resume_file": hit.get("resume_file"),
+                        }
+                        for hit, similarity in hits
+                    ]),
+                    use_container_width=True
+                )
+            except ImportError:
+                st.warning("Semantic search needs sentence-transformers: pip install sentence-transformers")
+        
+        # Near-duplicate clusters (same person / lightly edited CVs)
+        dedupe = st.session_state.dedupe_index
+        clusters = dedupe.clusters()
+        if clusters:
+            st.subheader(f"🔁 Near-Duplicate Clusters ({len(clusters)})")
+            for members in clusters:
+                first = members[0]
+                similar = ", ".join(
+                    f"{dedupe.labels[other]} ({estimate_similarity(dedupe.signatures[first], dedupe.signatures[other]):.0%})"
+                    for other in members[1:]
+                )
+                st.write(f"• **{dedupe.labels[first]}** ↔ {similar}")
+            st.caption(f"Resumes with estimated similarity ≥ {CLUSTER_THRESHOLD:.0%} are grouped together")
     else:
         st.info("No candidates analyzed yet. Upload resumes in the 'Analyze Resume' tab.")
 
@@ -509,19 +1009,46 @@ with tab2:
 with tab3:
     st.header("✅ Shortlisted Candidates")
     
-    shortlisted = [r for r in st.session_state.all_results if r.get("shortlisted", False)]
+    table = st.session_state.all_results
+    shortlisted_mask = table.mask(shortlisted_only=True, hide_duplicates=True)
+    shortlisted_count = int(shortlisted_mask.sum())
     
-    if shortlisted:
-        df = pd.DataFrame(shortlisted)
-        st.dataframe(df, use_container_width=True)
+    if shortlisted_count:
+        st.dataframe(table.frame(shortlisted_mask), use_container_width=True)
         
-        csv = df.to_csv(index=False)
-        st.download_button(
-            "📥 Download Shortlisted",
-            csv,
-            f"shortlisted_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            "text/csv"
-        )
+        render_export("export_shortlisted", "shortlisted", shortlisted_only=True, hide_duplicates=True)
+        
+        # Outreach emails are rendered locally, only when a recruiter asks for them
+        st.subheader("✉️ Outreach Emails")
+        col_sender, col_company = st.columns(2)
+        with col_sender:
+            sender_name = st.text_input("Sender Name", value=os.getenv("SENDER_NAME", "The Recruiting Team"))
+        with col_company:
+            company_name = st.text_input("Company Name", value=os.getenv("COMPANY_NAME", "Our Company"))
+        
+        email_key = (st.session_state.results_version, job_title, sender_name, company_name)
+        cached_emails = st.session_state.get("outreach_emails")
+        if st.button(f"✉️ Generate Emails for {shortlisted_count} Shortlisted Candidate(s)"):
+            from utils.email_renderer import render_outreach_emails
+            shortlisted = list(table.rows(shortlisted_mask.nonzero()[0]))
+            emails = render_outreach_emails(shortlisted, job_title, company_name, sender_name)
+            st.session_state.outreach_emails = (email_key, emails)
+            cached_emails = st.session_state.outreach_emails
+        
+        if cached_emails and cached_emails[0] == email_key:
+            emails = cached_emails[1]
+            for email in emails[:5]:
+                with st.expander(f"📧 {email['name']} <{email['email']}>"):
+                    st.write(f"**Subject:** {email['subject']}")
+                    st.markdown(email["body"], unsafe_allow_html=True)
+            if len(emails) > 5:
+                st.caption(f"Previewing 5 of {len(emails)} emails - download for the full set")
+            st.download_button(
+                "📥 Download Emails (JSON)",
+                json.dumps(emails, indent=2),
+                f"outreach_emails_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json",
+                "application/json"
+            )
     else:
         st.info("No candidates shortlisted yet.")
 
@@ -534,3 +1061,11 @@ st.markdown("""
     <p>🤖 Powered by 2 AI Agents + Groq Llama 3.3 70B | Session-based Storage</p>
 </div>
 """, unsafe_allow_html=True)
+
+with profile_slot:
+    for kind, path in st.session_state.get("analyze_profile_outputs", {}).items():
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                st.download_button(f"📥 {os.path.basename(path)}", f.read(), file_name=os.path.basename(path), key=f"profile_{kind}")
+
+rerun_timer.finish()
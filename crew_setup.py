@@ -1,31 +1,109 @@
 """
 CrewAI Multi-Agent Setup - Orchestrates Resume Analysis Workflow
 """
+import os
+import time
 from agents.resume_analyzer_agent import parse_resume_with_agent
 from agents.insight_extractor_agent import analyze_candidate_with_agent
+from agents.llm_client import get_provider_config, SMALL, LARGE
+from utils.routing_stats import routing_stats
+from utils.scoring_engine import score_candidate, skill_gaps
+from utils.skill_ontology import normalize_skills
+from utils.trace_logging import span
 
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Score distance from the shortlist threshold that counts as borderline
+DEFAULT_ESCALATION_BAND = float(os.getenv("ESCALATION_BAND", "10"))
 
-def run_complete_analysis(resume_text: str, job_requirements: dict) -> dict:
+
+def routing_enabled() -> bool:
+    """Tiered routing is on unless disabled or both tiers resolve to the same model"""
+    if os.getenv("MODEL_ROUTING", "tiered").lower() in ("off", "false", "0", "single"):
+        return False
+    return get_provider_config(SMALL)[1] != get_provider_config(LARGE)[1]
+
+
+def _timed(tier: str, agent, *args, **kwargs) -> dict:
+    """Run an agent call on a tier and record its latency"""
+    start = time.perf_counter()
+    with span(agent.__name__, logger, tier=tier):
+        result = agent(*args, tier=tier, **kwargs)
+    routing_stats.record_call(tier, time.perf_counter() - start)
+    return result
+
+
+def _failed_validation(result: dict) -> bool:
+    return result.get("status") != "success" and result.get("error_type") == "validation"
+
+
+def prepare_parsed(parsed_resume: dict, experience_years: float = None) -> dict:
+    """Canonical skills and the locally computed experience on an Agent 1 result"""
+    # Canonical skill names ("k8s" -> "Kubernetes"), so matching and caching see one spelling
+    if "skills_as_written" not in parsed_resume:
+        parsed_resume["skills_as_written"] = parsed_resume.get("skills", [])
+        parsed_resume["skills"] = normalize_skills(parsed_resume.get("skills", []))
+    
+    if experience_years is not None and parsed_resume.get("experience_years") != experience_years:
+        logger.info(f"📅 Using computed experience {experience_years} years (LLM said {parsed_resume.get('experience_years')})")
+        parsed_resume["experience_years_llm"] = parsed_resume.get("experience_years")
+        parsed_resume["experience_years"] = experience_years
+    return parsed_resume
+
+
+def parse_resume(resume_text: str, experience_years: float = None):
+    """
+    Agent 1 only (small model, escalated on validation failure).
+    Returns (parsed_resume, escalation); parsed_resume["status"] is "error" on failure.
+    """
+    escalation = None
+    parsed_resume = _timed(SMALL, parse_resume_with_agent, resume_text)
+    if routing_enabled() and _failed_validation(parsed_resume):
+        logger.warning("⬆️ Escalating parsing to the large model (small model output failed validation)")
+        escalation = "parse_validation"
+        parsed_resume = _timed(LARGE, parse_resume_with_agent, resume_text)
+    
+    if parsed_resume.get("status") == "success":
+        prepare_parsed(parsed_resume, experience_years)
+    return parsed_resume, escalation
+
+
+def run_complete_analysis(resume_text: str, job_requirements: dict, parsed_resume: dict = None,
+                          experience_years: float = None, shortlist_threshold: float = None,
+                          escalation_band: float = DEFAULT_ESCALATION_BAND, weights: dict = None) -> dict:
     """
     Execute complete 2-agent workflow:
-    1. Agent 1: Parse resume and extract data
+    1. Agent 1: Parse resume and extract data (skipped when parsed_resume is given)
     2. Agent 2: Analyze and score candidate
+
+    experience_years, when given, is the locally computed full-time experience
+    and replaces the LLM's estimate before scoring.
+
+    The confidence score is computed locally from the parsed data with the
+    given component weights (utils/scoring_engine.py); Agent 2 only writes
+    strengths, gaps and the recommendation.
+
+    Routing: both agents run on the small model first. A step is re-run on the
+    large model when its output fails validation; candidates whose local score
+    lands within escalation_band points of shortlist_threshold get their
+    narrative from the large model directly.
     """
+    tiered = routing_enabled()
+    escalation = None
     
     # Step 1: Parse Resume (Agent 1)
-    logger.info("=" * 60)
-    logger.info("🤖 AGENT 1: Starting Resume Parsing")
-    logger.info("=" * 60)
-    logger.info(f"Resume length: {len(resume_text)} characters")
+    logger.debug(f"Resume length: {len(resume_text)} characters")
     
-    parsed_resume = parse_resume_with_agent(resume_text)
+    if parsed_resume is not None:
+        logger.info("♻️ Reusing cached parse for identical resume content")
+    else:
+        parsed_resume, escalation = parse_resume(resume_text)
     
     if parsed_resume.get("status") != "success":
+        routing_stats.record_candidate(escalation)
         logger.error(f"❌ AGENT 1 FAILED: {parsed_resume.get('error')}")
         return {
             "status": "error",
@@ -33,19 +111,41 @@ def run_complete_analysis(resume_text: str, job_requirements: dict) -> dict:
             "stage": "parsing"
         }
     
-    logger.info("✅ AGENT 1 SUCCESS: Resume parsed successfully")
-    logger.info(f"Extracted name: {parsed_resume.get('name', 'N/A')}")
-    logger.info(f"Extracted email: {parsed_resume.get('email', 'N/A')}")
-    logger.info(f"Extracted skills: {len(parsed_resume.get('skills', []))} skills")
+    prepare_parsed(parsed_resume, experience_years)
+    
+    logger.debug(f"Parsed {parsed_resume.get('name', 'N/A')}: {len(parsed_resume.get('skills', []))} skills")
     
     # Step 2: Analyze & Score (Agent 2)
-    logger.info("=" * 60)
-    logger.info("🤖 AGENT 2: Starting Candidate Analysis")
-    logger.info("=" * 60)
-    logger.info(f"Job Title: {job_requirements.get('job_title')}")
-    logger.info(f"Required Skills: {job_requirements.get('required_skills')}")
+    # Score locally (deterministic); the agent only writes the narrative
+    with span("score", logger):
+        confidence_score, score_components = score_candidate(parsed_resume, job_requirements, weights)
+    logger.info(f"📐 Local score: {confidence_score}%", extra={"fields": {"score_components": score_components}})
     
-    analysis_result = analyze_candidate_with_agent(parsed_resume, job_requirements)
+    # Borderline candidates get the large model's narrative straight away
+    analysis_tier = SMALL
+    if tiered and shortlist_threshold is not None and abs(confidence_score - shortlist_threshold) <= escalation_band:
+        logger.warning("⬆️ Routing narrative to the large model (borderline score)")
+        analysis_tier = LARGE
+        escalation = escalation or "borderline"
+    
+    # Skill overlap is resolved locally (synonyms included) and handed to the agent as facts
+    matched, missing = skill_gaps(parsed_resume.get("skills", []), job_requirements)
+    job_requirements = dict(job_requirements, matched_skills=matched, missing_skills=missing)
+    
+    analysis_result = _timed(analysis_tier, analyze_candidate_with_agent, parsed_resume, job_requirements)
+    
+    if tiered and analysis_tier == SMALL and _failed_validation(analysis_result):
+        logger.warning("⬆️ Escalating analysis to the large model (small model output failed validation)")
+        analysis_result = _timed(LARGE, analyze_candidate_with_agent, parsed_resume, job_requirements)
+        analysis_tier = LARGE
+        escalation = escalation or "analysis_validation"
+    
+    if analysis_result.get("status") == "success":
+        analysis_result["llm_confidence_score"] = analysis_result.get("confidence_score")
+        analysis_result["confidence_score"] = confidence_score
+        analysis_result["score_components"] = score_components
+    
+    routing_stats.record_candidate(escalation)
     
     if analysis_result.get("status") != "success":
         logger.error(f"❌ AGENT 2 FAILED: {analysis_result.get('error')}")
@@ -56,20 +156,15 @@ def run_complete_analysis(resume_text: str, job_requirements: dict) -> dict:
             "parsed_data": parsed_resume
         }
     
-    logger.info("✅ AGENT 2 SUCCESS: Analysis completed")
-    logger.info(f"Confidence Score: {analysis_result.get('confidence_score', 0)}%")
-    logger.info(f"Recommendation: {analysis_result.get('recommendation', 'N/A')}")
-    logger.info(f"Shortlisted: {analysis_result.get('shortlisted', False)}")
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Recommendation: {analysis_result.get('recommendation', 'N/A')}")
     
     # Combine results
     final_result = {
         "status": "success",
         "parsed_resume": parsed_resume,
-        "analysis": analysis_result
+        "analysis": analysis_result,
+        "routing": {"analysis_tier": analysis_tier, "escalation": escalation}
     }
     
-    logger.info("=" * 60)
-    logger.info("✅ WORKFLOW COMPLETE")
-    logger.info("=" * 60)
-    
     return final_result
@@ -0,0 +1,283 @@
+"""
+Multi-Job Matching Page - Score one candidate pool against every open requisition
+"""
+import streamlit as st
+from datetime import datetime
+import os
+import sys
+import uuid
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from utils.perf_budget import start_rerun_timer
+from utils.env import load_env
+from utils.trace_logging import configure_logging, new_trace
+from utils.ingest_cache import IngestLedger
+from utils.upload_spool import iter_extracted
+from utils.archive_ingest import iter_spooled_uploads, ARCHIVE_UPLOAD_TYPES
+from utils.experience_calculator import compute_experience_years
+from utils.job_profiles import JobProfileStore, profile_requirements
+from utils.scoring_engine import DEFAULT_WEIGHTS, compute_job_matrix, apply_weights, components_to_dict
+from utils.request_scheduler import set_request_context, BULK
+
+rerun_timer = start_rerun_timer("multi_job")
+load_env()
+configure_logging()
+
+
+@st.cache_resource
+def get_profile_store():
+    """Job profiles shared by every session in the process"""
+    return JobProfileStore()
+
+
+@st.cache_resource
+def get_key_manager():
+    """Shared API key manager, created once per process"""
+    from utils.api_key_manager import get_api_key_manager
+    return get_api_key_manager()
+
+
+def best_fit_roles(scores, titles, top_n=3):
+    """Each candidate's top_n jobs as 'Title (score)' strings"""
+    order = np.argsort(-scores, axis=1)[:, :top_n]
+    return [", ".join(f"{titles[j]} ({scores[i, j]:.0f})" for j in row) for i, row in enumerate(order)]
+
+
+# Page config
+st.set_page_config(page_title="Multi-Job Matching", layout="wide", page_icon="🗂️")
+
+st.title("🗂️ Multi-Job Matching")
+st.markdown("**Parse each resume once, score it against every open role, and write AI narratives only for each role's top candidates**")
+
+# Session state (shared with the main page where the keys overlap)
+if 'ingest_ledger' not in st.session_state:
+    st.session_state.ingest_ledger = IngestLedger()
+if 'local_experience' not in st.session_state:
+    st.session_state.local_experience = {}
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
+if 'multi_job_uploads' not in st.session_state:
+    st.session_state.multi_job_uploads = []
+if 'multi_job_uploader_key' not in st.session_state:
+    st.session_state.multi_job_uploader_key = 0
+
+ledger = st.session_state.ingest_ledger
+local_experience = st.session_state.local_experience
+store = get_profile_store()
+
+st.markdown("---")
+
+# Job profiles
+st.header("Step 1: Open Roles")
+
+with st.expander("➕ Add Job Profile", expanded=not store.all()):
+    with st.form("add_job_profile", clear_on_submit=True):
+        profile_title = st.text_input("Job Title")
+        profile_skills = st.text_area("Technical Skills (comma-separated)")
+        profile_mandatory = st.text_area("Mandatory Skills")
+        col_min, col_max = st.columns(2)
+        with col_min:
+            profile_min = st.number_input("Min Experience", min_value=0, max_value=30, value=0)
+        with col_max:
+            profile_max = st.number_input("Max Experience", min_value=0, max_value=30, value=3)
+        if st.form_submit_button("💾 Save Profile") and profile_title.strip():
+            store.add({
+                "job_title": profile_title.strip(),
+                "required_skills": profile_skills,
+                "nice_to_have": profile_mandatory,
+                "min_experience": profile_min,
+                "max_experience": profile_max,
+            })
+            st.rerun()
+
+profiles = store.all()
+for profile in profiles:
+    col_info, col_remove = st.columns([6, 1])
+    with col_info:
+        st.write(f"**{profile['job_title']}** - {profile['required_skills'] or 'no skills listed'} | "
+                 f"{profile['min_experience']}-{profile['max_experience']} years")
+    with col_remove:
+        if st.button("🗑️", key=f"remove_profile_{profile['id']}", help="Remove this profile"):
+            store.remove(profile["id"])
+            st.rerun()
+
+if not profiles:
+    st.info("Add at least one job profile to start matching")
+
+selected_ids = st.multiselect(
+    "Roles to match",
+    [profile["id"] for profile in profiles],
+    default=[profile["id"] for profile in profiles],
+    format_func=lambda profile_id: next(p["job_title"] for p in profiles if p["id"] == profile_id)
+)
+jobs = [profile for profile in profiles if profile["id"] in selected_ids]
+
+st.markdown("---")
+
+# Upload and parse
+st.header("Step 2: Upload & Parse Resumes")
+
+new_uploads = st.file_uploader(
+    "Upload Resumes (PDF, DOCX, TXT, or a ZIP / tar.gz of them)",
+    type=["pdf", "docx", "txt"] + ARCHIVE_UPLOAD_TYPES,
+    accept_multiple_files=True,
+    key=f"multi_job_uploader_{st.session_state.multi_job_uploader_key}"
+)
+if new_uploads:
+    skipped_members = []
+    with st.spinner("Saving uploads..."):
+        st.session_state.multi_job_uploads.extend(iter_spooled_uploads(new_uploads, skipped=skipped_members))
+    if skipped_members:
+        st.session_state.multi_job_skipped = skipped_members
+    st.session_state.multi_job_uploader_key += 1
+    st.rerun()
+
+skipped_members = st.session_state.pop("multi_job_skipped", None)
+if skipped_members:
+    with st.expander(f"⚠️ {len(skipped_members)} file(s) skipped"):
+        for member_name, reason in skipped_members[:200]:
+            st.write(f"• {member_name} - {reason}")
+
+# One entry per distinct resume content
+uploads = list({upload.file_hash: upload for upload in st.session_state.multi_job_uploads}.values())
+to_parse = [upload for upload in uploads if upload.file_hash not in ledger.parsed]
+
+if uploads:
+    st.info(f"📊 **{len(uploads)} resume(s)** - {len(uploads) - len(to_parse)} already parsed, {len(to_parse)} to parse")
+
+if to_parse and st.button("🤖 Parse Resumes", type="primary", use_container_width=True):
+    # Agent 1 runs once per resume; scoring against every role is local
+    from crew_setup import parse_resume
+    get_key_manager()
+    set_request_context(st.session_state.session_id, BULK)
+
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    failed = 0
+    for idx, (upload, (text, success, error)) in enumerate(iter_extracted(to_parse)):
+        status_text.text(f"Parsing {idx + 1}/{len(to_parse)}: {upload.name}")
+        new_trace(upload.name, upload.file_hash)
+        if not success:
+            st.error(f"❌ {upload.name}: {error}")
+            failed += 1
+        else:
+            if upload.file_hash not in local_experience:
+                years = compute_experience_years([text])[0]
+                local_experience[upload.file_hash] = None if years != years else float(years)
+            parsed, _ = parse_resume(text, experience_years=local_experience[upload.file_hash])
+            if parsed.get("status") == "success":
+                ledger.parsed[upload.file_hash] = parsed
+            else:
+                st.error(f"❌ {upload.name}: {parsed.get('error', 'Unknown error')}")
+                failed += 1
+        progress_bar.progress((idx + 1) / len(to_parse))
+    status_text.success(f"✅ Parsed {len(to_parse) - failed} resume(s), {failed} failed")
+
+parsed_uploads = [upload for upload in uploads if upload.file_hash in ledger.parsed]
+
+# Score matrix
+if parsed_uploads and jobs:
+    import pandas as pd
+    
+    st.markdown("---")
+    st.header("Step 3: Candidate × Role Scores")
+
+    requirements = [profile_requirements(profile) for profile in jobs]
+    titles = [profile["job_title"] for profile in jobs]
+    parsed_list = [ledger.parsed[upload.file_hash] for upload in parsed_uploads]
+
+    matrix_key = (tuple(upload.file_hash for upload in parsed_uploads), tuple(selected_ids))
+    if st.session_state.get("job_matrix_key") != matrix_key:
+        st.session_state.job_matrix_key = matrix_key
+        st.session_state.job_matrix = compute_job_matrix(parsed_list, requirements)
+    components = st.session_state.job_matrix
+    scores = apply_weights(components, DEFAULT_WEIGHTS)
+
+    names = [parsed.get("name") or upload.name for parsed, upload in zip(parsed_list, parsed_uploads)]
+    score_table = pd.DataFrame(scores, columns=titles)
+    score_table.insert(0, "Best-fit roles", best_fit_roles(scores, titles))
+    score_table.insert(0, "Candidate", names)
+    st.dataframe(score_table, use_container_width=True, hide_index=True)
+
+    st.download_button(
+        "📥 Download Score Matrix (CSV)",
+        score_table.to_csv(index=False),
+        file_name=f"job_matrix_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
+
+    # Narratives for each role's top candidates only
+    st.markdown("---")
+    st.header("Step 4: AI Narratives for Top Candidates")
+
+    col_k, col_threshold = st.columns(2)
+    with col_k:
+        top_k = st.number_input("Top candidates per role", min_value=1, max_value=50, value=5)
+    with col_threshold:
+        shortlist_threshold = st.slider("Shortlist Threshold Score", 0, 100, 70, key="multi_job_threshold")
+
+    top_rows = {
+        job_index: [int(i) for i in np.argsort(-scores[:, job_index])[:top_k]]
+        for job_index in range(len(jobs))
+    }
+    pending = [
+        (job_index, row) for job_index, rows in top_rows.items() for row in rows
+        if (parsed_uploads[row].file_hash, jobs[job_index]["id"]) not in ledger.analyzed
+    ]
+
+    if pending and st.button(f"✍️ Write {len(pending)} Narrative(s)", use_container_width=True):
+        from crew_setup import run_complete_analysis
+        get_key_manager()
+        set_request_context(st.session_state.session_id, BULK)
+
+        progress_bar = st.progress(0)
+        for done, (job_index, row) in enumerate(pending):
+            upload = parsed_uploads[row]
+            new_trace(upload.name, upload.file_hash)
+            with st.spinner(f"🤖 {titles[job_index]}: {names[row]}"):
+                result = run_complete_analysis(
+                    "",
+                    requirements[job_index],
+                    parsed_resume=parsed_list[row],
+                    shortlist_threshold=shortlist_threshold,
+                    weights=DEFAULT_WEIGHTS
+                )
+            if result.get("status") == "success":
+                analysis = result["analysis"]
+                # Same entry shape (and job key) as the main page, so it is reused there as a cached result
+                ledger.analyzed[(upload.file_hash, jobs[job_index]["id"])] = {
+                    "name": parsed_list[row].get("name", "Unknown"),
+                    "email": parsed_list[row].get("email", ""),
+                    "phone": parsed_list[row].get("phone", "N/A"),
+                    "experience_years": parsed_list[row].get("experience_years", 0),
+                    "skills": parsed_list[row].get("skills", []),
+                    "confidence_score": analysis.get("confidence_score", 0),
+                    "shortlisted": analysis.get("confidence_score", 0) >= shortlist_threshold,
+                    "key_strengths": analysis.get("key_strengths", []),
+                    "gaps": analysis.get("gaps", []),
+                    "recommendation": analysis.get("recommendation", "N/A"),
+                    "score_components": analysis.get("score_components", components_to_dict(components[row, job_index])),
+                    "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+                    "resume_file": upload.name,
+                    "file_hash": upload.file_hash
+                }
+            else:
+                st.error(f"❌ {names[row]} / {titles[job_index]}: {result.get('error', 'Unknown error')}")
+            progress_bar.progress((done + 1) / len(pending))
+        st.rerun()
+
+    for job_index, rows in top_rows.items():
+        with st.expander(f"💼 {titles[job_index]} - top {len(rows)}"):
+            for rank, row in enumerate(rows, 1):
+                entry = ledger.analyzed.get((parsed_uploads[row].file_hash, jobs[job_index]["id"]))
+                st.write(f"**#{rank} {names[row]}** - {scores[row, job_index]:.1f}%")
+                if entry:
+                    st.write(f"✅ {'; '.join(entry.get('key_strengths', []))}")
+                    st.write(f"⚠️ {'; '.join(entry.get('gaps', []))}")
+                    st.caption(entry.get("recommendation", ""))
+
+rerun_timer.finish()
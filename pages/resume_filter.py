@@ -2,93 +2,68 @@
 Resume Filter Page - Extract all content from resumes and export to Excel
 """
 import streamlit as st
-import pandas as pd
 from datetime import datetime
 import os
 import sys
+import uuid
 
 # Add parent directory to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from agents.resume_analyzer_agent import parse_resume_with_agent
-from utils.api_key_manager import get_api_key_manager
+from utils.perf_budget import start_rerun_timer
+from utils.trace_logging import configure_logging
+from utils.profiler import BulkRunProfiler, profiling_enabled_by_env, memory_tracing_enabled_by_env
+from utils.upload_spool import iter_extracted
+from utils.archive_ingest import iter_spooled_uploads, count_resumes, is_archive, ARCHIVE_UPLOAD_TYPES
+from utils.contact_extractor import extract_contacts, missing_fields
+from utils.request_scheduler import set_request_context, INTERACTIVE, BULK
 
-# Try to import PDF/DOCX libraries
-try:
-    import PyPDF2
-    HAS_PYPDF2 = True
-except ImportError:
-    HAS_PYPDF2 = False
+rerun_timer = start_rerun_timer("resume_filter")
+configure_logging()
 
-try:
-    import pdfplumber
-    HAS_PDFPLUMBER = True
-except ImportError:
-    HAS_PDFPLUMBER = False
 
-try:
-    from docx import Document
-    from docx.shared import Inches, Pt
-    from docx.enum.text import WD_ALIGN_PARAGRAPH
-    HAS_DOCX = True
-except ImportError:
-    HAS_DOCX = False
-    Document = None
+@st.cache_resource
+def get_key_manager():
+    """Shared API key manager, created once per process"""
+    from utils.api_key_manager import get_api_key_manager
+    return get_api_key_manager()
 
-# BytesIO is always available (built-in)
-from io import BytesIO
 
+FAST_MODE = "⚡ Fast contacts (local, no API calls)"
+AI_MODE = "🤖 Full AI extraction"
 
-def extract_text_from_file(uploaded_file):
-    """Extract text from PDF/DOCX/TXT files"""
-    try:
-        if uploaded_file.type == "application/pdf":
-            # Try PyPDF2 first
-            try:
-                pdf_reader = PyPDF2.PdfReader(uploaded_file)
-                text = ""
-                for page in pdf_reader.pages:
-                    text += page.extract_text() or ""
-                if text.strip():
-                    return text, True, None
-            except:
-                pass
-            
-            # Fallback to pdfplumber
-            try:
-                uploaded_file.seek(0)
-                with pdfplumber.open(uploaded_file) as pdf:
-                    text = ""
-                    for page in pdf.pages:
-                        text += page.extract_text() or ""
-                if text.strip():
-                    return text, True, None
-            except:
-                pass
-            
-            return "", False, "Could not extract text from PDF"
-        
-        elif "wordprocessingml" in uploaded_file.type or uploaded_file.name.endswith(".docx"):
-            try:
-                doc = Document(uploaded_file)
-                text = "\n".join([para.text for para in doc.paragraphs])
-                if text.strip():
-                    return text, True, None
-                return "", False, "DOCX file is empty"
-            except Exception as e:
-                return "", False, f"Error reading DOCX: {str(e)}"
+
+def format_row(file_name, result):
+    """Flatten an extraction result into one spreadsheet row"""
+    # Agent extracts content dynamically - no predefined structure
+    # We take whatever the agent returns
+    data = {
+        "File Name": file_name,
+        "Extracted Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    
+    # Add all fields the agent extracted (dynamic)
+    for key, value in result.items():
+        if key == "status":
+            continue
         
-        else:  # Text file
-            try:
-                text = uploaded_file.getvalue().decode("utf-8")
-                if text.strip():
-                    return text, True, None
-                return "", False, "Text file is empty"
-            except Exception as e:
-                return "", False, f"Error reading text file: {str(e)}"
+        # Format the value for display
+        if isinstance(value, list):
+            if len(value) > 0 and isinstance(value[0], dict):
+                # List of dicts (like education, experience)
+                formatted = " | ".join([str(item) for item in value])
+                data[key.replace("_", " ").title()] = formatted
+            else:
+                # Simple list (like skills)
+                data[key.replace("_", " ").title()] = ", ".join(str(v) for v in value) or "N/A"
+        elif isinstance(value, dict):
+            # Dict - convert to string
+            data[key.replace("_", " ").title()] = str(value)
+        else:
+            # Simple value
+            data[key.replace("_", " ").title()] = value if value else "N/A"
     
-    except Exception as e:
-        return "", False, f"Unexpected error: {str(e)}"
+    return data
 
 
 # Page config
@@ -100,7 +75,7 @@ st.markdown("**Extract all information from resumes and export to Excel**")
 
 # Check API keys
 try:
-    api_mgr = get_api_key_manager()
+    api_mgr = get_key_manager()
     if api_mgr.get_total_keys() > 0:
         st.success(f"✅ {api_mgr.get_total_keys()} API key(s) loaded")
     else:
@@ -113,87 +88,123 @@ st.markdown("---")
 # Initialize session state
 if 'extracted_data' not in st.session_state:
     st.session_state.extracted_data = []
+if 'extracted_version' not in st.session_state:
+    st.session_state.extracted_version = 0
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 # File uploader
 st.header("📤 Upload Resumes")
 uploaded_files = st.file_uploader(
     "Upload multiple resumes to extract information",
-    type=["pdf", "docx", "txt"],
+    type=["pdf", "docx", "txt"] + ARCHIVE_UPLOAD_TYPES,
     accept_multiple_files=True,
-    help="Upload PDF, DOCX, or TXT files"
+    help="Upload PDF, DOCX, or TXT files, or a ZIP / tar.gz export of them"
+)
+
+extraction_mode = st.radio(
+    "Extraction Mode",
+    [FAST_MODE, AI_MODE],
+    horizontal=True,
+    help="Fast mode extracts name, email, phone and skills locally without API calls"
+)
+enrich_missing = False
+if extraction_mode == FAST_MODE:
+    enrich_missing = st.checkbox(
+        "Fill missing fields with AI",
+        help="Send only resumes where the local pass missed name, email, phone or skills to the AI agent"
+    )
+
+profile_run = st.checkbox(
+    "🔬 Profile this run",
+    value=profiling_enabled_by_env(),
+    help="Write a flame graph (and, with PROFILE_MEMORY=true, a top-allocations report) of the extraction run to data/results"
 )
 
 if uploaded_files:
-    st.info(f"📊 **{len(uploaded_files)} resume(s) selected**")
+    if any(is_archive(uploaded_file.name) for uploaded_file in uploaded_files):
+        expected = count_resumes(uploaded_files)
+        st.info(f"📊 **{len(uploaded_files)} file(s) selected** - {expected if expected is not None else 'unknown number of'} resume(s) incl. archive contents")
+    else:
+        st.info(f"📊 **{len(uploaded_files)} resume(s) selected**")
     
     if st.button("🚀 Extract Information", type="primary", use_container_width=True):
-        progress_bar = st.progress(0)
-        status_text = st.empty()
+        profiler = BulkRunProfiler("resume_filter", trace_memory=memory_tracing_enabled_by_env()).start() if profile_run else None
+        try:
+            progress_bar = st.progress(0)
+            status_text = st.empty()
         
-        extracted_data = []
-        successful = 0
-        failed = 0
+            extracted_data = []
+            successful = 0
+            failed = 0
+            enriched = 0
+            skipped_members = []
+            # Archives are unpacked lazily, so a tar.gz's size is unknown until the end
+            expected_files = count_resumes(uploaded_files)
+            # Fast mode handles thousands of files - don't push a UI update for each one
+            progress_every = max(1, (expected_files or 2000) // 100) if extraction_mode == FAST_MODE else 1
+            # AI calls share the key pool fairly with other sessions; one file counts as interactive
+            set_request_context(st.session_state.session_id, INTERACTIVE if expected_files == 1 else BULK)
         
-        for idx, uploaded_file in enumerate(uploaded_files):
-            status_text.text(f"Processing {idx + 1}/{len(uploaded_files)}: {uploaded_file.name}")
-            
-            # Extract text
-            resume_text, success, error = extract_text_from_file(uploaded_file)
+            def report_progress(done):
+                if expected_files:
+                    progress_bar.progress(min(done / expected_files, 1.0))
+        
+            # Uploads and archive members are spooled to disk one at a time and extracted ahead through a bounded queue
+            total_files = 0
+            for idx, (uploaded_file, (resume_text, success, error)) in enumerate(
+                iter_extracted(iter_spooled_uploads(uploaded_files, skipped=skipped_members))
+            ):
+                total_files = idx + 1
+                if idx % progress_every == 0:
+                    status_text.text(f"Processing {idx + 1}/{expected_files or '?'}: {uploaded_file.name}")
             
-            if not success:
-                st.error(f"❌ {uploaded_file.name}: {error}")
-                failed += 1
-                progress_bar.progress((idx + 1) / len(uploaded_files))
-                continue
+                if not success:
+                    st.error(f"❌ {uploaded_file.name}: {error}")
+                    failed += 1
+                    report_progress(idx + 1)
+                    continue
             
-            # Parse with agent - Let agent extract ALL content dynamically
-            try:
-                result = parse_resume_with_agent(resume_text)
+                try:
+                    if extraction_mode == FAST_MODE:
+                        result = extract_contacts(resume_text)
+                        missing = missing_fields(result)
+                        if enrich_missing and missing:
+                            # Agent (and the openai SDK) is only imported when it is actually needed
+                            from agents.resume_analyzer_agent import parse_resume_with_agent
+                            ai_result = parse_resume_with_agent(resume_text)
+                            if ai_result.get("status") == "success":
+                                for field in missing:
+                                    if ai_result.get(field):
+                                        result[field] = ai_result[field]
+                                enriched += 1
+                    else:
+                        # Parse with agent - Let agent extract ALL content dynamically
+                        from agents.resume_analyzer_agent import parse_resume_with_agent
+                        result = parse_resume_with_agent(resume_text)
                 
-                if result.get("status") == "success":
-                    # Agent extracts content dynamically - no predefined structure
-                    # We take whatever the agent returns
-                    data = {
-                        "File Name": uploaded_file.name,
-                        "Extracted Date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    }
-                    
-                    # Add all fields the agent extracted (dynamic)
-                    for key, value in result.items():
-                        if key == "status":
-                            continue
-                        
-                        # Format the value for display
-                        if isinstance(value, list):
-                            if len(value) > 0 and isinstance(value[0], dict):
-                                # List of dicts (like education, experience)
-                                formatted = " | ".join([str(item) for item in value])
-                                data[key.replace("_", " ").title()] = formatted
-                            else:
-                                # Simple list (like skills)
-                                data[key.replace("_", " ").title()] = ", ".join(str(v) for v in value)
-                        elif isinstance(value, dict):
-                            # Dict - convert to string
-                            data[key.replace("_", " ").title()] = str(value)
-                        else:
-                            # Simple value
-                            data[key.replace("_", " ").title()] = value if value else "N/A"
+                    if result.get("status") == "success":
+                        extracted_data.append(format_row(uploaded_file.name, result))
+                        successful += 1
+                        if extraction_mode == AI_MODE:
+                            st.success(f"✅ {uploaded_file.name} - Extracted successfully")
+                    else:
+                        st.error(f"❌ {uploaded_file.name}: {result.get('error', 'Unknown error')}")
+                        failed += 1
                     
-                    extracted_data.append(data)
-                    successful += 1
-                    st.success(f"✅ {uploaded_file.name} - Extracted successfully")
-                else:
-                    st.error(f"❌ {uploaded_file.name}: {result.get('error', 'Unknown error')}")
+                except Exception as e:
+                    st.error(f"❌ {uploaded_file.name}: {str(e)}")
                     failed += 1
-                    
-            except Exception as e:
-                st.error(f"❌ {uploaded_file.name}: {str(e)}")
-                failed += 1
             
-            progress_bar.progress((idx + 1) / len(uploaded_files))
+                if (idx + 1) % progress_every == 0:
+                    report_progress(idx + 1)
+        finally:
+            if profiler is not None:
+                st.session_state.filter_profile_outputs = profiler.stop()
         
         # Save to session state
         st.session_state.extracted_data = extracted_data
+        st.session_state.extracted_version += 1
         
         # Final summary
         progress_bar.progress(1.0)
@@ -202,9 +213,14 @@ if uploaded_files:
         st.success(f"""
         **Extraction Summary:**
         - ✅ Successful: {successful}
+        - 🤖 Enriched with AI: {enriched}
         - ❌ Failed: {failed}
-        - 📊 Total: {len(uploaded_files)}
+        - 📊 Total: {total_files}
         """)
+        if skipped_members:
+            with st.expander(f"⚠️ {len(skipped_members)} file(s) skipped"):
+                for member_name, reason in skipped_members[:200]:
+                    st.write(f"• {member_name} - {reason}")
 
 # Display extracted data
 if st.session_state.extracted_data:
@@ -212,6 +228,7 @@ if st.session_state.extracted_data:
     st.header("📋 Extracted Information")
     
     # Convert to DataFrame
+    import pandas as pd
     df = pd.DataFrame(st.session_state.extracted_data)
     
     # Display table
@@ -221,92 +238,36 @@ if st.session_state.extracted_data:
     col1, col2 = st.columns(2)
     
     with col1:
-        # Excel download with formatting
-        from openpyxl import Workbook
-        from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
-        from openpyxl.utils.dataframe import dataframe_to_rows
-        
-        # Create workbook
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Resume Data"
-        
-        # Add title
-        ws.merge_cells('A1:' + chr(64 + len(df.columns)) + '1')
-        title_cell = ws['A1']
-        title_cell.value = "Resume Extraction Report"
-        title_cell.font = Font(size=16, bold=True, color="FFFFFF")
-        title_cell.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        title_cell.alignment = Alignment(horizontal="center", vertical="center")
-        ws.row_dimensions[1].height = 30
-        
-        # Add data starting from row 3
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 3):
-            for c_idx, value in enumerate(row, 1):
-                cell = ws.cell(row=r_idx, column=c_idx, value=value)
-                
-                # Header row formatting
-                if r_idx == 3:
-                    cell.font = Font(bold=True, color="FFFFFF", size=11)
-                    cell.fill = PatternFill(start_color="5B9BD5", end_color="5B9BD5", fill_type="solid")
-                    cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                else:
-                    # Data rows - enable text wrapping
-                    cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-                
-                # Add borders
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                cell.border = thin_border
-        
-        # Auto-size columns based on content
-        from openpyxl.utils import get_column_letter
-        
-        for col_idx in range(1, len(df.columns) + 1):
-            max_length = 0
-            column_letter = get_column_letter(col_idx)
-            
-            # Check all cells in this column
-            for row_idx in range(3, ws.max_row + 1):
-                cell = ws.cell(row=row_idx, column=col_idx)
+        # Excel file is built only on request and cached until the data changes
+        cached_export = st.session_state.get("excel_export")
+        if cached_export is None or cached_export[0] != st.session_state.extracted_version:
+            if st.button("📊 Prepare Excel", use_container_width=True):
+                from utils.excel_export import build_excel_report
+                profiler = BulkRunProfiler("excel_export", trace_memory=memory_tracing_enabled_by_env()).start() if profile_run else None
                 try:
-                    if cell.value:
-                        # Calculate length considering line breaks
-                        lines = str(cell.value).split('\n')
-                        max_line_length = max(len(line) for line in lines) if lines else 0
-                        max_length = max(max_length, max_line_length)
-                except:
-                    pass
-            
-            # Set column width (min 15, max 50 characters)
-            adjusted_width = min(max(max_length + 2, 15), 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
+                    with st.spinner("Building Excel report..."):
+                        excel_bytes = build_excel_report(st.session_state.extracted_data)
+                finally:
+                    if profiler is not None:
+                        st.session_state.filter_profile_outputs = profiler.stop()
+                st.session_state.excel_export = (st.session_state.extracted_version, excel_bytes)
+                cached_export = st.session_state.excel_export
         
-        # Set row heights for data rows
-        for row in range(4, ws.max_row + 1):
-            ws.row_dimensions[row].height = None  # Auto height
-        
-        # Save to BytesIO
-        excel_buffer = BytesIO()
-        wb.save(excel_buffer)
-        excel_buffer.seek(0)
-        
-        st.download_button(
-            "📥 Download Excel",
-            excel_buffer.read(),
-            f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
-            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            use_container_width=True
-        )
+        if cached_export is not None and cached_export[0] == st.session_state.extracted_version:
+            st.download_button(
+                "📥 Download Excel",
+                cached_export[1],
+                f"resume_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx",
+                "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True
+            )
     
     with col2:
         # Clear data
         if st.button("🗑️ Clear Data", use_container_width=True):
             st.session_state.extracted_data = []
+            st.session_state.extracted_version += 1
+            st.session_state.excel_export = None
             st.rerun()
     
     # Statistics - Dynamic based on extracted data
@@ -355,3 +316,10 @@ st.markdown("""
     <p>🔍 Resume Filter | Powered by AI Agent + Groq Llama</p>
 </div>
 """, unsafe_allow_html=True)
+
+for kind, path in st.session_state.get("filter_profile_outputs", {}).items():
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            st.download_button(f"📥 Profile: {os.path.basename(path)}", f.read(), file_name=os.path.basename(path), key=f"profile_{kind}")
+
+rerun_timer.finish()
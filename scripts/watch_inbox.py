@@ -0,0 +1,296 @@
+"""
+Inbox Watcher - Long-running daemon that analyzes resumes dropped into a folder
+
+Polls an inbox directory (e.g. where a mail gateway saves attachments). A file
+is picked up once its size and modification time have been stable for the
+debounce window, so half-written files are not read. PDF / DOCX / text files
+are typed by content and read in place; ZIP / tar.gz archives are unpacked
+member by member into the upload spool.
+
+Every resume is hashed and skipped when the same content was already analyzed
+for the job (results from earlier runs included), then sent through
+run_complete_analysis on a bounded worker pool. Results are appended to
+data/results/inbox_results.jsonl, where the Streamlit app picks them up.
+
+Usage: python scripts/watch_inbox.py [--inbox data/inbox] [--job "Senior Python Developer"] [--workers 2] [--once]
+"""
+import os
+import sys
+import time
+import hashlib
+import logging
+import argparse
+from collections import deque
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.env import load_env
+from utils.trace_logging import configure_logging, new_trace
+from utils.request_scheduler import scheduler_context, set_requests_per_minute_per_key, BULK
+from utils.upload_spool import SpooledUpload, extract_spooled, CHUNK_SIZE
+from utils.archive_ingest import is_archive, is_compressed_file, iter_archive, sniff_type, NOT_A_TAR
+from utils.experience_calculator import compute_experience_years
+from utils.ingest_cache import job_fingerprint
+from utils.job_profiles import JobProfileStore, profile_requirements
+from utils.inbox_store import append_result, processed_keys, INBOX_RESULTS_PATH
+
+load_env()
+logger = logging.getLogger("watch_inbox")
+
+WATCH_INBOX = os.getenv("WATCH_INBOX", os.path.join("data", "inbox"))
+WATCH_POLL_SECONDS = float(os.getenv("WATCH_POLL_SECONDS", "2"))
+WATCH_DEBOUNCE_SECONDS = float(os.getenv("WATCH_DEBOUNCE_SECONDS", "5"))
+WATCH_WORKERS = int(os.getenv("WATCH_WORKERS", "2"))
+WATCH_SHORTLIST_THRESHOLD = float(os.getenv("WATCH_SHORTLIST_THRESHOLD", "70"))
+# This process has its own rate limiter: the app's scheduler neither sees nor throttles it, so the
+# daemon and the app (LLM_RPM_PER_KEY) must together stay within what each key allows
+WATCH_RPM_PER_KEY = float(os.getenv("WATCH_RPM_PER_KEY", "10"))
+
+# Partial downloads / temp files written by mail clients, browsers and the spool
+_PARTIAL_SUFFIXES = (".part", ".tmp", ".crdownload", ".partial", ".download")
+
+
+def job_from_args(job: str = None) -> dict:
+    """A stored job profile (by id or title), else the env defaults the sidebar starts with"""
+    if job:
+        for profile in JobProfileStore().all():
+            if job in (profile["id"], profile["job_title"]):
+                return profile_requirements(profile)
+        logger.warning(f"⚠️ No job profile matches {job!r} - using it as the job title with the default skills")
+    return profile_requirements({
+        "job_title": job or os.getenv("JOB_TITLE", "Senior Python Developer"),
+        "required_skills": os.getenv("REQUIRED_SKILLS", "Python, Django, AWS"),
+        "nice_to_have": os.getenv("NICE_TO_HAVE", "Docker, Kubernetes, Redis"),
+        "min_experience": int(os.getenv("MIN_EXPERIENCE", "0")),
+        "max_experience": int(os.getenv("MAX_EXPERIENCE", "3")),
+    })
+
+
+def hash_file(path: str) -> str:
+    """SHA-256 of a file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analyze(spooled: SpooledUpload, job_requirements: dict, job_key: str, shortlist_threshold: float) -> dict:
+    """Extract, analyze and store one resume. Returns the stored entry, or None on failure"""
+    from crew_setup import run_complete_analysis
+
+    new_trace(spooled.name, spooled.file_hash)
+    # This process's own scheduler, limited to WATCH_RPM_PER_KEY - not queued with the app's sessions
+    with scheduler_context("watch-inbox", BULK):
+        text, success, error = extract_spooled(spooled)
+        if not success:
+            logger.error(f"❌ {spooled.name}: {error}")
+            return None
+        years = compute_experience_years([text])[0]
+        result = run_complete_analysis(
+            text,
+            job_requirements,
+            experience_years=None if years != years else float(years),
+            shortlist_threshold=shortlist_threshold,
+        )
+
+    if result.get("status") != "success":
+        logger.error(f"❌ {spooled.name}: {result.get('error', 'Unknown error')}")
+        return None
+
+    parsed = result["parsed_resume"]
+    analysis = result["analysis"]
+    entry = {
+        "name": parsed.get("name", "Unknown"),
+        "email": parsed.get("email", ""),
+        "phone": parsed.get("phone", "N/A"),
+        "experience_years": parsed.get("experience_years", 0),
+        "skills": parsed.get("skills", []),
+        "confidence_score": analysis.get("confidence_score", 0),
+        "shortlisted": analysis.get("confidence_score", 0) >= shortlist_threshold,
+        "key_strengths": analysis.get("key_strengths", []),
+        "gaps": analysis.get("gaps", []),
+        "recommendation": analysis.get("recommendation", "N/A"),
+        "score_components": analysis.get("score_components", {}),
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M"),
+        "resume_file": spooled.name,
+        "file_hash": spooled.file_hash,
+        "job_key": job_key,
+        "job_title": job_requirements["job_title"],
+        "source": "inbox",
+    }
+    append_result(entry)
+    logger.info(f"✅ {spooled.name}: {entry['confidence_score']}%" + (" - shortlisted" if entry["shortlisted"] else ""))
+    return entry
+
+
+class InboxWatcher:
+    """Polling watcher: debounce, content-hash dedupe and a bounded analysis pool"""
+
+    def __init__(self, inbox: str, job_requirements: dict, workers: int = WATCH_WORKERS,
+                 debounce_seconds: float = WATCH_DEBOUNCE_SECONDS, shortlist_threshold: float = WATCH_SHORTLIST_THRESHOLD):
+        self.inbox = inbox
+        self.job_requirements = job_requirements
+        self.job_key = job_fingerprint(job_requirements)
+        self.workers = max(1, workers)
+        self.debounce_seconds = debounce_seconds
+        self.shortlist_threshold = shortlist_threshold
+
+        self._changes = {}     # path -> ((size, mtime), monotonic time the stamp was first seen)
+        self._handled = {}     # path -> stamp already turned into work
+        self._sources = deque()  # iterators of SpooledUpload (one per ready file or archive)
+        self._done = {file_hash for file_hash, job_key in processed_keys() if job_key == self.job_key}
+        self._in_flight = set()
+        self.analyzed = 0
+        self.failed = 0
+        self.duplicates = 0
+        self.skipped = []
+
+    def scan(self) -> list:
+        """Paths whose size and mtime have not changed for the debounce window"""
+        now = time.monotonic()
+        present = set()
+        ready = []
+        with os.scandir(self.inbox) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.startswith(".") or entry.name.lower().endswith(_PARTIAL_SUFFIXES):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue  # removed between listing and stat
+                present.add(entry.path)
+                stamp = (stat.st_size, stat.st_mtime_ns)
+                if self._handled.get(entry.path) == stamp:
+                    continue
+                seen = self._changes.get(entry.path)
+                if seen is None or seen[0] != stamp:
+                    self._changes[entry.path] = (stamp, now)
+                elif now - seen[1] >= self.debounce_seconds and stat.st_size > 0:
+                    del self._changes[entry.path]
+                    self._handled[entry.path] = stamp
+                    ready.append(entry.path)
+        # Forget deleted files, so a file saved again under the same name is seen afresh
+        for path in set(self._changes) - present:
+            del self._changes[path]
+        for path in set(self._handled) - present:
+            del self._handled[path]
+        return sorted(ready)
+
+    def _spooled(self, path: str):
+        """SpooledUpload(s) for a ready inbox file: archive members, or the file itself in place"""
+        name = os.path.basename(path)
+        try:
+            if is_archive(name):
+                with open(path, "rb") as archive:
+                    yield from iter_archive(archive, skipped=self.skipped)
+                return
+            if is_compressed_file(name):
+                self.skipped.append((name, NOT_A_TAR))
+                logger.warning(f"⚠️ Skipping {name}: {NOT_A_TAR}")
+                return
+            detected = sniff_type(path)
+            if detected is None:
+                self.skipped.append((name, "not a PDF, DOCX or text file"))
+                logger.warning(f"⚠️ Skipping {name}: not a PDF, DOCX or text file")
+                return
+            yield SpooledUpload(name, path, hash_file(path), os.path.getsize(path), detected[1])
+        except OSError as e:
+            logger.warning(f"⚠️ Skipping {name}: {str(e)}")
+
+    def _next_upload(self):
+        """Next resume not yet analyzed for this job, or None when nothing is queued"""
+        while self._sources:
+            for spooled in self._sources[0]:
+                if spooled.file_hash in self._done or spooled.file_hash in self._in_flight:
+                    self.duplicates += 1
+                    logger.info(f"♻️ {spooled.name}: already analyzed for this job - skipped")
+                    continue
+                return spooled
+            self._sources.popleft()
+        return None
+
+    def _finish(self, future, spooled):
+        self._in_flight.discard(spooled.file_hash)
+        try:
+            entry = future.result()
+        except Exception as e:
+            logger.error(f"❌ {spooled.name}: Analysis error - {str(e)}")
+            entry = None
+        if entry is None:
+            # Not retried until the file changes or the watcher restarts
+            self.failed += 1
+        else:
+            self._done.add(spooled.file_hash)
+            self.analyzed += 1
+
+    def run(self, poll_seconds: float = WATCH_POLL_SECONDS, once: bool = False):
+        """Watch until interrupted; with `once`, process what is in the inbox now and return"""
+        os.makedirs(self.inbox, exist_ok=True)
+        logger.info(f"📥 Watching {self.inbox} for {self.job_requirements['job_title']} ({self.job_key}), "
+                    f"{self.workers} worker(s), results -> {INBOX_RESULTS_PATH}")
+        # Analyses queued beyond the running ones - keeps archive unpacking just ahead of the LLM
+        max_pending = self.workers * 2
+        pending = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="inbox") as pool:
+            if once:
+                # Everything already in the inbox counts as settled
+                self.debounce_seconds = 0
+                self.scan()
+            try:
+                while True:
+                    for path in self.scan():
+                        self._sources.append(self._spooled(path))
+
+                    while len(pending) < max_pending:
+                        spooled = self._next_upload()
+                        if spooled is None:
+                            break
+                        self._in_flight.add(spooled.file_hash)
+                        future = pool.submit(analyze, spooled, self.job_requirements, self.job_key, self.shortlist_threshold)
+                        pending[future] = spooled
+
+                    if once and not pending and not self._sources:
+                        break
+                    if not pending:
+                        time.sleep(poll_seconds)
+                        continue
+                    # Waiting on the pool doubles as the poll interval
+                    done, _ = wait(pending, timeout=poll_seconds, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self._finish(future, pending.pop(future))
+            except KeyboardInterrupt:
+                logger.info(f"🛑 Stopping - waiting for {len(pending)} analysis(es) in progress")
+                for future in list(pending):
+                    if not future.cancel():
+                        self._finish(future, pending.pop(future))
+                    else:
+                        self._in_flight.discard(pending.pop(future).file_hash)
+
+        logger.info(f"📊 Inbox watcher: {self.analyzed} analyzed, {self.duplicates} duplicate(s) skipped, "
+                    f"{self.failed} failed, {len(self.skipped)} unsupported file(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze resumes dropped into an inbox folder")
+    parser.add_argument("--inbox", default=WATCH_INBOX, help=f"Folder to watch (default {WATCH_INBOX})")
+    parser.add_argument("--job", help="Job profile id or title (default: JOB_TITLE / REQUIRED_SKILLS from the environment)")
+    parser.add_argument("--workers", type=int, default=WATCH_WORKERS, help="Concurrent analyses")
+    parser.add_argument("--threshold", type=float, default=WATCH_SHORTLIST_THRESHOLD, help="Shortlist threshold score")
+    parser.add_argument("--debounce", type=float, default=WATCH_DEBOUNCE_SECONDS, help="Seconds a file must stay unchanged")
+    parser.add_argument("--poll", type=float, default=WATCH_POLL_SECONDS, help="Seconds between inbox scans")
+    parser.add_argument("--rpm", type=float, default=WATCH_RPM_PER_KEY, help="LLM requests per minute per API key for this process")
+    parser.add_argument("--once", action="store_true", help="Process the current inbox contents and exit")
+    args = parser.parse_args()
+
+    configure_logging()
+    set_requests_per_minute_per_key(args.rpm)
+    watcher = InboxWatcher(args.inbox, job_from_args(args.job), workers=args.workers,
+                           debounce_seconds=args.debounce, shortlist_threshold=args.threshold)
+    watcher.run(poll_seconds=args.poll, once=args.once)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,12 @@
+from utils.contact_extractor import extract_contacts, extract_name
+
+
+def test_name_below_job_title_headline():
+    text = "Senior Software Engineer\nJane Smith\njane.smith@example.com | +1 555 010 2030\n\nExperience\n..."
+
+    assert extract_name(text) == "Jane Smith"
+    assert extract_contacts(text)["name"] == "Jane Smith"
+
+
+def test_name_above_job_title_headline():
+    assert extract_name("John Doe\nData Analyst\njohn@example.com") == "John Doe"
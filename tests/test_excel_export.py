@@ -0,0 +1,17 @@
+from io import BytesIO
+
+import pytest
+
+from utils.excel_export import build_excel_report
+
+openpyxl = pytest.importorskip("openpyxl")
+
+
+def test_list_and_dict_values_are_written_as_text():
+    records = [{"name": "Jane Smith", "skills": ["Python", "AWS"], "score_components": {"skills": 0.9}}]
+
+    sheet = openpyxl.load_workbook(BytesIO(build_excel_report(records))).active
+    rows = list(sheet.iter_rows(values_only=True))
+
+    assert rows[2] == ("name", "skills", "score_components")
+    assert rows[3] == ("Jane Smith", "Python, AWS", '{"skills": 0.9}')
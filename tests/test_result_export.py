@@ -0,0 +1,22 @@
+import pytest
+
+from utils.result_export import export_results, PARQUET
+
+pq = pytest.importorskip("pyarrow.parquet")
+
+
+def test_parquet_export_with_empty_lists_in_first_row(tmp_path):
+    results = [
+        {"name": "Provisional", "skills": [], "confidence_score": 41.5, "gaps": [], "key_strengths": [],
+         "score_components": {}, "provisional": True},
+        {"name": "Analyzed", "skills": ["Python", "AWS"], "confidence_score": 80, "gaps": ["Docker"],
+         "key_strengths": ["Django"], "score_components": {"skills": 0.9, "experience": 1.0, "education": 0.5, "achievements": 0.0}},
+    ]
+
+    result = export_results(results, PARQUET, "candidates", directory=str(tmp_path))
+
+    assert result["status"] == "success", result.get("error")
+    rows = pq.read_table(result["path"]).to_pylist()
+    assert rows[0]["skills"] == [] and rows[1]["skills"] == ["Python", "AWS"]
+    assert rows[1]["gaps"] == ["Docker"]
+    assert rows[1]["score_components"]["skills"] == 0.9
@@ -1,106 +1,306 @@
 """
-API Key Manager - Handles automatic rotation of API keys when rate limits are hit
+API Key Manager - Hot-reloadable API key pool with per-key circuit breakers
+
+Keys are read from Streamlit secrets, the .env file and the environment:
+GROQ_API_KEY_<n> for any n (ordered by n), or a single GROQ_API_KEY. The
+sources are re-checked every KEY_RELOAD_INTERVAL seconds and the pool is
+rebuilt when secrets.toml or .env changes, so keys can be added or removed
+without a restart.
+
+Each key has a circuit breaker: KEY_FAILURE_THRESHOLD consecutive 429/5xx
+responses (or a single 401/403) bench the key for a cooldown, doubling on
+every repeat trip. After the cooldown one trial request is let through (half
+open); a success closes the breaker, a failure benches the key again. Benched keys
+are skipped by rotation, so requests are not wasted on dead keys.
 """
 import os
-from dotenv import load_dotenv
+import re
+import time
 import logging
+import threading
+import sys
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.env import load_env
 
-load_dotenv()
+load_env()
 logger = logging.getLogger(__name__)
 
+ENV_FILE = ".env"
+SECRETS_FILES = (os.path.join(".streamlit", "secrets.toml"), os.path.join(os.path.expanduser("~"), ".streamlit", "secrets.toml"))
+KEY_RELOAD_INTERVAL = float(os.getenv("KEY_RELOAD_INTERVAL", "5"))
+KEY_FAILURE_THRESHOLD = int(os.getenv("KEY_FAILURE_THRESHOLD", "3"))
+KEY_COOLDOWN_SECONDS = float(os.getenv("KEY_COOLDOWN_SECONDS", "60"))
+KEY_AUTH_COOLDOWN_SECONDS = float(os.getenv("KEY_AUTH_COOLDOWN_SECONDS", "3600"))
+KEY_MAX_COOLDOWN_SECONDS = float(os.getenv("KEY_MAX_COOLDOWN_SECONDS", "3600"))
+
+_KEY_NAME = re.compile(r"^GROQ_API_KEY(?:_(\d+))?$")
+_PLACEHOLDERS = {"", "your_first_api_key_here", "your_second_api_key_here", "your_third_api_key_here", "your_groq_key_here"}
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def error_status(error: Exception):
+    """HTTP status of a failed API call (openai exceptions carry status_code), else None"""
+    status = getattr(error, "status_code", None)
+    if isinstance(status, int):
+        return status
+    error_str = str(error).lower()
+    if "rate_limit" in error_str or "429" in error_str:
+        return 429
+    if "401" in error_str or "invalid api key" in error_str or "invalid_api_key" in error_str:
+        return 401
+    match = re.search(r"error code: (5\d\d)", error_str)
+    return int(match.group(1)) if match else None
+
+
+def is_key_failure(status) -> bool:
+    """Statuses that say something about the key or its quota, not the request"""
+    return status in (401, 403, 429) or (status is not None and 500 <= status < 600)
+
+
+def mask_key(key: str) -> str:
+    return f"…{key[-4:]}" if key else "-"
+
+
+def _ordered_keys(values: dict) -> list:
+    """GROQ_API_KEY_<n> ordered by n; GROQ_API_KEY only when no numbered key exists"""
+    numbered = []
+    single = None
+    for name, value in values.items():
+        match = _KEY_NAME.match(name)
+        if not match or not value or str(value).strip() in _PLACEHOLDERS:
+            continue
+        if match.group(1) is None:
+            single = str(value).strip()
+        else:
+            numbered.append((int(match.group(1)), str(value).strip()))
+    keys = [value for _, value in sorted(numbered)] or ([single] if single else [])
+    # Same key listed twice would only double its share of failures
+    return list(dict.fromkeys(keys))
+
+
+class KeyHealth:
+    """Circuit breaker state of one API key"""
+
+    def __init__(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.open_until = 0.0
+        self.last_status = None
+        self.successes = 0
+        self.failures = 0
+
+    def available(self, now: float) -> bool:
+        """Closed, or benched with the cooldown (or an unanswered trial's lease) over"""
+        return self.state == CLOSED or now >= self.open_until
+
+    def take(self, now: float):
+        """Mark the key as used; a benched key gets one trial request per lease"""
+        if self.state != CLOSED:
+            self.state = HALF_OPEN
+            self.open_until = now + KEY_COOLDOWN_SECONDS
+
+    def record_success(self):
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.trips = 0
+        self.successes += 1
+
+    def record_failure(self, status, now: float) -> bool:
+        """Count a failure; returns True when the breaker trips"""
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_status = status
+        auth_failure = status in (401, 403)
+        if self.state == HALF_OPEN or auth_failure or self.consecutive_failures >= KEY_FAILURE_THRESHOLD:
+            base = KEY_AUTH_COOLDOWN_SECONDS if auth_failure else KEY_COOLDOWN_SECONDS
+            cooldown = min(base * (2 ** self.trips), max(base, KEY_MAX_COOLDOWN_SECONDS))
+            self.trips += 1
+            self.state = OPEN
+            self.open_until = now + cooldown
+            return True
+        return False
+
 
 class APIKeyManager:
-    """Manages multiple API keys with automatic rotation on rate limit"""
-    
+    """Pool of API keys with rotation, hot reload and per-key circuit breakers"""
+
     def __init__(self):
-        # Load all API keys from Streamlit secrets or environment
         self.api_keys = []
-        
-        # Try Streamlit secrets first (for cloud deployment)
-        try:
-            import streamlit as st
-            
-            if hasattr(st, 'secrets') and len(st.secrets) > 0:
-                logger.info("🔍 Checking Streamlit secrets for API keys...")
-                
-                # Try direct access to GROQ_API_KEY_1, GROQ_API_KEY_2, etc.
-                for i in range(1, 10):
-                    key_name = f"GROQ_API_KEY_{i}"
-                    try:
-                        key = st.secrets[key_name]
-                        if key and key != "your_first_api_key_here":
-                            self.api_keys.append(key)
-                            logger.info(f"✅ Loaded {key_name} from Streamlit secrets")
-                    except KeyError:
-                        pass  # Key doesn't exist
-                
-                if not self.api_keys:
-                    logger.warning("⚠️ No API keys found in Streamlit secrets")
-            else:
-                logger.info("Streamlit secrets not available, using environment variables")
-                
-        except ImportError:
-            logger.info("Streamlit not imported, using environment variables")
-        except Exception as e:
-            logger.warning(f"Error accessing Streamlit secrets: {e}")
-        
-        # Fallback to environment variables (for local development)
-        if not self.api_keys:
-            logger.info("🔍 Checking environment variables for API keys...")
-            for i in range(1, 10):
-                key = os.getenv(f"GROQ_API_KEY_{i}")
-                if key:
-                    self.api_keys.append(key)
-                    logger.info(f"✅ Loaded API key #{i} from environment")
-        
-        # Last resort: single key
-        if not self.api_keys:
-            single_key = os.getenv("GROQ_API_KEY")
-            if single_key:
-                self.api_keys.append(single_key)
-                logger.info("✅ Loaded single API key from GROQ_API_KEY")
-        
+        self.health = {}          # key -> KeyHealth, kept across reloads
         self.current_index = 0
-        
+        # Shared by every Streamlit session in the process
+        self._lock = threading.RLock()
+        self._source_stamp = None
+        self._checked_at = 0.0
+        # Names ever defined in .env - the file, not the stale os.environ copy, is authoritative for them
+        self._env_file_names = set()
+        self.reload(force=True)
+
         if self.api_keys:
             logger.info(f"🎉 Successfully loaded {len(self.api_keys)} API key(s) for rotation")
         else:
             logger.error("❌ NO API KEYS FOUND!")
             logger.error("For Streamlit Cloud: Add GROQ_API_KEY_1, GROQ_API_KEY_2, GROQ_API_KEY_3 in Settings → Secrets")
             logger.error("For local: Add them to .env file")
-    
+
+    def _stamp(self):
+        """Modification times of the key sources"""
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in (ENV_FILE,) + SECRETS_FILES)
+
+    def _secret_keys(self) -> list:
+        try:
+            import streamlit as st
+
+            if hasattr(st, 'secrets') and len(st.secrets) > 0:
+                return _ordered_keys({name: st.secrets[name] for name in st.secrets.keys() if _KEY_NAME.match(name)})
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.debug(f"Streamlit secrets not available: {e}")
+        return []
+
+    def _environment_keys(self) -> list:
+        values = {name: value for name, value in os.environ.items() if _KEY_NAME.match(name)}
+        if os.path.exists(ENV_FILE):
+            from dotenv import dotenv_values
+            file_values = {name: value for name, value in dotenv_values(ENV_FILE).items() if _KEY_NAME.match(name)}
+            for name in self._env_file_names - set(file_values):
+                values.pop(name, None)  # removed from .env since it was loaded
+            self._env_file_names |= set(file_values)
+            values.update(file_values)
+        return _ordered_keys(values)
+
+    def reload(self, force: bool = False) -> bool:
+        """Re-read the key sources if they changed. Returns True when the pool changed"""
+        with self._lock:
+            stamp = self._stamp()
+            if not force and stamp == self._source_stamp:
+                return False
+            self._source_stamp = stamp
+
+            # Streamlit secrets first (cloud deployment), then .env / environment (local)
+            keys = self._secret_keys() or self._environment_keys()
+            if keys == self.api_keys:
+                return False
+
+            current = self.api_keys[self.current_index] if self.api_keys else None
+            added = len(set(keys) - set(self.api_keys))
+            removed = len(set(self.api_keys) - set(keys))
+            self.api_keys = keys
+            self.health = {key: self.health.get(key) or KeyHealth() for key in keys}
+            self.current_index = keys.index(current) if current in keys else 0
+            if not force:
+                logger.info(f"🔁 API key pool reloaded: {len(keys)} key(s) (+{added} / -{removed})")
+            return True
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at >= KEY_RELOAD_INTERVAL:
+            self._checked_at = now
+            self.reload()
+
     def get_current_key(self):
-        """Get the current API key"""
-        if not self.api_keys:
-            raise ValueError("No API keys configured!")
-        return self.api_keys[self.current_index]
-    
-    def rotate_to_next(self):
-        """Rotate to the next API key in circular fashion"""
-        if len(self.api_keys) <= 1:
-            logger.warning("⚠️ Only 1 API key available, cannot rotate")
-            return self.api_keys[0] if self.api_keys else None
-        
-        old_index = self.current_index
-        self.current_index = (self.current_index + 1) % len(self.api_keys)
+        """Get the current API key, skipping keys whose breaker is open"""
+        self._maybe_reload()
+        with self._lock:
+            if not self.api_keys:
+                raise ValueError("No API keys configured!")
+            now = time.monotonic()
+            for offset in range(len(self.api_keys)):
+                index = (self.current_index + offset) % len(self.api_keys)
+                health = self.health[self.api_keys[index]]
+                if health.available(now):
+                    health.take(now)
+                    self.current_index = index
+                    return self.api_keys[index]
+            retry_in = min(health.open_until for health in self.health.values()) - now
+            raise ValueError(f"All {len(self.api_keys)} API key(s) are benched after repeated failures; next retry in {retry_in:.0f}s")
+
+    def rotate_to_next(self, failed_key=None):
+        """
+        Rotate to the next available API key in circular fashion.
+
+        Pass the key that failed: if another session already rotated away
+        from it, the current key is returned instead of skipping a good one.
+        """
+        with self._lock:
+            if len(self.api_keys) <= 1:
+                logger.warning("⚠️ Only 1 API key available, cannot rotate")
+                return self.api_keys[0] if self.api_keys else None
+            if failed_key is not None and self.api_keys[self.current_index] != failed_key:
+                return self.api_keys[self.current_index]
+            old_index = self.current_index
+            self.current_index = (self.current_index + 1) % len(self.api_keys)
+        try:
+            key = self.get_current_key()
+        except ValueError:
+            return None
         logger.info(f"🔄 Rotating API key: Key #{old_index + 1} → Key #{self.current_index + 1}")
-        return self.api_keys[self.current_index]
-    
+        return key
+
+    def record_success(self, key: str):
+        with self._lock:
+            health = self.health.get(key)
+            if health is not None:
+                if health.state != CLOSED:
+                    logger.info(f"✅ API key {mask_key(key)} recovered")
+                health.record_success()
+
+    def record_failure(self, key: str, status=None):
+        """Count a 401/403/429/5xx against the key; benches it when the breaker trips"""
+        with self._lock:
+            health = self.health.get(key)
+            if health is None:
+                return
+            if health.record_failure(status, time.monotonic()):
+                cooldown = health.open_until - time.monotonic()
+                logger.warning(f"⛔ API key {mask_key(key)} benched for {cooldown:.0f}s after HTTP {status or 'error'}")
+
     def get_key_number(self):
         """Get current key number (1-indexed)"""
         return self.current_index + 1
-    
+
     def get_total_keys(self):
         """Get total number of keys"""
+        self._maybe_reload()
         return len(self.api_keys)
 
+    def get_available_keys(self):
+        """Number of keys whose breaker is not open (sizes the shared rate limit)"""
+        self._maybe_reload()
+        with self._lock:
+            now = time.monotonic()
+            return sum(1 for health in self.health.values() if health.available(now))
+
+    def summary(self) -> list:
+        """Per-key health for display: masked key, state, counts and seconds until retry"""
+        with self._lock:
+            now = time.monotonic()
+            return [
+                {
+                    "key": mask_key(key),
+                    "state": health.state,
+                    "successes": health.successes,
+                    "failures": health.failures,
+                    "last_status": health.last_status,
+                    "retry_in_s": round(max(health.open_until - now, 0)) if health.state != CLOSED else 0,
+                }
+                for key, health in self.health.items()
+            ]
+
 
 # Global instance
 _api_key_manager = None
+_api_key_manager_lock = threading.Lock()
 
 def get_api_key_manager():
     """Get or create the global API key manager"""
     global _api_key_manager
-    if _api_key_manager is None:
-        _api_key_manager = APIKeyManager()
+    with _api_key_manager_lock:
+        if _api_key_manager is None:
+            _api_key_manager = APIKeyManager()
     return _api_key_manager
@@ -0,0 +1,188 @@
+"""
+Archive Ingest - ZIP / tar.gz resume drops streamed into the upload spool
+
+Archive members are read one at a time: each is streamed from the archive
+into the content-addressed spool (data/uploads) and yielded as a
+SpooledUpload, so an archive of thousands of resumes never has more than one
+member in flight and nothing is extracted to memory. ZIPs are read through
+their central directory; tar archives (plain, gz, bz2, xz) are read as a
+forward-only stream.
+
+A member's type comes from its content, not its name: %PDF header -> PDF, a
+ZIP container with word/document.xml -> DOCX, NUL-free decodable text -> TXT.
+Anything else (images, legacy .doc, nested archives) is skipped and reported.
+"""
+import os
+import tarfile
+import zipfile
+import logging
+
+from utils.upload_spool import UPLOAD_DIR, SpooledUpload, spool_stream, commit_spooled, spool_upload
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+# The uploader matches the last extension only, so "gz" / "bz2" / "xz" also admit single compressed files
+ARCHIVE_UPLOAD_TYPES = ["zip", "tar", "gz", "tgz", "bz2", "xz"]
+COMPRESSED_EXTENSIONS = (".gz", ".bz2", ".xz")
+NOT_A_TAR = "compressed file is not a tar archive - upload the file itself, a .zip or a .tar.gz"
+ARCHIVE_MAX_MEMBERS = int(os.getenv("ARCHIVE_MAX_MEMBERS", "10000"))
+ARCHIVE_MAX_MEMBER_MB = float(os.getenv("ARCHIVE_MAX_MEMBER_MB", "20"))
+
+PDF = (".pdf", "application/pdf")
+DOCX = (".docx", "application/vnd.openxmlformats-officedocument.wordprocessingml.document")
+TXT = (".txt", "text/plain")
+
+_SNIFF_BYTES = 8192
+
+
+def is_archive(file_name: str) -> bool:
+    return file_name.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def is_compressed_file(file_name: str) -> bool:
+    """A single compressed file (resume.pdf.gz) - not readable as a resume or an archive"""
+    return file_name.lower().endswith(COMPRESSED_EXTENSIONS) and not is_archive(file_name)
+
+
+def _looks_like_text(head: bytes) -> bool:
+    if not head or b"\x00" in head or head.startswith(b"{\\rtf"):
+        return False
+    try:
+        # A multi-byte character may be cut at the end of the sample
+        head.decode("utf-8")
+        return True
+    except UnicodeDecodeError as e:
+        if e.start >= len(head) - 3:
+            return True
+    printable = sum(1 for byte in head if byte >= 32 or byte in (9, 10, 13))
+    return printable / len(head) > 0.95
+
+
+def sniff_type(path: str):
+    """(extension, mime) of a resume file judged by its content, or None if unsupported"""
+    with open(path, "rb") as f:
+        head = f.read(_SNIFF_BYTES)
+    if b"%PDF" in head[:1024]:
+        return PDF
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(path) as container:
+                return DOCX if "word/document.xml" in container.namelist() else None
+        except zipfile.BadZipFile:
+            return None
+    return TXT if _looks_like_text(head) else None
+
+
+def _skip_name(member_name: str) -> bool:
+    """Folders and OS metadata (__MACOSX, .DS_Store, ._resume.pdf)"""
+    base = os.path.basename(member_name.rstrip("/"))
+    return not base or base.startswith(".") or member_name.startswith("__MACOSX/")
+
+
+def _iter_zip_members(fileobj):
+    with zipfile.ZipFile(fileobj) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or _skip_name(info.filename):
+                continue
+            if info.flag_bits & 0x1:
+                yield info.filename, None, "encrypted"
+                continue
+            with archive.open(info) as stream:
+                yield info.filename, stream, None
+
+
+def _iter_tar_members(fileobj):
+    # "r|*": forward-only stream with any compression - no seeking, no member index in memory
+    with tarfile.open(fileobj=fileobj, mode="r|*") as archive:
+        for member in archive:
+            if not member.isfile() or _skip_name(member.name):
+                continue
+            stream = archive.extractfile(member)
+            if stream is None:
+                continue
+            yield member.name, stream, None
+
+
+def count_members(uploaded_file):
+    """Number of file entries for a ZIP (from its central directory); None for tar streams"""
+    if not uploaded_file.name.lower().endswith(".zip"):
+        return None
+    uploaded_file.seek(0)
+    try:
+        with zipfile.ZipFile(uploaded_file) as archive:
+            return sum(1 for info in archive.infolist() if not info.is_dir() and not _skip_name(info.filename))
+    except zipfile.BadZipFile:
+        return 0
+    finally:
+        uploaded_file.seek(0)
+
+
+def iter_archive(uploaded_file, directory: str = UPLOAD_DIR, skipped: list = None):
+    """
+    Yield a SpooledUpload for each resume inside an uploaded archive, lazily.
+
+    Members that are not resumes, too large or unreadable are appended to
+    `skipped` as (member name, reason).
+    """
+    skipped = skipped if skipped is not None else []
+    max_bytes = int(ARCHIVE_MAX_MEMBER_MB * 1024 * 1024)
+    uploaded_file.seek(0)
+    members = _iter_zip_members(uploaded_file) if uploaded_file.name.lower().endswith(".zip") else _iter_tar_members(uploaded_file)
+
+    count = 0
+    skipped_before = len(skipped)
+    try:
+        for member_name, stream, problem in members:
+            if problem:
+                skipped.append((member_name, problem))
+                continue
+            if count >= ARCHIVE_MAX_MEMBERS:
+                skipped.append((member_name, f"archive limit of {ARCHIVE_MAX_MEMBERS} files reached"))
+                break
+            try:
+                temp_path, file_hash, size = spool_stream(stream, directory, max_bytes=max_bytes)
+            except ValueError as e:
+                skipped.append((member_name, str(e)))
+                continue
+            detected = sniff_type(temp_path)
+            if detected is None:
+                os.remove(temp_path)
+                skipped.append((member_name, "not a PDF, DOCX or text file"))
+                continue
+            extension, mime = detected
+            path = commit_spooled(temp_path, file_hash, extension, directory)
+            count += 1
+            yield SpooledUpload(os.path.basename(member_name), path, file_hash, size, mime)
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError, OSError) as e:
+        skipped.append((uploaded_file.name, f"unreadable archive: {str(e)}"))
+    finally:
+        uploaded_file.seek(0)
+
+    logger.info(f"📦 {uploaded_file.name}: {count} resume(s) unpacked, {len(skipped) - skipped_before} member(s) skipped")
+
+
+def iter_spooled_uploads(uploaded_files, directory: str = UPLOAD_DIR, skipped: list = None):
+    """Spool plain uploads and unpack archives, yielding one SpooledUpload per resume"""
+    skipped = skipped if skipped is not None else []
+    for uploaded_file in uploaded_files:
+        if is_archive(uploaded_file.name):
+            yield from iter_archive(uploaded_file, directory, skipped)
+        elif is_compressed_file(uploaded_file.name):
+            skipped.append((uploaded_file.name, NOT_A_TAR))
+        else:
+            yield spool_upload(uploaded_file, directory)
+
+
+def count_resumes(uploaded_files):
+    """Expected number of resumes in a batch (ZIP entries counted), or None when a tar stream makes it unknown"""
+    total = 0
+    for uploaded_file in uploaded_files:
+        if is_archive(uploaded_file.name):
+            members = count_members(uploaded_file)
+            if members is None:
+                return None
+            total += members
+        elif not is_compressed_file(uploaded_file.name):
+            total += 1
+    return total
@@ -0,0 +1,136 @@
+"""
+Batch Scheduler - Deadline- and token-budget-aware, best-first bulk analysis
+
+Before a bulk run with a deadline or token budget, every new resume gets a
+cheap local relevance estimate from its raw text (required skills found in the
+text, experience from the resume dates, degree level), using the same
+components and weights as the confidence score. Resumes are then analyzed
+best-first, so the strongest candidates are done first.
+
+BatchBudget decides before each LLM analysis whether another one still fits:
+the expected duration and token cost come from the analyses already run in
+this batch (priors from ANALYSIS_SECONDS_ESTIMATE / ANALYSIS_TOKENS_ESTIMATE
+before the first one). Once it says no, the remaining resumes keep their local
+estimate as a provisional score, clearly marked as such.
+"""
+import os
+import re
+import time
+import logging
+
+import numpy as np
+
+from utils.scoring_engine import COMPONENTS, apply_weights, education_score, experience_fit, required_skills, skill_match_matrix
+from utils.upload_spool import iter_extracted
+
+logger = logging.getLogger(__name__)
+
+ANALYSIS_SECONDS_ESTIMATE = float(os.getenv("ANALYSIS_SECONDS_ESTIMATE", "10"))
+ANALYSIS_TOKENS_ESTIMATE = float(os.getenv("ANALYSIS_TOKENS_ESTIMATE", "3000"))
+PROVISIONAL_NOTE = "Provisional local estimate - not analyzed by the AI agents (deadline or token budget reached)"
+
+DEADLINE = "deadline"
+TOKEN_BUDGET = "token budget"
+
+_ACHIEVEMENT_WORDS = re.compile(r"\b(?:award(?:ed)?|winner|certified|certification|patent|published|hackathon|scholarship)\b", re.IGNORECASE)
+
+
+def relevance_components(texts: list, job_requirements: dict, experience_years: list) -> np.ndarray:
+    """(resumes x 4) components estimated from raw text - no parsing, no API calls"""
+    components = np.zeros((len(texts), len(COMPONENTS)))
+    if not texts:
+        return components
+
+    required = required_skills(job_requirements)
+    if required:
+        # The whole text acts as one long "skill entry": any spelling of a required skill counts
+        components[:, 0] = skill_match_matrix([[text] for text in texts], required).mean(axis=1)
+    else:
+        components[:, 0] = 1.0
+
+    years = np.array([np.nan if value is None else value for value in experience_years], dtype=float)
+    fit = experience_fit(
+        years,
+        float(job_requirements.get("min_experience", 0) or 0),
+        float(job_requirements.get("max_experience", 99) or 0),
+    )
+    # Unknown experience is neither rewarded nor ruled out
+    components[:, 1] = np.where(np.isnan(years), 0.5, fit)
+    components[:, 2] = [education_score([text]) for text in texts]
+    components[:, 3] = [min(1.0, len(_ACHIEVEMENT_WORDS.findall(text)) / 3) for text in texts]
+    return components
+
+
+def estimate_relevance(spooled_files: list, job_requirements: dict, experience: dict, weights: dict = None,
+                       chunk_size: int = 64) -> dict:
+    """file_hash -> local relevance score (0-100) for spooled uploads, re-read through the extraction pipeline"""
+    estimates = {}
+    chunk = []
+
+    def flush():
+        components = relevance_components(
+            [text for _, text in chunk], job_requirements, [experience.get(file_hash) for file_hash, _ in chunk]
+        )
+        for (file_hash, _), score in zip(chunk, apply_weights(components, weights).tolist()):
+            estimates[file_hash] = score
+        chunk.clear()
+
+    for spooled, (text, success, _) in iter_extracted(spooled_files):
+        if not success:
+            estimates[spooled.file_hash] = 0.0
+            continue
+        chunk.append((spooled.file_hash, text))
+        if len(chunk) >= chunk_size:
+            flush()
+    if chunk:
+        flush()
+    return estimates
+
+
+class BatchBudget:
+    """Wall-clock deadline and/or token budget for the LLM work of one bulk run"""
+
+    def __init__(self, deadline_seconds: float = None, token_budget: float = None,
+                 seconds_estimate: float = ANALYSIS_SECONDS_ESTIMATE, tokens_estimate: float = ANALYSIS_TOKENS_ESTIMATE):
+        self.started = time.monotonic()
+        self.deadline = self.started + deadline_seconds if deadline_seconds else None
+        self.token_budget = token_budget or None
+        self.seconds_estimate = seconds_estimate
+        self.tokens_estimate = tokens_estimate
+        self.analyses = 0
+        self.seconds_spent = 0.0
+        self.tokens_used = 0
+        self.stop_reason = None
+
+    def expected_seconds(self) -> float:
+        return self.seconds_spent / self.analyses if self.analyses else self.seconds_estimate
+
+    def expected_tokens(self) -> float:
+        return self.tokens_used / self.analyses if self.analyses else self.tokens_estimate
+
+    def can_start(self) -> bool:
+        """Whether one more LLM analysis is expected to fit; once False, stays False"""
+        if self.stop_reason:
+            return False
+        if self.deadline is not None and time.monotonic() + self.expected_seconds() > self.deadline:
+            self.stop_reason = DEADLINE
+        elif self.token_budget is not None and self.tokens_used + self.expected_tokens() > self.token_budget:
+            self.stop_reason = TOKEN_BUDGET
+        if self.stop_reason:
+            logger.info(f"⏱️ Stopping LLM analysis: {self.stop_reason} reached after {self.analyses} analyses "
+                        f"({self.tokens_used} tokens, {time.monotonic() - self.started:.0f} s)")
+        return not self.stop_reason
+
+    def record(self, seconds: float, tokens: int):
+        """Account one finished analysis; providers that report no usage are charged the estimate"""
+        self.analyses += 1
+        self.seconds_spent += seconds
+        self.tokens_used += tokens or int(self.tokens_estimate)
+
+    def describe(self) -> str:
+        parts = []
+        if self.deadline is not None:
+            parts.append(f"{max(self.deadline - time.monotonic(), 0):.0f} s left")
+        if self.token_budget is not None:
+            parts.append(f"{self.tokens_used:,}/{self.token_budget:,.0f} tokens")
+        return ", ".join(parts)
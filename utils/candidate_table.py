@@ -0,0 +1,300 @@
+"""
+Candidate Table - Columnar, append-only store for the session's analysed candidates
+
+Replaces the list of result dicts: scores, experience and flags live in typed
+numpy arrays, score components in an (n, 4) float32 matrix, and skills as ids
+into an interned vocabulary (one flat int32 array plus row offsets). Totals,
+shortlisted count and average score are kept as running aggregates, so the
+sidebar statistics are O(1) and filters are vectorized masks.
+
+Rows are materialized back into the familiar result dict (`row(i)`, iteration)
+only where a consumer needs one: a page of candidate cards, an export, an
+email batch.
+
+Provisional rows (local estimates left by a deadline/budget-limited run) are
+retired when the real analysis of the same file is appended; retired rows are
+excluded from every view and aggregate.
+"""
+import sys
+import numpy as np
+
+from utils.scoring_engine import COMPONENTS, apply_weights
+
+# Column order of the entry dicts and of the DataFrame
+FIELDS = [
+    "name", "email", "phone", "experience_years", "skills", "confidence_score", "shortlisted",
+    "key_strengths", "gaps", "recommendation", "score_components", "date", "resume_file",
+    "file_hash", "duplicate_of", "provisional",
+]
+_TEXT_FIELDS = ["name", "email", "phone", "recommendation", "date", "resume_file", "file_hash", "duplicate_of"]
+_TEXT_DEFAULTS = {"name": "Unknown", "email": "", "phone": "N/A", "recommendation": "N/A"}
+_INITIAL_CAPACITY = 64
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class CandidateTable:
+    """Append-only columns + running aggregates; `version` changes on every write"""
+
+    def __init__(self):
+        self.version = 0
+        self._size = 0
+        self._score = np.zeros(_INITIAL_CAPACITY, dtype=np.float64)
+        self._experience = np.zeros(_INITIAL_CAPACITY, dtype=np.float64)
+        self._shortlisted = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._duplicate = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._provisional = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._retired = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+        self._components = np.zeros((_INITIAL_CAPACITY, len(COMPONENTS)), dtype=np.float32)
+        self._has_components = np.zeros(_INITIAL_CAPACITY, dtype=bool)
+
+        # Skills: vocabulary ids, rows are slices skill_ids[offsets[i]:offsets[i + 1]]
+        self._vocabulary = []
+        self._vocabulary_ids = {}
+        self._skill_ids = np.zeros(_INITIAL_CAPACITY * 8, dtype=np.int32)
+        self._skill_offsets = np.zeros(_INITIAL_CAPACITY + 1, dtype=np.int64)
+
+        self._text = {name: [] for name in _TEXT_FIELDS}
+        self._strengths = []
+        self._gaps = []
+        self._extras = {}          # row -> fields outside the schema (rare)
+        self._provisional_rows = {}  # file_hash -> live provisional row
+
+        self._shortlisted_count = 0
+        self._score_sum = 0.0
+        self._retired_count = 0
+        self._frame = None         # (version, DataFrame)
+
+    @classmethod
+    def from_records(cls, records) -> "CandidateTable":
+        table = cls()
+        for record in records:
+            table.append(record)
+        return table
+
+    # --- writes -------------------------------------------------------------
+
+    def _grow(self, rows: int, skills: int):
+        capacity = len(self._score)
+        if self._size + rows > capacity:
+            new_capacity = max(capacity * 2, self._size + rows)
+            for name in ("_score", "_experience", "_shortlisted", "_duplicate", "_provisional", "_retired", "_has_components"):
+                column = getattr(self, name)
+                grown = np.zeros(new_capacity, dtype=column.dtype)
+                grown[:capacity] = column
+                setattr(self, name, grown)
+            components = np.zeros((new_capacity, len(COMPONENTS)), dtype=np.float32)
+            components[:capacity] = self._components
+            self._components = components
+            offsets = np.zeros(new_capacity + 1, dtype=np.int64)
+            offsets[:capacity + 1] = self._skill_offsets
+            self._skill_offsets = offsets
+
+        used = self._skill_offsets[self._size]
+        if used + skills > len(self._skill_ids):
+            grown = np.zeros(max(len(self._skill_ids) * 2, used + skills), dtype=np.int32)
+            grown[:used] = self._skill_ids[:used]
+            self._skill_ids = grown
+
+    def _skill_id(self, skill: str) -> int:
+        skill_id = self._vocabulary_ids.get(skill)
+        if skill_id is None:
+            skill_id = self._vocabulary_ids[skill] = len(self._vocabulary)
+            self._vocabulary.append(sys.intern(skill))
+        return skill_id
+
+    def append(self, entry: dict) -> int:
+        """Add one result entry; returns its row index"""
+        file_hash = entry.get("file_hash")
+        if file_hash in self._provisional_rows:
+            self.retire(self._provisional_rows.pop(file_hash))
+        skills = [str(skill) for skill in entry.get("skills") or []]
+        self._grow(1, len(skills))
+        row = self._size
+
+        score = float(entry.get("confidence_score") or 0)
+        duplicate = bool(entry.get("duplicate_of"))
+        # Near-duplicates are never shortlisted - the original row is
+        shortlisted = bool(entry.get("shortlisted", False)) and not duplicate
+        self._score[row] = score
+        self._experience[row] = float(entry.get("experience_years") or 0)
+        self._shortlisted[row] = shortlisted
+        self._duplicate[row] = duplicate
+        self._provisional[row] = bool(entry.get("provisional"))
+        if self._provisional[row] and file_hash:
+            self._provisional_rows[file_hash] = row
+
+        components = entry.get("score_components")
+        if components:
+            self._components[row] = [components.get(name, 0.0) for name in COMPONENTS]
+            self._has_components[row] = True
+
+        start = self._skill_offsets[row]
+        self._skill_ids[start:start + len(skills)] = [self._skill_id(skill) for skill in skills]
+        self._skill_offsets[row + 1] = start + len(skills)
+
+        for name in _TEXT_FIELDS:
+            self._text[name].append(_intern(entry.get(name, _TEXT_DEFAULTS.get(name))))
+        self._strengths.append(tuple(entry.get("key_strengths") or ()))
+        self._gaps.append(tuple(entry.get("gaps") or ()))
+        extras = {key: value for key, value in entry.items() if key not in FIELDS}
+        if extras:
+            self._extras[row] = extras
+
+        self._size += 1
+        self._shortlisted_count += shortlisted
+        self._score_sum += score
+        self.version += 1
+        return row
+
+    def retire(self, row: int):
+        """Drop a row from every view and aggregate (storage is append-only)"""
+        if self._retired[row]:
+            return
+        self._retired[row] = True
+        self._retired_count += 1
+        self._shortlisted_count -= int(self._shortlisted[row])
+        self._score_sum -= float(self._score[row])
+        self.version += 1
+
+    def rescore(self, weights: dict, threshold: float) -> int:
+        """Re-score every row that has score components - one vectorized pass. Returns rows updated"""
+        rows = np.flatnonzero(self._has_components[:self._size] & self.active)
+        if not len(rows):
+            return 0
+        scores = apply_weights(self._components[rows], weights)
+        self._score[rows] = scores
+        self._shortlisted[rows] = (scores >= threshold) & ~self._duplicate[rows]
+        self._shortlisted_count = int(self.shortlisted[self.active].sum())
+        self._score_sum = float(self.scores[self.active].sum())
+        self.version += 1
+        return len(rows)
+
+    # --- aggregates and filters --------------------------------------------
+
+    def __len__(self):
+        return self._size - self._retired_count
+
+    def stats(self) -> dict:
+        """Running aggregates - no scan"""
+        total = len(self)
+        return {
+            "total": total,
+            "shortlisted": self._shortlisted_count,
+            "avg_score": self._score_sum / total if total else 0.0,
+        }
+
+    @property
+    def scores(self) -> np.ndarray:
+        return self._score[:self._size]
+
+    @property
+    def shortlisted(self) -> np.ndarray:
+        return self._shortlisted[:self._size]
+
+    @property
+    def duplicates(self) -> np.ndarray:
+        return self._duplicate[:self._size]
+
+    @property
+    def provisional(self) -> np.ndarray:
+        return self._provisional[:self._size]
+
+    @property
+    def active(self) -> np.ndarray:
+        return ~self._retired[:self._size]
+
+    def column(self, name: str) -> list:
+        """A text column (name, resume_file, file_hash, ...)"""
+        return self._text[name]
+
+    def mask(self, min_score: float = 0, shortlisted_only: bool = False, hide_duplicates: bool = False) -> np.ndarray:
+        """Boolean row mask for the results filters"""
+        keep = (self.scores >= min_score) & self.active
+        if shortlisted_only:
+            keep &= self.shortlisted
+        if hide_duplicates:
+            keep &= ~self.duplicates
+        return keep
+
+    def ranked(self, hide_duplicates: bool = True) -> np.ndarray:
+        """Row indices by score, highest first (ties keep insertion order)"""
+        rows = np.flatnonzero(self.active & ~self.duplicates) if hide_duplicates else np.flatnonzero(self.active)
+        return rows[np.argsort(-self.scores[rows], kind="stable")]
+
+    # --- materialization ---------------------------------------------------
+
+    def skills(self, row: int) -> list:
+        ids = self._skill_ids[self._skill_offsets[row]:self._skill_offsets[row + 1]]
+        return [self._vocabulary[i] for i in ids]
+
+    def components(self, row: int):
+        if not self._has_components[row]:
+            return None
+        return {name: round(float(value), 3) for name, value in zip(COMPONENTS, self._components[row])}
+
+    def row(self, row: int) -> dict:
+        """One candidate as a result dict (a fresh copy - edits don't write back)"""
+        text = self._text
+        experience = float(self._experience[row])
+        entry = {
+            "name": text["name"][row],
+            "email": text["email"][row],
+            "phone": text["phone"][row],
+            "experience_years": int(experience) if experience.is_integer() else round(experience, 2),
+            "skills": self.skills(row),
+            "confidence_score": round(float(self._score[row]), 1),
+            "shortlisted": bool(self._shortlisted[row]),
+            "key_strengths": list(self._strengths[row]),
+            "gaps": list(self._gaps[row]),
+            "recommendation": text["recommendation"][row],
+        }
+        components = self.components(row)
+        if components is not None:
+            entry["score_components"] = components
+        for name in ("date", "resume_file", "file_hash", "duplicate_of"):
+            if text[name][row] is not None:
+                entry[name] = text[name][row]
+        if self._provisional[row]:
+            entry["provisional"] = True
+        entry.update(self._extras.get(row, {}))
+        return entry
+
+    def rows(self, indices=None):
+        """Yield result dicts for the given row indices (all live rows by default)"""
+        for row in (np.flatnonzero(self.active) if indices is None else indices):
+            yield self.row(int(row))
+
+    def __iter__(self):
+        return self.rows()
+
+    def frame(self, mask: np.ndarray = None):
+        """DataFrame of the table (built column-wise once per version), optionally filtered"""
+        import pandas as pd
+
+        if self._frame is None or self._frame[0] != self.version:
+            n = self._size
+            text = self._text
+            data = {
+                "name": text["name"],
+                "email": text["email"],
+                "phone": text["phone"],
+                "experience_years": self._experience[:n].copy(),
+                "skills": [self.skills(row) for row in range(n)],
+                "confidence_score": np.round(self._score[:n], 1),
+                "shortlisted": self._shortlisted[:n].copy(),
+                "key_strengths": [list(values) for values in self._strengths],
+                "gaps": [list(values) for values in self._gaps],
+                "recommendation": text["recommendation"],
+                "score_components": [self.components(row) for row in range(n)],
+                "date": text["date"],
+                "resume_file": text["resume_file"],
+                "file_hash": text["file_hash"],
+                "duplicate_of": text["duplicate_of"],
+                "provisional": self._provisional[:n].copy(),
+            }
+            self._frame = (self.version, pd.DataFrame(data, columns=FIELDS))
+        frame = self._frame[1]
+        return frame[self.active] if mask is None else frame[mask]
@@ -0,0 +1,134 @@
+"""
+Contact Extractor - Fast local (LLM-free) extraction of name, email, phone and skills
+
+Built for bulk Excel exports where only contact details and a rough skills
+list are needed. Everything is regex/heuristic based and runs on CPU.
+"""
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTACT_FIELDS = ["name", "email", "phone", "skills"]
+
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}")
+_PHONE_RE = re.compile(r"(?<![\w/])(\+?\(?\d[\d\s().-]{7,}\d)(?![\w/])")
+_URL_RE = re.compile(r"(?:https?://|www\.)\S+|linkedin\.com\S*|github\.com\S*", re.IGNORECASE)
+_SKILLS_HEADER_RE = re.compile(r"^(?:technical |key |core |professional |it )?(?:skills?|skill set|competenc(?:y|ies)|technologies|tech stack|tools)(?:\s*(?:&|and)\s*\w+)?\s*:?\s*(?P<inline>.*)$", re.IGNORECASE)
+_SECTION_HEADER_RE = re.compile(r"^(?:work |professional )?(?:experience|employment|education|projects?|certifications?|achievements|awards|summary|profile|objective|languages|hobbies|interests|references|personal|declaration|internships?|trainings?)\b", re.IGNORECASE)
+_NAME_STOPWORDS = {
+    "resume", "curriculum", "vitae", "cv", "profile", "contact", "address", "email", "phone", "mobile",
+    "summary", "objective", "skills", "experience", "education", "technical", "professional",
+    # Job-title headlines ("Senior Software Engineer") often sit above or below the name
+    "engineer", "developer", "manager", "analyst", "consultant", "senior", "junior", "lead", "intern",
+    "architect", "administrator", "specialist", "designer", "scientist", "director", "trainee", "software",
+}
+_SKILL_SPLIT_RE = re.compile(r"[,;|•·▪●■◦•\t]| {2,}|\s-\s")
+
+
+def normalize_phone(raw: str):
+    """Normalize a phone number to +<country><number> / digits, or None if implausible"""
+    has_plus = raw.strip().startswith("+")
+    digits = re.sub(r"\D", "", raw)
+    if digits.startswith("00"):
+        digits, has_plus = digits[2:], True
+    if not 10 <= len(digits) <= 15:
+        return None
+    if has_plus:
+        return "+" + digits
+    country_code = os.getenv("DEFAULT_COUNTRY_CODE", "")
+    if country_code and len(digits) == 10:
+        return f"+{country_code.lstrip('+')}{digits}"
+    return digits
+
+
+def extract_email(text: str):
+    match = _EMAIL_RE.search(text)
+    return match.group() if match else None
+
+
+def extract_phone(text: str):
+    for match in _PHONE_RE.finditer(text):
+        candidate = match.group(1)
+        # Date ranges such as 2019-2021 look like digit runs too
+        if re.fullmatch(r"\d{4}\s*[-–]\s*\d{4}", candidate.strip()):
+            continue
+        phone = normalize_phone(candidate)
+        if phone:
+            return phone
+    return None
+
+
+def extract_name(text: str, max_lines: int = 6):
+    """Heuristic: the first short, mostly-alphabetic header line is the name"""
+    checked = 0
+    for line in text.splitlines():
+        line = _URL_RE.sub("", _EMAIL_RE.sub("", line)).strip(" |,-:\t")
+        if not line:
+            continue
+        checked += 1
+        if checked > max_lines:
+            break
+        # "Name: John Doe" style
+        labelled = re.match(r"^name\s*[:\-]\s*(.+)$", line, re.IGNORECASE)
+        if labelled:
+            line = labelled.group(1).strip()
+        words = line.split()
+        if not 2 <= len(words) <= 4:
+            continue
+        if any(word.lower().strip(".") in _NAME_STOPWORDS for word in words):
+            continue
+        if not all(re.fullmatch(r"[A-Za-z][A-Za-z.'-]*", word) for word in words):
+            continue
+        return " ".join(word if word.isupper() and len(word) <= 2 else word.capitalize() for word in words)
+    return None
+
+
+def extract_skills(text: str, max_skills: int = 60) -> list:
+    """Parse the skills section: comma/bullet/pipe separated items, labels stripped"""
+    skills = []
+    seen = set()
+    in_section = False
+    for line in text.splitlines():
+        stripped = line.strip(" \t*#-•")
+        header = _SKILLS_HEADER_RE.match(stripped) if len(stripped) <= 120 else None
+        if header and (len(stripped) <= 40 or ":" in stripped):
+            in_section = True
+            stripped = header.group("inline")
+        elif in_section and _SECTION_HEADER_RE.match(stripped) and re.fullmatch(r"[A-Za-z &/]{3,40}:?", stripped):
+            in_section = False
+            continue
+        if not in_section or not stripped:
+            continue
+
+        # "Languages: Python, Java" -> drop the label
+        if ":" in stripped:
+            stripped = stripped.split(":", 1)[1]
+        for item in _SKILL_SPLIT_RE.split(stripped):
+            item = item.strip(" .-")
+            if item.count("(") != item.count(")"):
+                item = item.strip("()")
+            key = item.lower()
+            if 1 < len(item) <= 40 and len(item.split()) <= 5 and key not in seen:
+                seen.add(key)
+                skills.append(item)
+                if len(skills) >= max_skills:
+                    return skills
+    return skills
+
+
+def extract_contacts(text: str) -> dict:
+    """Local extraction result in the same shape as the parsing agent output"""
+    return {
+        "status": "success",
+        "name": extract_name(text),
+        "email": extract_email(text),
+        "phone": extract_phone(text),
+        "skills": extract_skills(text),
+    }
+
+
+def missing_fields(result: dict) -> list:
+    """Contact fields the local pass could not fill"""
+    return [field for field in CONTACT_FIELDS if not result.get(field)]
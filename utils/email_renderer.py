@@ -0,0 +1,57 @@
+"""
+Email Renderer - Renders outreach emails locally from stored analysis fields
+
+Emails are produced with Jinja2 on demand (only for the candidates a
+recruiter asks for) instead of being generated by the LLM for every resume.
+"""
+import os
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "templates")
+SUBJECT_TEMPLATE = "Interview Opportunity - {{ job_title }} at {{ company_name }}"
+
+
+@lru_cache(maxsize=1)
+def _environment():
+    """Jinja2 environment, created once per process (templates compile once)"""
+    from jinja2 import Environment, FileSystemLoader, select_autoescape
+
+    return Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        autoescape=select_autoescape(["html"], default_for_string=False),
+        trim_blocks=True,
+        lstrip_blocks=True,
+    )
+
+
+def render_outreach_emails(candidates: list, job_title: str, company_name: str = None,
+                           sender_name: str = None, template_name: str = "shortlist_email.html",
+                           max_strengths: int = 3) -> list:
+    """Render one email per candidate. Returns [{name, email, subject, body}]"""
+    env = _environment()
+    body_template = env.get_template(template_name)
+    subject_template = env.from_string(SUBJECT_TEMPLATE)
+
+    company_name = company_name or os.getenv("COMPANY_NAME", "our company")
+    sender_name = sender_name or os.getenv("SENDER_NAME", "The Recruiting Team")
+    subject = subject_template.render(job_title=job_title, company_name=company_name)
+
+    emails = []
+    for candidate in candidates:
+        emails.append({
+            "name": candidate.get("name", ""),
+            "email": candidate.get("email", ""),
+            "subject": subject,
+            "body": body_template.render(
+                candidate=candidate,
+                job_title=job_title,
+                company_name=company_name,
+                sender_name=sender_name,
+                strengths=(candidate.get("key_strengths") or [])[:max_strengths],
+            ),
+        })
+    logger.info(f"✉️ Rendered {len(emails)} outreach email(s)")
+    return emails
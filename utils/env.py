@@ -0,0 +1,13 @@
+"""
+Environment - Loads the .env file once per process
+"""
+_loaded = False
+
+
+def load_env():
+    """Load .env into os.environ on first call; later calls are no-ops"""
+    global _loaded
+    if not _loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _loaded = True
@@ -0,0 +1,149 @@
+"""
+Experience Calculator - Deterministic full-time experience from resume date ranges
+
+Date ranges such as "Oct 2023 - July 2025", "10/2019 – Present" or "2018 - 2020"
+are parsed from each resume. Ranges in education/internship/project context
+are ignored, overlapping jobs are merged, and the union is summed. The merge
+runs vectorized over every interval of a whole batch at once.
+"""
+import re
+import logging
+from datetime import date
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH_RE = r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_DATE_RE = (
+    rf"(?:{_MONTH_RE}\.?,?\s*'?\d{{4}}|{_MONTH_RE}\.?\s*'\d{{2}}"
+    r"|\d{1,2}[/.-]\d{4}|\d{4}[/.-]\d{1,2}(?!\d)|(?<!\d)\d{4}(?!\d))"
+)
+_PRESENT_RE = r"(?:present|current(?:ly)?|now|ongoing|today|till\s+date|to\s+date|date)"
+_RANGE_RE = re.compile(
+    rf"(?P<start>{_DATE_RE})\s*(?:-|–|—|to|till|until)\s*(?P<end>{_DATE_RE}|{_PRESENT_RE})",
+    re.IGNORECASE,
+)
+
+_EXPERIENCE_HEADERS = re.compile(r"^(?:work |professional |employment |career )?(?:experience|employment|work history|career history)", re.IGNORECASE)
+_OTHER_HEADERS = re.compile(r"^(?:education|academic|qualifications?|internships?|projects?|certifications?|trainings?|skills|technical skills|summary|profile|objective|achievements|awards|languages|hobbies|interests|references|personal)", re.IGNORECASE)
+_EXCLUDE_CONTEXT = re.compile(r"\b(?:intern(?:ship)?|trainee|apprentice|b\.?\s?tech|m\.?\s?tech|b\.?\s?e\b|bachelor|master|degree|diploma|university|college|school|cgpa|gpa)\b", re.IGNORECASE)
+
+
+def _parse_date(token: str, today: date):
+    """Convert a date token to a month ordinal (year * 12 + month - 1)"""
+    token = token.strip().lower()
+    if re.fullmatch(_PRESENT_RE, token, re.IGNORECASE):
+        return today.year * 12 + today.month - 1
+
+    month_match = re.match(_MONTH_RE, token)
+    if month_match:
+        month = _MONTHS[month_match.group()[:3]]
+        year_text = re.search(r"'?(\d{2,4})$", token).group(1)
+        year = int(year_text) if len(year_text) == 4 else 2000 + int(year_text)
+    else:
+        numbers = [int(n) for n in re.findall(r"\d+", token)]
+        if len(numbers) == 1:
+            year, month = numbers[0], 1
+        elif numbers[0] > 31:
+            year, month = numbers
+        else:
+            month, year = numbers
+    if not (1950 <= year <= today.year + 1) or not (1 <= month <= 12):
+        return None
+    return year * 12 + month - 1
+
+
+def _is_header(line: str) -> bool:
+    stripped = line.strip(" :-_*#\t")
+    return 0 < len(stripped) <= 40 and not any(ch.isdigit() for ch in stripped)
+
+
+def extract_date_ranges(text: str, today: date = None) -> list:
+    """[(start_month, end_month)] for full-time work periods found in a resume"""
+    today = today or date.today()
+    lines = text.splitlines()
+    has_experience_section = any(_is_header(line) and _EXPERIENCE_HEADERS.match(line.strip(" :-_*#\t")) for line in lines)
+
+    ranges = []
+    section = None
+    for i, line in enumerate(lines):
+        if _is_header(line):
+            header = line.strip(" :-_*#\t")
+            if _EXPERIENCE_HEADERS.match(header):
+                section = "experience"
+                continue
+            if _OTHER_HEADERS.match(header):
+                section = "other"
+                continue
+
+        if has_experience_section and section != "experience":
+            continue
+        if section == "other":
+            continue
+
+        for match in _RANGE_RE.finditer(line):
+            # Role titles often sit on the line above the dates
+            context = line + " " + (lines[i - 1] if i > 0 else "")
+            if _EXCLUDE_CONTEXT.search(context):
+                continue
+            start = _parse_date(match.group("start"), today)
+            end = _parse_date(match.group("end"), today)
+            if start is not None and end is not None and end > start:
+                ranges.append((start, end))
+    return ranges
+
+
+def compute_experience_years(texts: list, today: date = None) -> np.ndarray:
+    """
+    Full-time experience in years for a batch of resume texts.
+    Overlapping periods are counted once. Returns NaN where no dates were found.
+    """
+    today = today or date.today()
+    owners, starts, ends = [], [], []
+    for idx, text in enumerate(texts):
+        for start, end in extract_date_ranges(text or "", today):
+            owners.append(idx)
+            starts.append(start)
+            ends.append(end)
+
+    years = np.full(len(texts), np.nan)
+    if not owners:
+        return years
+
+    owners = np.asarray(owners, dtype=np.int64)
+    # Offset each resume's months into its own block so one global pass never mixes resumes
+    block = (today.year + 2) * 12
+    starts = np.asarray(starts, dtype=np.int64) + owners * block
+    ends = np.asarray(ends, dtype=np.int64) + owners * block
+
+    order = np.lexsort((starts, owners))
+    owners, starts, ends = owners[order], starts[order], ends[order]
+
+    # Latest end seen before each interval (within the same resume)
+    prev_end = np.concatenate(([np.iinfo(np.int64).min], np.maximum.accumulate(ends)[:-1]))
+    first_in_group = np.concatenate(([True], owners[1:] != owners[:-1]))
+    prev_end = np.where(first_in_group, starts, prev_end)
+
+    covered = np.clip(ends - np.maximum(starts, prev_end), 0, None)
+    months = np.bincount(owners, weights=covered, minlength=len(texts))
+    has_dates = np.bincount(owners, minlength=len(texts)) > 0
+    years[has_dates] = np.round(months[has_dates] / 12, 2)
+    return years
+
+
+# Pre-gate outcomes
+IN_BAND = "in_band"
+OUT_OF_BAND = "out_of_band"
+UNKNOWN = "unknown"
+
+
+def experience_gate(years: np.ndarray, min_experience: float, max_experience: float, tolerance: float = 2.0) -> np.ndarray:
+    """Classify candidates against the required experience band (± tolerance years)"""
+    years = np.asarray(years, dtype=float)
+    outside = (years < min_experience - tolerance) | (years > max_experience + tolerance)
+    return np.where(np.isnan(years), UNKNOWN, np.where(outside, OUT_OF_BAND, IN_BAND))
@@ -0,0 +1,58 @@
+"""
+Inbox Store - Persistent results of the watch-folder daemon
+
+scripts/watch_inbox.py appends one JSON line per analyzed resume to
+data/results/inbox_results.jsonl; the Streamlit app reads the file to show
+those candidates next to interactively analyzed ones. Each line is a result
+entry in the app's shape plus the job it was scored against (job_key,
+job_title). Appends are single writes of a whole line, so a reader never sees
+a partial record - a truncated last line is skipped.
+"""
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+INBOX_RESULTS_PATH = os.path.join("data", "results", "inbox_results.jsonl")
+
+_write_lock = threading.Lock()
+
+
+def append_result(entry: dict, path: str = INBOX_RESULTS_PATH):
+    """Append one analyzed resume to the results file"""
+    line = json.dumps(entry, ensure_ascii=False, default=str) + "\n"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with _write_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def iter_results(path: str = INBOX_RESULTS_PATH):
+    """Yield stored entries in the order they were written"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                # Usually a line still being written by the daemon
+                logger.debug(f"Skipping unreadable line {line_number} of {path}")
+
+
+def processed_keys(path: str = INBOX_RESULTS_PATH) -> set:
+    """(file_hash, job_key) pairs already analyzed"""
+    return {(entry.get("file_hash"), entry.get("job_key")) for entry in iter_results(path)}
+
+
+def results_stamp(path: str = INBOX_RESULTS_PATH):
+    """(mtime, size) of the results file, or None - changes whenever a result is appended"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
@@ -0,0 +1,84 @@
+"""
+Ingest Cache - Content-hash fingerprints so re-uploaded resumes aren't re-analyzed
+"""
+import hashlib
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Plan actions
+NEW = "new"          # never analyzed for this job - run the agents
+CACHED = "cached"    # analyzed for this job before - reuse the stored result
+SKIPPED = "skipped"  # already in the results list, or a duplicate within the batch
+
+
+def fingerprint_bytes(data: bytes) -> str:
+    """SHA-256 of the file content"""
+    return hashlib.sha256(data).hexdigest()
+
+
+def job_fingerprint(job_requirements: dict) -> str:
+    """Stable key for a set of job requirements"""
+    payload = json.dumps(job_requirements, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def upload_key(uploaded_file):
+    """Identity of one upload event (same file re-uploaded gets a new key)"""
+    return getattr(uploaded_file, "file_id", None) or (uploaded_file.name, uploaded_file.size)
+
+
+class IngestLedger:
+    """
+    Remembers which file contents were analyzed for which job.
+
+    - parsed:    file_hash -> Agent 1 output (job independent, reusable across jobs)
+    - analyzed:  (file_hash, job_key) -> stored result entry
+    - displayed: (file_hash, job_key) pairs currently in the results list
+    """
+
+    def __init__(self):
+        self.fingerprints = {}
+        self.parsed = {}
+        self.analyzed = {}
+        self.displayed = set()
+
+    def fingerprint(self, uploaded_file) -> str:
+        """Hash an upload once, when it first arrives"""
+        spooled_hash = getattr(uploaded_file, "file_hash", None)
+        if spooled_hash:
+            return spooled_hash  # spooled uploads were hashed while being written to disk
+        key = upload_key(uploaded_file)
+        if key not in self.fingerprints:
+            self.fingerprints[key] = fingerprint_bytes(uploaded_file.getvalue())
+        return self.fingerprints[key]
+
+    def plan(self, uploaded_files: list, job_key: str) -> list:
+        """Return [(action, uploaded_file, file_hash)] for a batch"""
+        plan = []
+        seen = set()
+        for uploaded_file in uploaded_files:
+            file_hash = self.fingerprint(uploaded_file)
+            pair = (file_hash, job_key)
+            if file_hash in seen or pair in self.displayed:
+                action = SKIPPED
+            elif pair in self.analyzed:
+                action = CACHED
+            else:
+                action = NEW
+            seen.add(file_hash)
+            plan.append((action, uploaded_file, file_hash))
+        return plan
+
+    def record(self, file_hash: str, job_key: str, entry: dict, parsed_resume: dict = None):
+        """Remember a finished analysis"""
+        self.analyzed[(file_hash, job_key)] = entry
+        self.displayed.add((file_hash, job_key))
+        if parsed_resume is not None:
+            self.parsed[file_hash] = parsed_resume
+
+    def cached_entry(self, file_hash: str, job_key: str) -> dict:
+        """Stored result for a file/job pair, marked as displayed again"""
+        self.displayed.add((file_hash, job_key))
+        return self.analyzed[(file_hash, job_key)]
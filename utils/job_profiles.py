@@ -0,0 +1,80 @@
+"""
+Job Profiles - Stored requisitions for multi-job matching
+
+Profiles are kept in data/results/job_profiles.json so every recruiter in the
+process sees the same set of open roles. Each profile converts to the same
+job_requirements dict the sidebar builds, with skills in canonical form.
+"""
+import os
+import json
+import logging
+import threading
+
+from utils.ingest_cache import job_fingerprint
+from utils.skill_ontology import normalize_skill_text
+
+logger = logging.getLogger(__name__)
+
+PROFILES_PATH = os.path.join("data", "results", "job_profiles.json")
+
+
+def profile_requirements(profile: dict) -> dict:
+    """Job profile -> job_requirements dict (same keys as the sidebar job)"""
+    min_experience = int(profile.get("min_experience", 0) or 0)
+    max_experience = int(profile.get("max_experience", 3) or 0)
+    return {
+        "job_title": profile.get("job_title", ""),
+        "required_skills": normalize_skill_text(profile.get("required_skills", "")),
+        "required_experience_years": f"{min_experience} to {max_experience}",
+        "min_experience": min_experience,
+        "max_experience": max_experience,
+        "nice_to_have": normalize_skill_text(profile.get("nice_to_have", "")),
+    }
+
+
+class JobProfileStore:
+    """JSON-backed list of job profiles, keyed by the fingerprint of their requirements"""
+
+    def __init__(self, path: str = PROFILES_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.profiles = {}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    self.profiles = {profile["id"]: profile for profile in json.load(f)}
+            except Exception as e:
+                logger.warning(f"⚠️ Could not read job profiles from {path}: {str(e)}")
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(list(self.profiles.values()), f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def all(self) -> list:
+        with self._lock:
+            return sorted(self.profiles.values(), key=lambda profile: profile["job_title"].lower())
+
+    def add(self, profile: dict) -> dict:
+        """Store a profile; re-adding identical requirements updates the existing one"""
+        requirements = profile_requirements(profile)
+        stored = {
+            "id": job_fingerprint(requirements),
+            "job_title": requirements["job_title"],
+            "required_skills": requirements["required_skills"],
+            "nice_to_have": requirements["nice_to_have"],
+            "min_experience": requirements["min_experience"],
+            "max_experience": requirements["max_experience"],
+        }
+        with self._lock:
+            self.profiles[stored["id"]] = stored
+            self._save()
+        logger.info(f"💼 Saved job profile {stored['job_title']} ({stored['id']})")
+        return stored
+
+    def remove(self, profile_id: str):
+        with self._lock:
+            if self.profiles.pop(profile_id, None) is not None:
+                self._save()
@@ -0,0 +1,134 @@
+"""
+JSON Repair - Recovers JSON objects from imperfect LLM responses locally
+"""
+import json
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+_FENCE_RE = re.compile(r"```(?:json)?", re.IGNORECASE)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+
+def _extract_object(text: str) -> str:
+    """Cut the first top-level {...} block out of the text, closing it if truncated"""
+    start = text.find("{")
+    if start == -1:
+        return ""
+
+    stack = []
+    in_string = None
+    escaped = False
+    out = []
+
+    for ch in text[start:]:
+        out.append(ch)
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == in_string:
+                in_string = None
+            continue
+
+        if ch in ('"', "'"):
+            in_string = ch
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+        elif ch in "}]":
+            if stack and stack[-1] == ch:
+                stack.pop()
+            if not stack:
+                # Balanced object found - anything after it is trailing text
+                return "".join(out)
+
+    # Truncated response: close the open string and brackets
+    fragment = "".join(out).rstrip()
+    if in_string:
+        fragment += in_string
+    fragment = re.sub(r'[,:]\s*$', "", fragment)
+    if stack and stack[-1] == "}":
+        # A dangling object key without a value cannot be kept
+        fragment = re.sub(r',\s*"[^"]*"\s*$', "", fragment)
+        fragment = re.sub(r'\{\s*"[^"]*"\s*$', "{", fragment)
+    return fragment + "".join(reversed(stack))
+
+
+def _normalize_quotes(fragment: str) -> str:
+    """Convert single-quoted strings and Python literals to JSON syntax"""
+    out = []
+    in_string = None
+    escaped = False
+    i = 0
+    while i < len(fragment):
+        ch = fragment[i]
+        if in_string:
+            if escaped:
+                escaped = False
+                # \' is legal in a single-quoted string but not in JSON
+                out.append(ch if ch == "'" else "\\" + ch)
+            elif ch == "\\":
+                escaped = True
+            elif ch == in_string:
+                in_string = None
+                out.append('"')
+            elif ch == '"' and in_string == "'":
+                out.append('\\"')
+            else:
+                out.append(ch)
+        elif ch in ('"', "'"):
+            in_string = ch
+            out.append('"')
+        else:
+            matched = False
+            for literal, replacement in _PY_LITERALS.items():
+                if fragment.startswith(literal, i) and not fragment[i + len(literal):i + len(literal) + 1].isalnum():
+                    out.append(replacement)
+                    i += len(literal)
+                    matched = True
+                    break
+            if matched:
+                continue
+            out.append(ch)
+        i += 1
+    return "".join(out)
+
+
+def repair_json(text: str):
+    """
+    Parse a JSON object out of an LLM response, repairing common defects:
+    markdown fences, leading/trailing prose, truncated brackets, trailing
+    commas, single quotes and Python literals. Returns a dict or None.
+    """
+    if not text:
+        return None
+
+    cleaned = _FENCE_RE.sub("", text)
+
+    # Fast path - the response is already valid JSON
+    try:
+        data = json.loads(cleaned)
+        if isinstance(data, dict):
+            return data
+    except json.JSONDecodeError:
+        pass
+
+    fragment = _extract_object(cleaned)
+    if not fragment:
+        return None
+
+    for candidate in (fragment, _normalize_quotes(fragment)):
+        candidate = _TRAILING_COMMA_RE.sub(r"\1", candidate)
+        try:
+            data = json.loads(candidate)
+            if isinstance(data, dict):
+                logger.info("🔧 Recovered JSON object from malformed response")
+                return data
+        except json.JSONDecodeError:
+            continue
+
+    logger.warning("Could not repair JSON response")
+    return None
@@ -0,0 +1,137 @@
+"""
+Near-Duplicate Detection - MinHash + LSH index over extracted resume text
+
+Word shingles of each resume are hashed into a fixed-size MinHash signature.
+Signatures are split into bands; resumes sharing any band bucket become
+candidate pairs, so a lookup only compares against a handful of resumes
+instead of the whole pool. Candidates are then verified with the estimated
+Jaccard similarity (fraction of equal signature slots).
+"""
+import os
+import re
+import zlib
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NUM_PERM = 128
+BANDS = 16                      # 16 bands x 8 rows -> candidate pairs from ~0.7 similarity
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5                # words per shingle
+
+CLUSTER_THRESHOLD = float(os.getenv("DUPLICATE_CLUSTER_THRESHOLD", "0.8"))
+REUSE_THRESHOLD = float(os.getenv("DUPLICATE_REUSE_THRESHOLD", "0.9"))
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+# Fixed seed so signatures are comparable across sessions and processes
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 31, size=(NUM_PERM, 1)).astype(np.uint64)
+_PERM_B = _rng.randint(0, 1 << 31, size=(NUM_PERM, 1)).astype(np.uint64)
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """Unique 32-bit hashes of the word k-shingles of a text"""
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return np.zeros(0, dtype=np.uint64)
+    k = min(SHINGLE_SIZE, len(words))
+    hashes = {zlib.crc32(" ".join(words[i:i + k]).encode("utf-8")) for i in range(len(words) - k + 1)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """NUM_PERM-slot MinHash signature (uint32) of a text"""
+    hashes = shingle_hashes(text)
+    if hashes.size == 0:
+        return np.full(NUM_PERM, _MAX_HASH, dtype=np.uint32)
+    permuted = ((_PERM_A * hashes[np.newaxis, :] + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+class NearDuplicateIndex:
+    """LSH index of resume signatures keyed by file content hash"""
+
+    def __init__(self):
+        self.signatures = {}
+        self.labels = {}
+        self.buckets = [defaultdict(set) for _ in range(BANDS)]
+        self.version = 0
+        self._clusters_cache = None
+
+    def __contains__(self, key):
+        return key in self.signatures
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def add(self, key: str, text: str, label: str = None):
+        """Index one resume (no-op if the key is already indexed)"""
+        if key in self.signatures:
+            return
+        signature = minhash_signature(text)
+        self.signatures[key] = signature
+        self.labels[key] = label or key[:12]
+        for band in range(BANDS):
+            self.buckets[band][signature[band * ROWS:(band + 1) * ROWS].tobytes()].add(key)
+        self.version += 1
+
+    def candidates(self, key: str) -> set:
+        """Keys sharing at least one LSH bucket with the given key"""
+        signature = self.signatures[key]
+        found = set()
+        for band in range(BANDS):
+            found |= self.buckets[band].get(signature[band * ROWS:(band + 1) * ROWS].tobytes(), set())
+        found.discard(key)
+        return found
+
+    def neighbours(self, key: str, threshold: float = CLUSTER_THRESHOLD) -> list:
+        """[(other_key, similarity)] above threshold, most similar first"""
+        signature = self.signatures[key]
+        scored = [(other, estimate_similarity(signature, self.signatures[other])) for other in self.candidates(key)]
+        return sorted([item for item in scored if item[1] >= threshold], key=lambda item: item[1], reverse=True)
+
+    def best_match(self, key: str, accept=None, threshold: float = REUSE_THRESHOLD):
+        """Most similar indexed resume passing the accept(key) filter, or None"""
+        for other, similarity in self.neighbours(key, threshold):
+            if accept is None or accept(other):
+                return other, similarity
+        return None
+
+    def clusters(self, threshold: float = CLUSTER_THRESHOLD) -> list:
+        """Groups (size > 1) of near-duplicate keys, cached until the index changes"""
+        if self._clusters_cache is not None and self._clusters_cache[0] == (self.version, threshold):
+            return self._clusters_cache[1]
+
+        parent = {key: key for key in self.signatures}
+
+        def find(key):
+            while parent[key] != key:
+                parent[key] = parent[parent[key]]
+                key = parent[key]
+            return key
+
+        for key in self.signatures:
+            for other, _ in self.neighbours(key, threshold):
+                root_a, root_b = find(key), find(other)
+                if root_a != root_b:
+                    parent[root_b] = root_a
+
+        groups = defaultdict(list)
+        for key in self.signatures:
+            groups[find(key)].append(key)
+        result = [members for members in groups.values() if len(members) > 1]
+
+        self._clusters_cache = ((self.version, threshold), result)
+        logger.info(f"🔁 Found {len(result)} near-duplicate cluster(s) among {len(self.signatures)} resumes")
+        return result
@@ -0,0 +1,54 @@
+"""
+Performance Budget - Measures Streamlit script runs against a time budget
+
+The first run in a process is measured against STARTUP_BUDGET_MS, every later
+rerun (widget interaction) against RERUN_BUDGET_MS. Runs over budget are
+logged as warnings.
+"""
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Module state survives reruns because Streamlit only re-executes the page script
+_first_run_done = set()
+_last_run_ms = {}
+
+
+class RerunTimer:
+    """Times one execution of a Streamlit page script"""
+
+    def __init__(self, page: str):
+        self.page = page
+        self.is_startup = page not in _first_run_done
+        self.start = time.perf_counter()
+
+    @property
+    def budget_ms(self) -> float:
+        if self.is_startup:
+            return float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+        return float(os.getenv("RERUN_BUDGET_MS", "100"))
+
+    def finish(self) -> float:
+        """Stop the timer, log the result and return the elapsed milliseconds"""
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        kind = "startup" if self.is_startup else "rerun"
+        _first_run_done.add(self.page)
+        _last_run_ms[self.page] = elapsed_ms
+
+        if elapsed_ms > self.budget_ms:
+            logger.warning(f"⏱️ {self.page} {kind} took {elapsed_ms:.0f} ms (budget {self.budget_ms:.0f} ms)")
+        else:
+            logger.debug(f"⏱️ {self.page} {kind} took {elapsed_ms:.0f} ms")
+        return elapsed_ms
+
+
+def start_rerun_timer(page: str) -> RerunTimer:
+    """Start timing the current script run of the given page"""
+    return RerunTimer(page)
+
+
+def last_run_ms(page: str):
+    """Duration of the previous completed run of a page, or None"""
+    return _last_run_ms.get(page)
@@ -0,0 +1,134 @@
+"""
+Profiler - Opt-in sampling profiler + tracemalloc report for bulk runs
+
+A background thread samples the stack of the thread that started the profiler
+(the session's script thread) every PROFILE_INTERVAL_MS - other sessions
+running in the same process are not recorded; work handed to ingest workers
+shows up as the wait for their results. Stacks are counted in collapsed-stack
+form ("thread;outer;inner 42"), which flamegraph.pl,
+speedscope and most flame-graph viewers read directly. Sampling costs roughly
+10% wall time. Optionally, tracemalloc snapshots taken at start and stop give
+the top allocation sites of the run; allocation tracing is much more
+expensive (often several times slower), so it has its own switch.
+
+Enabled with PROFILE_BULK_RUNS=true or the sidebar toggle; outputs are written
+to data/results/.
+"""
+import os
+import sys
+import time
+import threading
+import tracemalloc
+import logging
+from collections import Counter
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.path.join("data", "results")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+TRACEMALLOC_FRAMES = int(os.getenv("PROFILE_TRACEMALLOC_FRAMES", "5"))
+
+
+def profiling_enabled_by_env() -> bool:
+    return os.getenv("PROFILE_BULK_RUNS", "false").lower() in ("1", "true", "yes")
+
+
+def memory_tracing_enabled_by_env() -> bool:
+    return os.getenv("PROFILE_MEMORY", "false").lower() in ("1", "true", "yes")
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class BulkRunProfiler:
+    """Start before a bulk run, stop after it; stop() returns the report paths"""
+
+    def __init__(self, label: str, trace_memory: bool = False, interval_ms: float = PROFILE_INTERVAL_MS,
+                 directory: str = PROFILE_DIR):
+        self.label = label
+        self.trace_memory = trace_memory
+        self.interval = max(interval_ms, 1) / 1000
+        self.directory = directory
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self._target = None
+        self._own_tracemalloc = False
+        self._snapshot = None
+        self._started = None
+
+    def start(self):
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACEMALLOC_FRAMES)
+                self._own_tracemalloc = True
+            self._snapshot = tracemalloc.take_snapshot()
+        self._started = time.perf_counter()
+        self._target = threading.current_thread()
+        self._thread = threading.Thread(target=self._sample_loop, name="bulk-run-profiler", daemon=True)
+        self._thread.start()
+        logger.info(f"🔬 Profiling {self.label} (sampling every {self.interval * 1000:g} ms)")
+        return self
+
+    def _sample_loop(self):
+        target = self._target
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(target.ident)
+            if frame is None:
+                break  # the profiled thread has exited
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            stack.append(target.name)
+            self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> dict:
+        """Stop sampling, write the reports and return {"flamegraph": path[, "allocations": path]}"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        elapsed = time.perf_counter() - self._started
+
+        os.makedirs(self.directory, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        base = os.path.join(self.directory, f"profile_{self.label}_{stamp}")
+
+        flamegraph_path = f"{base}.collapsed"
+        with open(flamegraph_path, "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+        outputs = {"flamegraph": flamegraph_path}
+        logger.info(f"🔬 Profile written: {flamegraph_path} ({self.samples} samples in {elapsed:.1f} s)")
+        if self._snapshot is None:
+            return outputs
+
+        after = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._own_tracemalloc:
+            tracemalloc.stop()
+
+        allocations_path = f"{base}_allocations.txt"
+        ignore = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+        diff = after.filter_traces(ignore).compare_to(self._snapshot.filter_traces(ignore), "traceback")
+        with open(allocations_path, "w", encoding="utf-8") as f:
+            f.write(f"Profile: {self.label}\n")
+            f.write(f"Wall time: {elapsed:.2f} s, {self.samples} samples every {self.interval * 1000:g} ms\n")
+            f.write(f"Traced memory: current {current / 1e6:.1f} MB, peak {peak / 1e6:.1f} MB\n\n")
+            f.write("Top allocation sites (growth during the run):\n\n")
+            for rank, stat in enumerate(diff[:25], 1):
+                f.write(f"#{rank}: {stat.size_diff / 1024:+.1f} KiB ({stat.count_diff:+d} blocks), "
+                        f"now {stat.size / 1024:.1f} KiB\n")
+                for line in stat.traceback.format(limit=TRACEMALLOC_FRAMES, most_recent_first=True):
+                    f.write(f"    {line}\n")
+                f.write("\n")
+
+        logger.info(f"🔬 Allocation report written: {allocations_path}")
+        outputs["allocations"] = allocations_path
+        return outputs
@@ -0,0 +1,196 @@
+"""
+Request Scheduler - Shares the aggregate LLM rate limit fairly between sessions
+
+Every API call waits for a dispatch slot. Slots are released by a token
+bucket sized to the whole key pool (requests per minute per key x keys), and
+waiting requests are served by self-clocked weighted fair queuing: each
+session is its own flow, so one recruiter's 100-file batch cannot starve
+another session, and interactive (single-resume) requests carry a higher
+weight than bulk ones.
+
+The calling session and request class come from a context variable (set with
+`set_request_context` or `scheduler_context`), so the agents don't need extra
+parameters. Token usage reported by the provider is counted the same way,
+for code running inside `token_meter()`.
+"""
+import os
+import time
+import heapq
+import itertools
+import threading
+import contextvars
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+REQUESTS_PER_MINUTE_PER_KEY = float(os.getenv("LLM_RPM_PER_KEY", "30"))
+CLASS_WEIGHTS = {
+    INTERACTIVE: float(os.getenv("INTERACTIVE_WEIGHT", "4")),
+    BULK: 1.0,
+}
+
+_current = contextvars.ContextVar("llm_request_context", default=("default", BULK))
+_meter = contextvars.ContextVar("llm_token_meter", default=None)
+
+
+def set_request_context(session_id: str, request_class: str = BULK):
+    """Attribute LLM calls made from the current thread/task to a session and request class"""
+    return _current.set((session_id or "default", request_class))
+
+
+@contextmanager
+def scheduler_context(session_id: str, request_class: str = BULK):
+    """Attribute LLM calls made inside this block to a session and request class"""
+    token = set_request_context(session_id, request_class)
+    try:
+        yield
+    finally:
+        _current.reset(token)
+
+
+def current_context():
+    """(session_id, request_class) of the calling code"""
+    return _current.get()
+
+
+class TokenMeter:
+    """Tokens reported by the provider for the calls made inside `token_meter()`"""
+
+    def __init__(self):
+        self.tokens = 0
+        self.calls = 0
+
+
+@contextmanager
+def token_meter():
+    """Count the tokens of LLM calls made inside this block (same thread/task)"""
+    meter = TokenMeter()
+    token = _meter.set(meter)
+    try:
+        yield meter
+    finally:
+        _meter.reset(token)
+
+
+def record_usage(response):
+    """Add a chat completion's usage to the active meter, if any"""
+    meter = _meter.get()
+    if meter is None:
+        return
+    usage = getattr(response, "usage", None)
+    meter.tokens += getattr(usage, "total_tokens", 0) or 0
+    meter.calls += 1
+
+
+def set_requests_per_minute_per_key(requests_per_minute: float):
+    """Override LLM_RPM_PER_KEY for this process (a separate process sharing the keys gets its own share)"""
+    global REQUESTS_PER_MINUTE_PER_KEY
+    REQUESTS_PER_MINUTE_PER_KEY = float(requests_per_minute)
+
+
+class FairRequestScheduler:
+    """Token bucket for the pool's rate limit + weighted fair queue across sessions"""
+
+    def __init__(self, requests_per_minute: float, burst: int = 1):
+        self.rate = max(requests_per_minute, 1e-6) / 60.0
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+
+        self.virtual_time = 0.0
+        self.last_finish = {}     # session -> finish tag of its latest request
+        self.queue = []           # heap of (finish tag, sequence)
+        self._sequence = itertools.count()
+        self._cond = threading.Condition()
+
+        self.dispatched = {INTERACTIVE: 0, BULK: 0}
+        self.waited = {INTERACTIVE: 0.0, BULK: 0.0}
+
+    def configure(self, requests_per_minute: float, burst: int = 1):
+        """Resize the bucket, e.g. when the number of keys changes"""
+        with self._cond:
+            self._refill()
+            self.rate = max(requests_per_minute, 1e-6) / 60.0
+            self.burst = max(1, burst)
+            self.tokens = min(self.tokens, self.burst)
+            self._cond.notify_all()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self, session_id: str = None, request_class: str = None) -> float:
+        """Block until this request may be sent. Returns the time spent waiting (s)"""
+        context_session, context_class = current_context()
+        session_id = session_id or context_session
+        request_class = request_class or context_class
+        weight = CLASS_WEIGHTS.get(request_class, 1.0)
+        started = time.monotonic()
+
+        with self._cond:
+            # Finish tag: the session's flow advances by 1/weight per request
+            start_tag = max(self.virtual_time, self.last_finish.get(session_id, 0.0))
+            finish_tag = start_tag + 1.0 / weight
+            self.last_finish[session_id] = finish_tag
+            ticket = (finish_tag, next(self._sequence))
+            heapq.heappush(self.queue, ticket)
+
+            try:
+                while True:
+                    self._refill()
+                    if self.queue[0] == ticket and self.tokens >= 1.0:
+                        heapq.heappop(self.queue)
+                        self.tokens -= 1.0
+                        self.virtual_time = finish_tag
+                        break
+                    # Wake when the next token is due (or when the queue head changes)
+                    self._cond.wait(timeout=max((1.0 - self.tokens) / self.rate, 0.01))
+            except BaseException:
+                # Interrupted while queued - don't leave a ticket that blocks everyone behind it
+                self.queue.remove(ticket)
+                heapq.heapify(self.queue)
+                raise
+            finally:
+                self._cond.notify_all()
+
+            waited = time.monotonic() - started
+            self.dispatched[request_class] = self.dispatched.get(request_class, 0) + 1
+            self.waited[request_class] = self.waited.get(request_class, 0.0) + waited
+
+        if waited > 1:
+            logger.info(f"⏳ {request_class} request from session {session_id[:8]} waited {waited:.1f}s for a rate-limit slot")
+        return waited
+
+    def summary(self) -> dict:
+        with self._cond:
+            return {
+                "queued": len(self.queue),
+                "requests_per_minute": round(self.rate * 60, 1),
+                "dispatched": dict(self.dispatched),
+                "avg_wait_s": {
+                    name: round(self.waited[name] / count, 2) if count else None
+                    for name, count in self.dispatched.items()
+                },
+            }
+
+
+# Global instance
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_request_scheduler(total_keys: int = 1) -> FairRequestScheduler:
+    """Process-wide scheduler sized for the current key pool"""
+    global _scheduler
+    with _scheduler_lock:
+        rpm = REQUESTS_PER_MINUTE_PER_KEY * max(1, total_keys)
+        if _scheduler is None:
+            _scheduler = FairRequestScheduler(rpm, burst=max(1, total_keys))
+        elif abs(_scheduler.rate * 60 - rpm) > 1e-6:
+            _scheduler.configure(rpm, burst=max(1, total_keys))
+        return _scheduler
@@ -0,0 +1,175 @@
+"""
+Result Export - Streaming CSV / JSONL / Parquet exports of stored results
+
+Records are read from the results list through a filter generator and written
+to data/results/exports in chunks, so an export never builds a DataFrame or a
+second in-memory copy of the history. Lists and dicts (skills, strengths,
+score components) keep their structure in JSONL and Parquet; CSV cells hold
+them as JSON. Parquet needs pyarrow and is skipped cleanly without it.
+"""
+import os
+import csv
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+
+from utils.scoring_engine import COMPONENTS
+
+logger = logging.getLogger(__name__)
+
+EXPORT_DIR = os.path.join("data", "results", "exports")
+CHUNK_ROWS = 5000
+
+CSV = "CSV"
+JSONL = "JSONL"
+PARQUET = "Parquet"
+EXPORT_FORMATS = {CSV: ("csv", "text/csv"), JSONL: ("jsonl", "application/x-ndjson"), PARQUET: ("parquet", "application/octet-stream")}
+
+
+def has_pyarrow() -> bool:
+    import importlib.util
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def iter_filtered(results: list, min_score: float = 0, shortlisted_only: bool = False, hide_duplicates: bool = False):
+    """Yield the stored result dicts that pass the tab filters (no copies)"""
+    if hasattr(results, "mask"):
+        # CandidateTable: vectorized filter, rows materialized one at a time
+        yield from results.rows(results.mask(min_score, shortlisted_only, hide_duplicates).nonzero()[0])
+        return
+    for result in results:
+        if (result.get("confidence_score") or 0) < min_score:
+            continue
+        if shortlisted_only and not result.get("shortlisted"):
+            continue
+        if hide_duplicates and result.get("duplicate_of"):
+            continue
+        yield result
+
+
+def _chunks(records, size: int = CHUNK_ROWS):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_jsonl(records, path: str) -> int:
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record, ensure_ascii=False, default=str))
+            f.write("\n")
+            count += 1
+    return count
+
+
+def write_csv(records, path: str, columns: list) -> int:
+    """CSV with a fixed column set; nested values are written as JSON"""
+    count = 0
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        for record in records:
+            writer.writerow({
+                key: json.dumps(value, ensure_ascii=False, default=str) if isinstance(value, (list, dict)) else value
+                for key, value in record.items()
+            })
+            count += 1
+    return count
+
+
+def _known_types() -> dict:
+    """Arrow types of the result fields whose type can't be inferred from any one row (an empty list is list<null>)"""
+    import pyarrow as pa
+
+    text_list = pa.list_(pa.string())
+    return {
+        "experience_years": pa.float64(),
+        "skills": text_list,
+        "confidence_score": pa.float64(),
+        "shortlisted": pa.bool_(),
+        "key_strengths": text_list,
+        "gaps": text_list,
+        "score_components": pa.struct([(name, pa.float64()) for name in COMPONENTS]),
+        "provisional": pa.bool_(),
+    }
+
+
+def _parquet_schema(records: list):
+    """Schema covering every field: known fields typed explicitly, others from one non-empty value, ints widened to float"""
+    import pyarrow as pa
+
+    known = _known_types()
+    representatives = {}
+    for record in records:
+        for key, value in record.items():
+            if key in representatives:
+                continue
+            if key in known:
+                representatives[key] = None
+            elif value is not None and value != [] and value != {}:
+                representatives[key] = {key: value}
+    fields = []
+    for key, sample in representatives.items():
+        field_type = known[key] if sample is None else pa.Table.from_pylist([sample]).schema.field(key).type
+        if pa.types.is_integer(field_type):
+            field_type = pa.float64()  # scores / years are int in some rows, float in others
+        fields.append(pa.field(key, field_type))
+    return pa.schema(fields)
+
+
+def write_parquet(records, path: str, schema_records: list) -> int:
+    """Parquet written one row group per chunk; schema_records is scanned once for field types"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = _parquet_schema(schema_records)
+    count = 0
+    with pq.ParquetWriter(path, schema) as writer:
+        for chunk in _chunks(records):
+            writer.write_table(pa.Table.from_pylist(chunk, schema=schema))
+            count += len(chunk)
+    return count
+
+
+def collect_columns(records) -> list:
+    """Column order for CSV: first-seen order across all records"""
+    columns = {}
+    for record in records:
+        for key in record:
+            columns.setdefault(key, None)
+    return list(columns)
+
+
+def export_results(results: list, export_format: str, name: str, directory: str = EXPORT_DIR, **filters) -> dict:
+    """
+    Write the filtered results to a file. Returns {"status", "path", "rows", "mime"}.
+
+    `results` is only iterated (twice for CSV/Parquet: once for the columns or
+    schema, once to write), never copied.
+    """
+    extension, mime = EXPORT_FORMATS[export_format]
+    if export_format == PARQUET and not has_pyarrow():
+        return {"status": "error", "error": "Parquet export needs pyarrow: pip install pyarrow"}
+
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}")
+    try:
+        if export_format == JSONL:
+            rows = write_jsonl(iter_filtered(results, **filters), path)
+        elif export_format == CSV:
+            rows = write_csv(iter_filtered(results, **filters), path, collect_columns(iter_filtered(results, **filters)))
+        else:
+            rows = write_parquet(iter_filtered(results, **filters), path, iter_filtered(results, **filters))
+    except Exception as e:
+        logger.error(f"❌ Export to {export_format} failed: {str(e)}")
+        if os.path.exists(path):
+            os.remove(path)
+        return {"status": "error", "error": str(e)}
+
+    logger.info(f"📦 Exported {rows} candidate(s) to {path}")
+    return {"status": "success", "path": path, "rows": rows, "mime": mime}
@@ -0,0 +1,52 @@
+"""
+Routing Stats - Per-tier LLM latency and escalation counters for the model router
+"""
+import os
+import sys
+import threading
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agents.llm_client import SMALL, LARGE
+
+
+class RoutingStats:
+    """Per-tier call latency and escalation counters (shared across sessions)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = {SMALL: 0, LARGE: 0}
+            self.latency = {SMALL: 0.0, LARGE: 0.0}
+            self.candidates = 0
+            self.escalations = {"parse_validation": 0, "analysis_validation": 0, "borderline": 0}
+
+    def record_call(self, tier: str, seconds: float):
+        with self._lock:
+            self.calls[tier] += 1
+            self.latency[tier] += seconds
+
+    def record_candidate(self, escalation: str = None):
+        with self._lock:
+            self.candidates += 1
+            if escalation:
+                self.escalations[escalation] += 1
+
+    def summary(self) -> dict:
+        with self._lock:
+            escalated = sum(self.escalations.values())
+            return {
+                "candidates": self.candidates,
+                "calls": dict(self.calls),
+                "avg_latency_s": {
+                    tier: round(self.latency[tier] / self.calls[tier], 2) if self.calls[tier] else None
+                    for tier in (SMALL, LARGE)
+                },
+                "escalations": dict(self.escalations),
+                "escalation_rate": round(escalated / self.candidates, 3) if self.candidates else 0.0,
+            }
+
+
+# Process-wide instance shared by every session
+routing_stats = RoutingStats()
@@ -0,0 +1,211 @@
+"""
+Scoring Engine - Reproducible local confidence scores from parsed resume data
+
+Confidence = weighted sum of four components, each in [0, 1]:
+    skills (40%)       share of required + mandatory skills the candidate lists
+    experience (30%)   fit of experience_years to the Min/Max band
+    education (20%)    highest degree level x field relevance
+    achievements (10%) achievements / certifications listed
+
+Components are stored per candidate, so changing the weights re-ranks the
+whole pool with one matrix-vector product and no API calls.
+"""
+import re
+import logging
+
+import numpy as np
+
+from utils.skill_ontology import get_skill_index
+
+logger = logging.getLogger(__name__)
+
+COMPONENTS = ["skills", "experience", "education", "achievements"]
+DEFAULT_WEIGHTS = {"skills": 40, "experience": 30, "education": 20, "achievements": 10}
+
+_DEGREE_LEVELS = [
+    (re.compile(r"\b(?:ph\.?\s?d|doctor(?:ate)?)\b", re.IGNORECASE), 1.0),
+    (re.compile(r"\b(?:master|m\.?\s?(?:tech|sc|s|e|ca|ba)|mba|post\s?graduate)\b", re.IGNORECASE), 1.0),
+    (re.compile(r"\b(?:bachelor|b\.?\s?(?:tech|sc|s|e|ca|com|a)|undergraduate|graduate)\b", re.IGNORECASE), 0.8),
+    (re.compile(r"\b(?:diploma|associate|certificate)\b", re.IGNORECASE), 0.6),
+]
+_RELEVANT_FIELDS = re.compile(
+    r"\b(?:computer|software|information|it|engineering|data|math(?:ematics)?|statistics|science|electronics|analytics)\b",
+    re.IGNORECASE,
+)
+
+
+def split_skills(text) -> list:
+    """Comma-separated requirement text -> list of skills"""
+    if isinstance(text, (list, tuple)):
+        return [str(item).strip() for item in text if str(item).strip()]
+    return [item.strip() for item in str(text or "").split(",") if item.strip()]
+
+
+def normalize_skill(skill: str) -> str:
+    """Lowercase canonical name, so aliases ("k8s", "Kubernetes") compare equal"""
+    return get_skill_index().canonical(skill).lower()
+
+
+def skill_match_matrix(candidate_skills: list, required: list) -> np.ndarray:
+    """Boolean (candidates x required skills) matrix of matches"""
+    index = get_skill_index()
+    required_norm = [normalize_skill(skill) for skill in required]
+    # Any spelling of the skill as a whole word inside a longer entry ("AWS" in "AWS Lambda");
+    # very short aliases ("ad", "ml") only count as exact matches
+    patterns = [
+        re.compile("|".join(
+            rf"(?<!\w){re.escape(spelling)}(?!\w)"
+            for spelling in index.spellings(skill) if len(spelling) >= 3 or spelling == norm
+        ))
+        for skill, norm in zip(required, required_norm)
+    ]
+    matrix = np.zeros((len(candidate_skills), len(required_norm)), dtype=bool)
+    for i, skills in enumerate(candidate_skills):
+        normalized = {normalize_skill(skill) for skill in skills or []}
+        joined = " | ".join(str(skill).lower() for skill in skills or [])
+        for j, skill in enumerate(required_norm):
+            matrix[i, j] = skill in normalized or bool(patterns[j].search(joined))
+    return matrix
+
+
+def skill_gaps(candidate_skills: list, job_requirements: dict):
+    """(matched, missing) canonical required skills for one candidate"""
+    required = required_skills(job_requirements)
+    if not required:
+        return [], []
+    matches = skill_match_matrix([candidate_skills], required)[0]
+    matched = [skill for skill, hit in zip(required, matches) if hit]
+    missing = [skill for skill, hit in zip(required, matches) if not hit]
+    return matched, missing
+
+
+def experience_fit(years: np.ndarray, min_experience: float, max_experience: float) -> np.ndarray:
+    """1.0 inside the band, linear below it, slow decay (floor 0.6) above it"""
+    years = np.nan_to_num(np.asarray(years, dtype=float), nan=0.0)
+    below = years / min_experience if min_experience > 0 else np.ones_like(years)
+    above = np.maximum(0.6, 1.0 - 0.08 * (years - max_experience))
+    return np.clip(np.where(years < min_experience, below, np.where(years > max_experience, above, 1.0)), 0.0, 1.0)
+
+
+def education_score(education: list) -> float:
+    """Highest degree level, discounted when the field is not relevant"""
+    best = 0.0
+    for entry in education or []:
+        if isinstance(entry, dict):
+            degree = str(entry.get("degree") or "")
+            field = str(entry.get("field") or "")
+        else:
+            degree = field = str(entry)
+        level = next((value for pattern, value in _DEGREE_LEVELS if pattern.search(degree)), 0.5 if degree else 0.0)
+        relevance = 1.0 if _RELEVANT_FIELDS.search(f"{degree} {field}") else 0.7
+        best = max(best, level * relevance)
+    return best
+
+
+def achievements_score(parsed: dict) -> float:
+    count = len(parsed.get("achievements") or []) + 0.5 * len(parsed.get("certifications") or [])
+    return min(1.0, count / 3)
+
+
+def required_skills(job_requirements: dict) -> list:
+    """Canonical required + nice-to-have skills, de-duplicated in order"""
+    return get_skill_index().normalize_list(
+        split_skills(job_requirements.get("required_skills")) + split_skills(job_requirements.get("nice_to_have"))
+    )
+
+
+def compute_components(parsed_resumes: list, job_requirements: dict) -> np.ndarray:
+    """(candidates x 4) matrix of score components in [0, 1]"""
+    required = required_skills(job_requirements)
+
+    n = len(parsed_resumes)
+    components = np.zeros((n, len(COMPONENTS)))
+    if n == 0:
+        return components
+
+    if required:
+        matches = skill_match_matrix([parsed.get("skills", []) for parsed in parsed_resumes], required)
+        components[:, 0] = matches.mean(axis=1)
+    else:
+        components[:, 0] = 1.0
+
+    years = np.array([parsed.get("experience_years") or 0 for parsed in parsed_resumes], dtype=float)
+    components[:, 1] = experience_fit(
+        years,
+        float(job_requirements.get("min_experience", 0) or 0),
+        float(job_requirements.get("max_experience", 99) or 0),
+    )
+    components[:, 2] = [education_score(parsed.get("education")) for parsed in parsed_resumes]
+    components[:, 3] = [achievements_score(parsed) for parsed in parsed_resumes]
+    return components
+
+
+def compute_job_matrix(parsed_resumes: list, job_requirements_list: list) -> np.ndarray:
+    """
+    (candidates x jobs x 4) components for a pool scored against several jobs.
+
+    Skills are matched once against the union of all jobs' skills and then
+    averaged per job through a jobs x skills membership matrix; experience fit
+    broadcasts years against every job's band; education and achievements
+    don't depend on the job and are computed once.
+    """
+    n, m = len(parsed_resumes), len(job_requirements_list)
+    components = np.zeros((n, m, len(COMPONENTS)))
+    if n == 0 or m == 0:
+        return components
+
+    job_skills = [required_skills(job) for job in job_requirements_list]
+    all_skills = list(dict.fromkeys(skill for skills in job_skills for skill in skills))
+    if all_skills:
+        matches = skill_match_matrix([parsed.get("skills", []) for parsed in parsed_resumes], all_skills)
+        column = {skill: i for i, skill in enumerate(all_skills)}
+        membership = np.zeros((m, len(all_skills)))
+        for j, skills in enumerate(job_skills):
+            membership[j, [column[skill] for skill in skills]] = 1.0
+        counts = membership.sum(axis=1)
+        skill_share = (matches.astype(float) @ membership.T) / np.maximum(counts, 1)
+        # Jobs without listed skills don't penalize anyone
+        components[:, :, 0] = np.where(counts > 0, skill_share, 1.0)
+    else:
+        components[:, :, 0] = 1.0
+
+    years = np.array([parsed.get("experience_years") or 0 for parsed in parsed_resumes], dtype=float)
+    min_experience = np.array([float(job.get("min_experience", 0) or 0) for job in job_requirements_list])
+    max_experience = np.array([float(job.get("max_experience", 99) or 0) for job in job_requirements_list])
+    years = np.nan_to_num(years, nan=0.0)[:, None]
+    below = np.where(min_experience > 0, years / np.where(min_experience > 0, min_experience, 1), 1.0)
+    above = np.maximum(0.6, 1.0 - 0.08 * (years - max_experience))
+    components[:, :, 1] = np.clip(
+        np.where(years < min_experience, below, np.where(years > max_experience, above, 1.0)), 0.0, 1.0
+    )
+
+    components[:, :, 2] = np.array([education_score(parsed.get("education")) for parsed in parsed_resumes])[:, None]
+    components[:, :, 3] = np.array([achievements_score(parsed) for parsed in parsed_resumes])[:, None]
+    return components
+
+
+def weight_vector(weights: dict = None) -> np.ndarray:
+    """Weights dict -> normalized vector in COMPONENTS order"""
+    weights = weights or DEFAULT_WEIGHTS
+    vector = np.array([float(weights.get(name, 0)) for name in COMPONENTS])
+    total = vector.sum()
+    return vector / total if total > 0 else np.full(len(COMPONENTS), 1 / len(COMPONENTS))
+
+
+def apply_weights(components: np.ndarray, weights: dict = None) -> np.ndarray:
+    """Confidence scores (0-100, one decimal) for a components matrix"""
+    components = np.asarray(components, dtype=float)
+    # Keeps the leading shape: (candidates,) for a matrix, (candidates, jobs) for a job matrix
+    shape = components.shape[:-1] if components.ndim > 1 else (1,)
+    scores = components.reshape(-1, len(COMPONENTS)) @ weight_vector(weights) * 100
+    return np.round(scores, 1).reshape(shape)
+
+
+def components_to_dict(row) -> dict:
+    return {name: round(float(value), 3) for name, value in zip(COMPONENTS, row)}
+
+
+def score_candidate(parsed_resume: dict, job_requirements: dict, weights: dict = None):
+    """Score one parsed resume. Returns (confidence_score, components dict)"""
+    components = compute_components([parsed_resume], job_requirements)
+    return float(apply_weights(components, weights)[0]), components_to_dict(components[0])
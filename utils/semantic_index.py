@@ -0,0 +1,151 @@
+"""
+Semantic Index - Candidate embeddings in a float32 memory-mapped matrix
+
+Vectors are L2-normalized sentence-transformers embeddings keyed by resume
+content hash, appended incrementally to data/results/candidate_embeddings.f32.
+Search is exact cosine similarity computed block by block over the memmap,
+so 100k x 384 vectors are scanned in well under a second without loading the
+whole matrix into RAM.
+"""
+import os
+import json
+import threading
+import logging
+from functools import lru_cache
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+INDEX_DIR = os.path.join("data", "results")
+BLOCK_ROWS = 16384
+INITIAL_CAPACITY = 1024
+
+
+@lru_cache(maxsize=1)
+def get_embedding_model():
+    """Load the sentence-transformers model once per process"""
+    from sentence_transformers import SentenceTransformer
+
+    model_name = os.getenv("EMBEDDING_MODEL", "all-MiniLM-L6-v2")
+    logger.info(f"🧠 Loading embedding model {model_name}")
+    return SentenceTransformer(model_name)
+
+
+def embed_texts(texts: list) -> np.ndarray:
+    """Normalized float32 embeddings for a batch of texts"""
+    model = get_embedding_model()
+    vectors = model.encode(texts, batch_size=64, convert_to_numpy=True, normalize_embeddings=True)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def candidate_document(result: dict, parsed: dict = None) -> str:
+    """Text describing a candidate for embedding (profile, roles, skills, strengths)"""
+    parsed = parsed or {}
+    roles = "; ".join(
+        " at ".join(filter(None, [str(entry.get("role") or ""), str(entry.get("company") or "")]))
+        for entry in parsed.get("experience_details", []) if isinstance(entry, dict)
+    )
+    parts = [
+        parsed.get("summary") or "",
+        f"Roles: {roles}" if roles else "",
+        f"Skills: {', '.join(result.get('skills') or parsed.get('skills') or [])}",
+        f"Experience: {result.get('experience_years', 0)} years",
+        " ".join(result.get("key_strengths") or []),
+    ]
+    return "\n".join(part for part in parts if part)
+
+
+class CandidateEmbeddingIndex:
+    """Append-only memmap of normalized vectors with blocked exact cosine search"""
+
+    def __init__(self, dim: int, directory: str = INDEX_DIR, name: str = "candidate_embeddings"):
+        self.dim = dim
+        self.matrix_path = os.path.join(directory, f"{name}.f32")
+        self.keys_path = os.path.join(directory, f"{name}.json")
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        self.keys = []
+        if os.path.exists(self.keys_path) and os.path.exists(self.matrix_path):
+            with open(self.keys_path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("dim") == dim:
+                self.keys = stored["keys"]
+        self.rows = {key: i for i, key in enumerate(self.keys)}
+
+        capacity = max(INITIAL_CAPACITY, len(self.keys))
+        if self.keys:
+            capacity = max(capacity, os.path.getsize(self.matrix_path) // (4 * dim))
+            self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, dim))
+        else:
+            self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="w+", shape=(capacity, dim))
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def _grow(self, needed: int):
+        """Double the file until it fits `needed` rows"""
+        capacity = self.matrix.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        self.matrix.flush()
+        del self.matrix
+        with open(self.matrix_path, "r+b") as f:
+            f.truncate(capacity * self.dim * 4)
+        self.matrix = np.memmap(self.matrix_path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def add(self, keys: list, vectors: np.ndarray):
+        """Append vectors for keys not yet indexed"""
+        with self._lock:
+            new = [(key, vector) for key, vector in zip(keys, vectors) if key not in self.rows]
+            if not new:
+                return
+            start = len(self.keys)
+            self._grow(start + len(new))
+            self.matrix[start:start + len(new)] = np.stack([vector for _, vector in new]).astype(np.float32)
+            for offset, (key, _) in enumerate(new):
+                self.rows[key] = start + offset
+                self.keys.append(key)
+            self.matrix.flush()
+            with open(self.keys_path, "w", encoding="utf-8") as f:
+                json.dump({"dim": self.dim, "keys": self.keys}, f)
+        logger.info(f"🧠 Indexed {len(new)} candidate embedding(s), {len(self.keys)} total")
+
+    def vector(self, key: str) -> np.ndarray:
+        return np.array(self.matrix[self.rows[key]])
+
+    def search(self, query: np.ndarray, k: int = 10, allowed_keys=None, exclude=None) -> list:
+        """Top-k [(key, cosine similarity)] for a normalized query vector"""
+        query = np.asarray(query, dtype=np.float32).reshape(-1)
+        if allowed_keys is not None:
+            row_ids = np.array(sorted(self.rows[key] for key in allowed_keys if key in self.rows), dtype=np.int64)
+        else:
+            row_ids = None
+        total = len(self.keys) if row_ids is None else len(row_ids)
+
+        best_rows = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float32)
+        for start in range(0, total, BLOCK_ROWS):
+            if row_ids is None:
+                rows = np.arange(start, min(start + BLOCK_ROWS, total))
+                scores = self.matrix[start:start + len(rows)] @ query
+            else:
+                rows = row_ids[start:start + BLOCK_ROWS]
+                scores = self.matrix[rows] @ query
+
+            # Merge this block's top-k with the running top-k
+            rows = np.concatenate([best_rows, rows])
+            scores = np.concatenate([best_scores, scores])
+            keep = min(k + (1 if exclude else 0), len(scores))
+            top = np.argpartition(-scores, keep - 1)[:keep] if keep < len(scores) else np.arange(len(scores))
+            best_rows, best_scores = rows[top], scores[top]
+
+        order = np.argsort(-best_scores)
+        hits = [(self.keys[row], float(score)) for row, score in zip(best_rows[order], best_scores[order])]
+        return [hit for hit in hits if hit[0] != exclude][:k]
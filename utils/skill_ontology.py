@@ -0,0 +1,198 @@
+"""
+Skill Ontology - Canonical skill names and their aliases
+
+Parsed resume skills and the sidebar's free-text requirements are both mapped
+onto the same canonical names before matching and caching, so "k8s" and
+"Kubernetes" or "AWS" and "Amazon Web Services" are the same skill without
+asking the LLM. Extra entries can be supplied as JSON ({"Canonical": ["alias",
+...]}) via SKILL_ONTOLOGY_FILE.
+"""
+import os
+import re
+import json
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+SKILL_ONTOLOGY = {
+    # Languages
+    "Python": ["python3", "py"],
+    "JavaScript": ["js", "ecmascript", "es6"],
+    "TypeScript": ["ts"],
+    "Java": ["core java", "java se", "java ee", "j2ee"],
+    "C#": ["csharp", "c sharp"],
+    "C++": ["cpp", "cplusplus"],
+    "Go": ["golang"],
+    "Ruby": [],
+    "PHP": [],
+    "Kotlin": [],
+    "Swift": [],
+    "Rust": [],
+    "Scala": [],
+    "R": ["r programming", "r language"],
+    "SQL": ["structured query language"],
+    "Bash": ["shell scripting", "shell script", "bash scripting", "unix shell"],
+    "PowerShell": ["power shell"],
+    # Web / frameworks
+    "React": ["reactjs", "react.js"],
+    "Angular": ["angularjs", "angular.js"],
+    "Vue.js": ["vue", "vuejs"],
+    "Node.js": ["nodejs"],
+    "Express.js": ["expressjs"],
+    "Django": [],
+    "Flask": [],
+    "FastAPI": ["fast api"],
+    "Spring Boot": ["springboot"],
+    "Spring Framework": ["spring"],
+    ".NET": ["dotnet", "dot net"],
+    ".NET Core": ["net core", "dotnet core"],
+    "ASP.NET": [],
+    "HTML": ["html5"],
+    "CSS": ["css3"],
+    "REST APIs": ["restful", "rest api", "restful apis", "restful services"],
+    "GraphQL": [],
+    # Data / ML
+    "Machine Learning": ["ml"],
+    "Deep Learning": ["dl"],
+    "Natural Language Processing": ["nlp"],
+    "Computer Vision": [],
+    "TensorFlow": [],
+    "PyTorch": ["torch"],
+    "scikit-learn": ["sklearn", "scikit learn"],
+    "Pandas": [],
+    "NumPy": [],
+    "Apache Spark": ["spark", "pyspark"],
+    "Apache Kafka": ["kafka"],
+    "Hadoop": ["apache hadoop"],
+    "Power BI": ["powerbi", "microsoft power bi"],
+    "Tableau": [],
+    "Microsoft Excel": ["excel", "ms excel", "advanced excel"],
+    "Large Language Models": ["llm", "llms"],
+    # Databases
+    "PostgreSQL": ["postgres", "postgre sql", "psql"],
+    "MySQL": ["my sql"],
+    "Microsoft SQL Server": ["sql server", "mssql", "ms sql", "ms sql server"],
+    "Oracle Database": ["oracle db"],
+    "PL/SQL": ["plsql"],
+    "MongoDB": ["mongo"],
+    "Redis": [],
+    "Elasticsearch": ["elastic search"],
+    "ELK Stack": ["elk"],
+    # Cloud / DevOps
+    "AWS": ["amazon web services", "amazon aws"],
+    "Microsoft Azure": ["azure", "ms azure"],
+    "Google Cloud Platform": ["gcp", "google cloud"],
+    "Docker": [],
+    "Kubernetes": ["k8s", "kube"],
+    "Terraform": [],
+    "Ansible": [],
+    "Jenkins": [],
+    "CI/CD": ["ci cd", "cicd", "continuous integration", "continuous delivery", "continuous deployment"],
+    "Git": [],
+    "GitHub": [],
+    "GitLab": [],
+    "Bitbucket": [],
+    "Linux": [],
+    "Ubuntu": [],
+    "Red Hat Enterprise Linux": ["rhel", "red hat linux"],
+    "CentOS": [],
+    "Unix": [],
+    "Microservices": ["micro services", "microservice architecture"],
+    # IT / infrastructure
+    "Active Directory": ["ms active directory"],
+    "DNS": ["domain name system"],
+    "Networking": ["tcp/ip", "computer networking", "network administration"],
+    # Practices
+    "Agile": ["agile methodology"],
+    "Scrum": [],
+    "Kanban": [],
+    "Object-Oriented Programming": ["oop", "oops", "object oriented programming"],
+    "Data Structures and Algorithms": ["dsa"],
+}
+
+
+def skill_key(name: str) -> str:
+    """Spelling-insensitive lookup key ("Node.js", "node js", "NodeJS" -> "nodejs")"""
+    return re.sub(r"[\s\-_.]+", "", str(name).strip().lower())
+
+
+class SkillIndex:
+    """Alias -> canonical lookup built once from the ontology"""
+
+    def __init__(self, ontology: dict):
+        self.canonical_names = []
+        self.ids = {}         # lookup key -> canonical id (index into canonical_names)
+        self.aliases = []     # canonical id -> lowercase spellings, used for phrase matching
+        for canonical, aliases in ontology.items():
+            skill_id = len(self.canonical_names)
+            self.canonical_names.append(canonical)
+            spellings = [canonical] + list(aliases)
+            self.aliases.append(sorted({spelling.lower() for spelling in spellings}, key=len, reverse=True))
+            for spelling in spellings:
+                # First definition wins if two entries share an alias
+                self.ids.setdefault(skill_key(spelling), skill_id)
+
+    def __len__(self):
+        return len(self.canonical_names)
+
+    def canonical(self, skill: str) -> str:
+        """Canonical display name, or the skill as written (trimmed) if unknown"""
+        skill_id = self.ids.get(skill_key(skill))
+        if skill_id is None:
+            return re.sub(r"\s+", " ", str(skill).strip())
+        return self.canonical_names[skill_id]
+
+    def spellings(self, skill: str) -> list:
+        """Every known spelling of a skill (just the skill itself if unknown)"""
+        skill_id = self.ids.get(skill_key(skill))
+        if skill_id is None:
+            return [re.sub(r"\s+", " ", str(skill).strip().lower())]
+        return self.aliases[skill_id]
+
+    def normalize_list(self, skills) -> list:
+        """Canonical names, de-duplicated in original order"""
+        result = []
+        seen = set()
+        for skill in skills or []:
+            if not str(skill).strip():
+                continue
+            canonical = self.canonical(skill)
+            if canonical.lower() not in seen:
+                seen.add(canonical.lower())
+                result.append(canonical)
+        return result
+
+    def normalize_text(self, text: str) -> str:
+        """Comma-separated requirement text with each skill canonicalized"""
+        return ", ".join(self.normalize_list(str(text or "").split(",")))
+
+
+def _load_ontology() -> dict:
+    ontology = {name: list(aliases) for name, aliases in SKILL_ONTOLOGY.items()}
+    extra_path = os.getenv("SKILL_ONTOLOGY_FILE")
+    if extra_path:
+        try:
+            with open(extra_path, "r", encoding="utf-8") as f:
+                for name, aliases in json.load(f).items():
+                    ontology.setdefault(name, []).extend(aliases or [])
+            logger.info(f"✅ Loaded extra skill aliases from {extra_path}")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not load SKILL_ONTOLOGY_FILE {extra_path}: {str(e)}")
+    return ontology
+
+
+@lru_cache(maxsize=1)
+def get_skill_index() -> SkillIndex:
+    """Process-wide skill index"""
+    index = SkillIndex(_load_ontology())
+    logger.info(f"🧩 Skill ontology loaded: {len(index)} canonical skills, {len(index.ids)} spellings")
+    return index
+
+
+def normalize_skills(skills) -> list:
+    return get_skill_index().normalize_list(skills)
+
+
+def normalize_skill_text(text: str) -> str:
+    return get_skill_index().normalize_text(text)
@@ -0,0 +1,171 @@
+"""
+Text Extractor - Extracts plain text from uploaded PDF/DOCX/TXT resumes
+
+Parsing libraries are imported on first use so that importing this module
+(and re-running the Streamlit pages) stays cheap.
+"""
+import importlib.util
+import logging
+import zipfile
+
+logger = logging.getLogger(__name__)
+
+
+def has_module(name: str) -> bool:
+    """Check whether an optional library is installed without importing it"""
+    return importlib.util.find_spec(name) is not None
+
+
+def available_backends() -> dict:
+    """Report which extraction libraries are installed"""
+    return {
+        "PyPDF2": has_module("PyPDF2"),
+        "pdfplumber": has_module("pdfplumber"),
+        "python-docx": has_module("docx"),
+        "lxml": has_module("lxml"),
+    }
+
+
+def _extract_pdf(uploaded_file):
+    # Try PyPDF2 first
+    try:
+        import PyPDF2
+        pdf_reader = PyPDF2.PdfReader(uploaded_file)
+        text = ""
+        for page in pdf_reader.pages:
+            text += page.extract_text() or ""
+        if text.strip():
+            return text, True, None
+    except Exception:
+        pass
+
+    # Fallback to pdfplumber
+    try:
+        import pdfplumber
+        uploaded_file.seek(0)
+        with pdfplumber.open(uploaded_file) as pdf:
+            text = ""
+            for page in pdf.pages:
+                text += page.extract_text() or ""
+        if text.strip():
+            return text, True, None
+    except Exception:
+        pass
+
+    return "", False, "Could not extract text from PDF"
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+DOCX_CELL_SEPARATOR = " | "
+
+
+def iter_docx_lines(source):
+    """
+    Stream paragraph and table text from a DOCX in document order.
+
+    word/document.xml is read straight out of the zip with lxml iterparse and
+    every finished element is cleared, so memory stays flat however long the
+    document is. Each table row is yielded as one line with its cells joined
+    by DOCX_CELL_SEPARATOR; nested tables are flattened into their cell.
+    """
+    from lxml import etree
+
+    with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+        runs = []       # text pieces of the paragraph being read
+        cells = []      # stack of paragraph lists, one per open table cell
+        rows = []       # stack of cell lists, one per open table row
+        tags = [f"{_W}{name}" for name in ("p", "t", "tab", "br", "cr", "tc", "tr")]
+        for event, elem in etree.iterparse(xml, events=("start", "end"), tag=tags):
+            tag = elem.tag
+            if event == "start":
+                if tag == f"{_W}tc":
+                    cells.append([])
+                elif tag == f"{_W}tr":
+                    rows.append([])
+                continue
+
+            if tag == f"{_W}t":
+                runs.append(elem.text or "")
+            elif tag == f"{_W}tab":
+                runs.append("\t")
+            elif tag in (f"{_W}br", f"{_W}cr"):
+                runs.append("\n")
+            elif tag == f"{_W}p":
+                paragraph = "".join(runs)
+                runs = []
+                if cells:
+                    cells[-1].append(paragraph)
+                else:
+                    yield paragraph
+            elif tag == f"{_W}tc":
+                cell = " ".join(part.strip() for part in cells.pop() if part.strip())
+                if rows:
+                    rows[-1].append(cell)
+            elif tag == f"{_W}tr":
+                row = [cell for cell in rows.pop() if cell]
+                if row:
+                    line = DOCX_CELL_SEPARATOR.join(row)
+                    if cells:
+                        cells[-1].append(line)  # nested table row stays inside its outer cell
+                    else:
+                        yield line
+            else:
+                continue
+
+            # Drop finished elements (and already-processed siblings) to keep memory bounded
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+
+
+def _extract_docx(uploaded_file):
+    if has_module("lxml"):
+        try:
+            uploaded_file.seek(0)
+            text = "\n".join(iter_docx_lines(uploaded_file))
+            if text.strip():
+                return text, True, None
+            return "", False, "DOCX file is empty"
+        except Exception as e:
+            logger.warning(f"⚠️ Streaming DOCX parse failed, falling back to python-docx: {str(e)}")
+
+    # Fallback: python-docx object model (paragraphs and tables)
+    try:
+        uploaded_file.seek(0)
+        from docx import Document
+        doc = Document(uploaded_file)
+        lines = [para.text for para in doc.paragraphs]
+        for table in doc.tables:
+            for row in table.rows:
+                row_text = DOCX_CELL_SEPARATOR.join(cell.text.strip() for cell in row.cells if cell.text.strip())
+                if row_text:
+                    lines.append(row_text)
+        text = "\n".join(lines)
+        if text.strip():
+            return text, True, None
+        return "", False, "DOCX file is empty"
+    except Exception as e:
+        return "", False, f"Error reading DOCX: {str(e)}"
+
+
+def _extract_txt(uploaded_file):
+    try:
+        text = uploaded_file.getvalue().decode("utf-8")
+        if text.strip():
+            return text, True, None
+        return "", False, "Text file is empty"
+    except Exception as e:
+        return "", False, f"Error reading text file: {str(e)}"
+
+
+def extract_text_from_file(uploaded_file):
+    """Extract text from PDF/DOCX/TXT files. Returns (text, success, error)"""
+    try:
+        if uploaded_file.type == "application/pdf":
+            return _extract_pdf(uploaded_file)
+        elif "wordprocessingml" in uploaded_file.type or uploaded_file.name.endswith(".docx"):
+            return _extract_docx(uploaded_file)
+        else:  # Text file
+            return _extract_txt(uploaded_file)
+    except Exception as e:
+        return "", False, f"Unexpected error: {str(e)}"
@@ -0,0 +1,169 @@
+"""
+Trace Logging - Structured JSON logs with per-resume trace IDs and stage spans
+
+Every resume gets a trace ID derived from its content hash, so extraction
+(worker threads), parsing, scoring and the narrative can be joined later.
+Stages are wrapped in `span(...)`, which logs one line with its duration.
+
+Overhead is bounded by:
+- LOG_LEVEL            level gate for everything (default INFO)
+- LOG_SAMPLE_RATE      share of traces whose INFO/DEBUG lines are kept (default 1.0);
+                       the decision is a hash of the trace ID, so a trace is kept or
+                       dropped as a whole. Warnings and errors are always kept.
+- LOG_ASYNC=true       format/write on a background thread through a bounded queue;
+                       when the queue is full, records are dropped and counted
+- LOG_FORMAT=text      plain lines instead of JSON
+"""
+import os
+import sys
+import json
+import atexit
+import time
+import queue
+import logging
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_SAMPLE_RATE = float(os.getenv("LOG_SAMPLE_RATE", "1.0"))
+LOG_ASYNC = os.getenv("LOG_ASYNC", "false").lower() in ("1", "true", "yes")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+# (trace_id, sampled, file name) of the resume being processed
+_trace = contextvars.ContextVar("log_trace", default=(None, True, None))
+_span = contextvars.ContextVar("log_span", default=None)
+
+_STANDARD_ATTRS = set(logging.LogRecord("", 0, "", 0, "", None, None).__dict__) | {"message", "asctime"}
+
+
+def is_sampled(trace_id: str, rate: float = None) -> bool:
+    """Deterministic per-trace sampling decision"""
+    rate = LOG_SAMPLE_RATE if rate is None else rate
+    if rate >= 1.0 or not trace_id:
+        return True
+    return int(trace_id[:8], 16) % 10000 < rate * 10000
+
+
+def new_trace(file_name: str = None, file_hash: str = None, trace_id: str = None) -> str:
+    """Start a trace for one resume in the current thread/task. Returns the trace ID"""
+    trace_id = trace_id or (file_hash[:16] if file_hash else os.urandom(8).hex())
+    _trace.set((trace_id, is_sampled(trace_id), file_name))
+    _span.set(None)
+    return trace_id
+
+
+@contextmanager
+def span(name: str, logger: logging.Logger = None, **fields):
+    """Time a stage of the current trace and log it as one structured line"""
+    logger = logger or logging.getLogger("trace")
+    parent = _span.get()
+    token = _span.set(f"{parent}/{name}" if parent else name)
+    started = time.perf_counter()
+    status = "ok"
+    try:
+        yield
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        duration_ms = round((time.perf_counter() - started) * 1000, 1)
+        level = logging.WARNING if status == "error" else logging.INFO
+        if logger.isEnabledFor(level):
+            logger.log(level, f"span {name} {status} in {duration_ms} ms",
+                       extra={"fields": dict(fields, duration_ms=duration_ms, status=status)})
+        _span.reset(token)
+
+
+class TraceContextFilter(logging.Filter):
+    """Adds trace fields to records and applies per-trace sampling"""
+
+    def filter(self, record):
+        trace_id, sampled, file_name = _trace.get()
+        record.trace_id = trace_id
+        record.span = _span.get()
+        record.file = file_name
+        return sampled or record.levelno >= logging.WARNING
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line"""
+
+    def format(self, record):
+        payload = {
+            "ts": round(record.created, 3),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key in ("trace_id", "span", "file"):
+            value = getattr(record, key, None)
+            if value:
+                payload[key] = value
+        payload.update(getattr(record, "fields", None) or {})
+        # Any other extra=... attributes
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS and key not in payload and key not in ("fields", "trace_id", "span", "file"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that never blocks the caller: records are dropped when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # The base class formats the message here, on the calling thread; the
+        # listener's handler does that instead (trace fields are already set by the filter)
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+
+
+def configure_logging():
+    """Install the root handler once per process (safe to call on every rerun)"""
+    global _listener
+    root = logging.getLogger()
+    if getattr(root, "_trace_logging_configured", False):
+        return root
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if LOG_FORMAT == "text":
+        stream_handler.setFormatter(logging.Formatter(
+            "%(asctime)s - %(levelname)s - [%(trace_id)s %(span)s] %(message)s"
+        ))
+    else:
+        stream_handler.setFormatter(JsonFormatter())
+
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+
+    if LOG_ASYNC:
+        log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = DroppingQueueHandler(log_queue)
+        _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+        _listener.start()
+        # Flush what is still queued at interpreter exit
+        atexit.register(_listener.stop)
+    else:
+        handler = stream_handler
+
+    # The filter runs on the calling thread, where the trace context is set
+    handler.addFilter(TraceContextFilter())
+    root.addHandler(handler)
+    root.setLevel(getattr(logging, LOG_LEVEL, logging.INFO))
+    root._trace_logging_configured = True
+    return root
@@ -0,0 +1,197 @@
+"""
+Upload Spool - Keeps uploaded resumes on disk instead of in the Streamlit process
+
+Uploads are copied in chunks to data/uploads/<sha256><ext> (hashing while
+copying), after which the in-memory UploadedFile can be released. Extraction
+reads the spooled file through mmap, and batches flow through a bounded
+worker pipeline so only a few extracted texts exist at any moment.
+"""
+import os
+import io
+import mmap
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.text_extractor import extract_text_from_file
+from utils.trace_logging import new_trace, span
+
+logger = logging.getLogger(__name__)
+
+UPLOAD_DIR = os.path.join("data", "uploads")
+CHUNK_SIZE = 1024 * 1024
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", "2"))
+INGEST_QUEUE_SIZE = int(os.getenv("INGEST_QUEUE_SIZE", "4"))
+UPLOAD_RETENTION_HOURS = float(os.getenv("UPLOAD_RETENTION_HOURS", "24"))
+UPLOAD_PURGE_INTERVAL_MINUTES = float(os.getenv("UPLOAD_PURGE_INTERVAL_MINUTES", "10"))
+
+_last_purge = {}  # directory -> monotonic time of its last purge
+_purge_lock = threading.Lock()
+
+
+class SpooledUpload:
+    """An upload stored on disk, addressed by its content hash"""
+
+    def __init__(self, name: str, path: str, file_hash: str, size: int, type: str):
+        self.name = name
+        self.path = path
+        self.file_hash = file_hash
+        self.size = size
+        self.type = type
+
+    def __repr__(self):
+        return f"SpooledUpload({self.name!r}, {self.file_hash[:12]})"
+
+
+class MappedFile(io.RawIOBase):
+    """Read-only file object over an mmap, usable by the PDF/DOCX/TXT extractors"""
+
+    def __init__(self, spooled: SpooledUpload):
+        super().__init__()
+        self.name = spooled.name
+        self.type = spooled.type
+        self._file = open(spooled.path, "rb")
+        # mmap cannot map an empty file
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if spooled.size else None
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self._map is None:
+            return 0
+        return self._map.readinto(buffer)
+
+    def read(self, size=-1):
+        if self._map is None:
+            return b""
+        return self._map.read(None if size is None or size < 0 else size)
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if self._map is not None:
+            self._map.seek(offset, whence)
+        return self.tell()
+
+    def tell(self):
+        return self._map.tell() if self._map is not None else 0
+
+    def getvalue(self) -> bytes:
+        return self._map[:] if self._map is not None else b""
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+        super().close()
+
+
+def spool_stream(stream, directory: str = UPLOAD_DIR, max_bytes: int = None):
+    """
+    Copy a readable stream to a temporary file in the spool, hashing as it goes.
+    Returns (temp_path, sha256, size); raises ValueError past `max_bytes`.
+    """
+    os.makedirs(directory, exist_ok=True)
+    # Long-running servers: expired uploads are removed as new ones arrive
+    maybe_purge_spool(directory)
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.NamedTemporaryFile(dir=directory, suffix=".part", delete=False) as tmp:
+        try:
+            for chunk in iter(lambda: stream.read(CHUNK_SIZE), b""):
+                size += len(chunk)
+                if max_bytes is not None and size > max_bytes:
+                    raise ValueError(f"larger than {max_bytes // (1024 * 1024)} MB")
+                digest.update(chunk)
+                tmp.write(chunk)
+        except BaseException:
+            tmp.close()
+            os.remove(tmp.name)
+            raise
+    return tmp.name, digest.hexdigest(), size
+
+
+def commit_spooled(temp_path: str, file_hash: str, extension: str, directory: str = UPLOAD_DIR) -> str:
+    """Move a spooled temp file to its content-addressed path"""
+    path = os.path.join(directory, f"{file_hash}{extension}")
+    # Content-addressed: identical uploads (from any session) share one file
+    os.replace(temp_path, path)
+    return path
+
+
+def spool_upload(uploaded_file, directory: str = UPLOAD_DIR) -> SpooledUpload:
+    """Copy an upload to disk in chunks, hashing as it goes"""
+    extension = os.path.splitext(uploaded_file.name)[1].lower()
+    uploaded_file.seek(0)
+    temp_path, file_hash, size = spool_stream(uploaded_file, directory)
+    uploaded_file.seek(0)
+    path = commit_spooled(temp_path, file_hash, extension, directory)
+    return SpooledUpload(uploaded_file.name, path, file_hash, size, uploaded_file.type)
+
+
+def extract_spooled(spooled: SpooledUpload):
+    """extract_text_from_file on a memory-mapped spooled upload. Returns (text, success, error)"""
+    # Runs on worker threads: the trace ID comes from the content hash, so these
+    # lines join the same resume's parse/score spans later
+    new_trace(spooled.name, spooled.file_hash)
+    try:
+        with span("extract", logger, size=spooled.size), MappedFile(spooled) as mapped:
+            return extract_text_from_file(mapped)
+    except OSError as e:
+        return "", False, f"Spooled file unavailable: {str(e)}"
+
+
+def iter_extracted(spooled_files, workers: int = INGEST_WORKERS, max_pending: int = INGEST_QUEUE_SIZE):
+    """
+    Yield (spooled, (text, success, error)) in input order.
+
+    Worker threads extract ahead of the consumer, but at most `max_pending`
+    results are queued: when the consumer is busy (e.g. waiting on the LLM)
+    the producer stops, so memory does not grow with the batch size.
+    """
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="ingest") as pool:
+        for spooled in spooled_files:
+            if len(pending) >= max(1, max_pending):
+                done, future = pending.popleft()
+                yield done, future.result()
+            pending.append((spooled, pool.submit(extract_spooled, spooled)))
+        while pending:
+            done, future = pending.popleft()
+            yield done, future.result()
+
+
+def purge_spool(directory: str = UPLOAD_DIR, max_age_hours: float = UPLOAD_RETENTION_HOURS) -> int:
+    """Delete spooled uploads older than the retention window"""
+    if not os.path.isdir(directory):
+        return 0
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for entry in os.scandir(directory):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            try:
+                os.remove(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    if removed:
+        logger.info(f"🧹 Removed {removed} spooled upload(s) older than {max_age_hours:g}h")
+    return removed
+
+
+def maybe_purge_spool(directory: str = UPLOAD_DIR, interval_minutes: float = UPLOAD_PURGE_INTERVAL_MINUTES) -> int:
+    """purge_spool at most once per interval per process - cheap enough to call for every new upload"""
+    now = time.monotonic()
+    with _purge_lock:
+        last = _last_purge.get(directory)
+        if last is not None and now - last < interval_minutes * 60:
+            return 0
+        _last_purge[directory] = now
+    return purge_spool(directory)